@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+🗓️ Agendador multi-loja
+Coleta as lojas descritas em config/lojas.json ao mesmo tempo: cada loja roda
+o pipeline de URLs + dados nutricionais com o próprio orçamento (workers,
+páginas simultâneas por host e taxa de requisições), compartilhando o pool de
+navegadores e a sessão HTTP, em vez de uma coleta sequencial por loja
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import ExitStack
+
+from browser import PoolDrivers
+from coleta_http import criar_sessao
+from esperas import TIMEOUT_PADRAO
+from eventos import emitir, emitir_para, relatar_erro
+from historico import registrar_historico
+from lojas import CAMINHO_LOJAS, carregar_lojas, pasta_da_loja
+from metricas import METRICAS
+from pipeline import executar_pipeline
+
+def executar_lojas(lojas, max_lojas=None, backend='json', motor='http', timeout=TIMEOUT_PADRAO, pool=None,
+                   historico=False):
+    """
+    Roda o pipeline de cada loja em paralelo (no máximo `max_lojas` ao mesmo tempo).
+
+    Retorna {nome da loja: (urls, dados_nutricionais)}; lojas que falharam ficam de fora.
+    """
+    recursos = ExitStack()
+    if pool is None:
+        pool = PoolDrivers(headless=True)
+        recursos.callback(pool.encerrar)
+
+    sessao = None
+    if motor == 'http':
+        # Uma sessão para todas as lojas, com conexões suficientes para a soma dos workers
+        sessao = criar_sessao(tamanho_pool=max(1, sum(loja['orcamento']['workers'] for loja in lojas)))
+        recursos.callback(sessao.close)
+
+    def coletar_loja(loja):
+        orcamento = loja['orcamento']
+        print(f"\n🏬 {loja['descricao']} ({loja['base_url']}): {orcamento['workers']} workers, "
+              f"{orcamento['max_por_host']} páginas por host, {orcamento['taxa']} req/s", flush=True)
+        return executar_pipeline(num_workers=max(1, orcamento['workers']), max_por_host=orcamento['max_por_host'],
+                                 backend=backend, motor=motor, timeout=timeout, pool=pool,
+                                 taxa=orcamento['taxa'], loja=loja, sessao=sessao)
+
+    resultados = {}
+    emitir('inicio', etapa='completa', total=None)
+    try:
+        with ThreadPoolExecutor(max_workers=max_lojas or len(lojas)) as executor:
+            futuros = {executor.submit(coletar_loja, loja): loja for loja in lojas}
+            for futuro in as_completed(futuros):
+                loja = futuros[futuro]
+                try:
+                    resultados[loja['nome']] = futuro.result()
+                except Exception as e:
+                    relatar_erro(f"Erro na loja {loja['nome']}: {e}", 'completa', loja=loja['nome'])
+    finally:
+        emitir('fim', etapa='completa')
+        recursos.close()
+
+    # Uma execução por loja no histórico, com as chaves prefixadas pelo nome da loja:
+    # lojas que compartilham um handle não sobrescrevem os campos uma da outra
+    if historico:
+        for nome, (urls, dados) in resultados.items():
+            if dados:
+                registrar_historico(urls, 'urls', prefixo=f"{nome}/")
+                registrar_historico(dados, 'nutricao', prefixo=f"{nome}/")
+
+    return resultados
+
+def exibir_resumo(lojas, resultados):
+    """Mostra URLs e produtos coletados por loja"""
+    print("\n📊 RESUMO POR LOJA:")
+    for loja in lojas:
+        if loja['nome'] not in resultados:
+            print(f"  ❌ {loja['nome']}: falhou")
+            continue
+        urls, dados = resultados[loja['nome']]
+        print(f"  • {loja['nome']}: {len(urls)} URLs, {len(dados)} produtos → {pasta_da_loja(loja)}/")
+
+def main(argv=None, pool=None):
+    """
+    Função principal.
+
+    Quando chamada pelo menu, recebe o pool de navegadores da sessão.
+    Retorna True se alguma loja teve dados nutricionais salvos.
+    """
+    parser = argparse.ArgumentParser(description="Coleta completa de várias lojas em paralelo (config/lojas.json)")
+    parser.add_argument('--lojas', nargs='+', metavar='NOME',
+                        help="Lojas a coletar (padrão: todas as lojas ativas do arquivo)")
+    parser.add_argument('--config', default=CAMINHO_LOJAS,
+                        help="Arquivo de configuração das lojas (padrão: config/lojas.json)")
+    parser.add_argument('--max-lojas', type=int, default=None,
+                        help="Máximo de lojas coletadas ao mesmo tempo (padrão: todas)")
+    parser.add_argument('--backend', choices=['json', 'dom'], default='json',
+                        help="Descoberta de URLs: 'json' (products.json, com fallback para o grid) ou 'dom' (padrão: json)")
+    parser.add_argument('--motor', choices=['http', 'selenium'], default='http',
+                        help="Extração: 'http' (com fallback para Selenium) ou 'selenium' (padrão: http)")
+    parser.add_argument('--timeout', type=float, default=TIMEOUT_PADRAO,
+                        help=f"Tempo máximo de espera por página/elemento, em segundos (padrão: {TIMEOUT_PADRAO})")
+    parser.add_argument('--historico', action='store_true',
+                        help="Registra as alterações desta execução no histórico (dados/historico.sqlite)")
+    parser.add_argument('--metricas', action='store_true',
+                        help="Exibe p50/p95/p99 por etapa e grava dados/metricas.jsonl e dados/metricas.prom")
+    parser.add_argument('--eventos', metavar='CAMINHO',
+                        help="Grava os eventos de progresso em JSON lines (arquivo, FIFO, /dev/fd/N ou '-' para stdout)")
+    args = parser.parse_args(argv)
+
+    try:
+        lojas = carregar_lojas(args.lojas, args.config)
+    except (OSError, ValueError, KeyError) as e:
+        relatar_erro(f"Configuração de lojas inválida: {e}", 'completa')
+        return False
+    if not lojas:
+        relatar_erro(f"Nenhuma loja ativa em {args.config}", 'completa')
+        return False
+
+    METRICAS.reiniciar()
+    inicio = time.monotonic()
+    recursos = ExitStack()
+    recursos.enter_context(emitir_para(args.eventos))
+
+    try:
+        resultados = executar_lojas(lojas, max_lojas=args.max_lojas, backend=args.backend, motor=args.motor,
+                                    timeout=args.timeout, pool=pool, historico=args.historico)
+    except KeyboardInterrupt:
+        print("\n⚠️  Coleta interrompida pelo usuário.")
+        return False
+    finally:
+        if args.metricas:
+            METRICAS.exportar()
+        recursos.close()
+
+    exibir_resumo(lojas, resultados)
+    duracao = time.monotonic() - inicio
+    total = sum(len(dados) for _, dados in resultados.values())
+    print(f"\n✅ {len(resultados)}/{len(lojas)} lojas e {total} produtos em {duracao:.1f}s")
+    return total > 0
+
+if __name__ == "__main__":
+    print("🗓️ COLETA MULTI-LOJA")
+    print("=" * 50)
+    main()
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+⚡ Motor assíncrono (asyncio + aiohttp)
+Descoberta das categorias e extração dos produtos em um único pipeline:
+assim que uma página do products.json chega, os produtos dela já começam a
+ser baixados, enquanto as outras categorias continuam sendo listadas.
+Todas as requisições passam por um semáforo (concorrência limitada) e têm
+timeout próprio; respostas 429/5xx e falhas de rede são repetidas com
+backoff (respeitando o Retry-After). O Selenium só é usado, numa thread
+dedicada, quando a listagem JSON não está disponível ou uma página que
+respondeu 200 não traz a tabela.
+"""
+
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from datetime import datetime
+
+import aiohttp
+
+from browser import obter_driver
+from coleta import abrir_csv_saida, coletar_dados_produto, linha_csv
+from coleta_http import CABECALHOS, extrair_tabela_html
+from nutricao import dados_padrao, preencher_dados
+from ritmo import STATUS_TRANSITORIOS, TENTATIVAS_PADRAO, ErroTransitorio, calcular_backoff, ler_retry_after
+from urls import (CATEGORIAS, LIMITE_PAGINA_JSON, ColetorURLsEuropaEstruturaReal,
+                  endpoint_json, produto_de_item_json)
+
+class NavegadorFallback:
+    """
+    Navegador usado apenas quando o HTTP não resolve. Roda numa única thread
+    dedicada, fora do event loop, e só é aberto na primeira utilização.
+    """
+
+    def __init__(self, pool=None, timeout=10):
+        self.pool = pool
+        self.timeout = timeout
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='navegador')
+        self._recursos = ExitStack()
+        self._driver = None
+        self._coletor_urls = None
+
+    async def executar(self, funcao, *args):
+        """Executa uma função bloqueante do Selenium na thread do navegador"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, funcao, *args)
+
+    def coletar_produto(self, url, categoria):
+        if self._driver is None:
+            self._driver = self._recursos.enter_context(obter_driver(self.pool))
+        return coletar_dados_produto(self._driver, url, categoria, self.timeout)
+
+    def descobrir_categoria(self, categoria_url, categoria_nome):
+        if self._coletor_urls is None:
+            self._coletor_urls = ColetorURLsEuropaEstruturaReal(backend='dom', pool=self.pool)
+            self._coletor_urls.setup_driver()
+        return self._coletor_urls.coletar_urls_categoria(categoria_url, categoria_nome)
+
+    def encerrar(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        if self._coletor_urls is not None:
+            self._coletor_urls.encerrar_driver()
+        self._recursos.close()
+
+class MotorAssincrono:
+    """Pipeline assíncrono de descoberta + extração"""
+
+    def __init__(self, categorias=CATEGORIAS, concorrencia=8, timeout=15, pool=None):
+        self.categorias = categorias
+        self.concorrencia = concorrencia
+        self.timeout = timeout
+        self.navegador = NavegadorFallback(pool=pool, timeout=timeout)
+        self.urls_vistas = set()
+        self.produtos = []
+        self._semaforo = None
+        self._sessao = None
+        self._tarefas = []
+        self._escritores_urls = ()
+        self._escritor_dados = None
+
+    async def _baixar(self, url, **kwargs):
+        """GET limitado pelo semáforo; retorna (status, corpo, cabeçalhos)"""
+        async with self._semaforo:
+            async with self._sessao.get(url, **kwargs) as resposta:
+                if 'json' in resposta.content_type:
+                    return resposta.status, await resposta.json(), resposta.headers
+                return resposta.status, await resposta.text(), resposta.headers
+
+    async def _baixar_com_retentativas(self, url, tentativas=TENTATIVAS_PADRAO, **kwargs):
+        """
+        _baixar repetindo 429/5xx e falhas de rede com backoff exponencial (ou o
+        Retry-After do servidor); retorna (status, corpo) e, após a última
+        tentativa, propaga a falha
+        """
+        for tentativa in range(tentativas):
+            try:
+                status, corpo, cabecalhos = await self._baixar(url, **kwargs)
+                if status not in STATUS_TRANSITORIOS:
+                    return status, corpo
+                erro = ErroTransitorio(f"HTTP {status}", ler_retry_after(cabecalhos.get('Retry-After')))
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                erro = e
+            if tentativa == tentativas - 1:
+                raise erro
+
+            espera = max(calcular_backoff(tentativa), getattr(erro, 'espera', None) or 0)
+            print(f"🔁 HTTP {url} ({str(erro) or type(erro).__name__}); tentativa {tentativa + 2}/{tentativas} "
+                  f"em {espera:.1f}s", flush=True)
+            await asyncio.sleep(espera)
+
+    async def _listar_json(self, categoria):
+        """Pagina o products.json da categoria, agendando a extração de cada produto"""
+        endpoint, base = endpoint_json(categoria['url'])
+        pagina = 1
+        encontrados = 0
+        handles_vistos = set()
+
+        while True:
+            status, corpo = await self._baixar_com_retentativas(endpoint,
+                                                                params={'limit': LIMITE_PAGINA_JSON, 'page': pagina})
+            if status != 200 or not isinstance(corpo, dict):
+                raise RuntimeError(f"HTTP {status}")
+
+            itens = corpo.get('products', [])
+            data_coleta = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            novos = [item for item in itens if item['handle'] not in handles_vistos]
+            for item in novos:
+                handles_vistos.add(item['handle'])
+                self._agendar(produto_de_item_json(item, base, categoria['nome'], data_coleta))
+            encontrados += len(novos)
+
+            if not novos:
+                # Servidor que ignora ?page= devolve a mesma página: para na repetição
+                break
+            if len(itens) < LIMITE_PAGINA_JSON:
+                break
+            pagina += 1
+
+        if not encontrados:
+            raise RuntimeError("listagem vazia")
+        return encontrados
+
+    async def _descobrir(self, categoria):
+        """Descobre os produtos de uma categoria (JSON, com fallback para o navegador)"""
+        try:
+            encontrados = await self._listar_json(categoria)
+            print(f"🔗 {categoria['nome']}: {encontrados} produtos (JSON)", flush=True)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ErroTransitorio, RuntimeError, ValueError) as e:
+            print(f"⚠️ {categoria['nome']}: listagem JSON indisponível ({e}), usando navegador", flush=True)
+            produtos = await self.navegador.executar(
+                self.navegador.descobrir_categoria, categoria['url'], categoria['nome']
+            )
+            for produto in produtos:
+                self._agendar(produto)
+
+    def _agendar(self, produto):
+        """Registra a URL (sem duplicatas) e já dispara a extração do produto"""
+        if produto['url'] in self.urls_vistas:
+            return
+        self.urls_vistas.add(produto['url'])
+        self.produtos.append(produto)
+
+        if self._escritores_urls:
+            self._escritores_urls[0].escrever(produto)
+            self._escritores_urls[1].escrever(produto['url'])
+
+        self._tarefas.append(asyncio.create_task(self._extrair(produto)))
+
+    async def _extrair(self, produto):
+        """
+        Extrai os dados de um produto via HTTP. O navegador só entra quando a página
+        respondeu 200 sem a tabela: com o site limitando (429/5xx) ou fora do ar, abrir
+        o Chrome para cada produto só aumentaria a carga
+        """
+        url, categoria = produto['url'], produto['categoria']
+
+        try:
+            status, html = await self._baixar_com_retentativas(url)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ErroTransitorio) as e:
+            print(f"❌ Falha no HTTP após várias tentativas ({e}): {url}", flush=True)
+            return None
+        if status != 200:
+            print(f"❌ HTTP {status}: {url}", flush=True)
+            return None
+
+        # Parsing fora do event loop para não travar as demais requisições
+        dados = await asyncio.to_thread(self._analisar_html, html, url, categoria)
+
+        if dados is None:
+            print(f"🌐 Usando navegador: {url}", flush=True)
+            dados = await self.navegador.executar(self.navegador.coletar_produto, url, categoria)
+        else:
+            print(f"✅ {dados['nome_produto']}: {dados['calorias_kcal']}kcal, {dados['proteinas_g']}g proteína", flush=True)
+
+        if dados and self._escritor_dados:
+            self._escritor_dados.escrever(linha_csv(dados))
+        return dados
+
+    @staticmethod
+    def _analisar_html(html, url, categoria):
+        nome_produto, celulas = extrair_tabela_html(html)
+        if not nome_produto or not celulas:
+            return None
+        return preencher_dados(dados_padrao(nome_produto, url, categoria), celulas)
+
+    async def executar(self, salvar=True):
+        """Roda o pipeline completo, retornando a lista de dados na ordem de descoberta"""
+        self._semaforo = asyncio.Semaphore(self.concorrencia)
+        conector = aiohttp.TCPConnector(limit=self.concorrencia)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+
+        if salvar:
+            self._escritores_urls = ColetorURLsEuropaEstruturaReal.abrir_arquivos()
+            self._escritor_dados = abrir_csv_saida()
+        escritores = [*self._escritores_urls, self._escritor_dados] if salvar else []
+
+        try:
+            async with aiohttp.ClientSession(connector=conector, timeout=timeout, headers=CABECALHOS) as sessao:
+                self._sessao = sessao
+
+                # Descoberta das categorias em paralelo; a extração começa durante a descoberta
+                await asyncio.gather(*(self._descobrir(categoria) for categoria in self.categorias))
+                resultados = await asyncio.gather(*self._tarefas, return_exceptions=True)
+
+            dados_nutricionais = []
+            for produto, resultado in zip(self.produtos, resultados):
+                if isinstance(resultado, BaseException):
+                    print(f"❌ Erro em {produto['url']}: {resultado}", flush=True)
+                elif resultado:
+                    dados_nutricionais.append(resultado)
+
+            # Sem nenhum produto extraído, o último CSV bom é mantido (como em coleta.py)
+            for escritor in self._escritores_urls:
+                if self.produtos:
+                    escritor.concluir()
+                else:
+                    escritor.abortar()
+            if self._escritor_dados:
+                if dados_nutricionais:
+                    self._escritor_dados.concluir()
+                else:
+                    self._escritor_dados.abortar()
+            escritores = []
+
+            return dados_nutricionais
+
+        finally:
+            # Cancelamento (prazo, Ctrl+C) ou erro: descarta arquivos parciais e tarefas pendentes
+            for tarefa in self._tarefas:
+                tarefa.cancel()
+            for escritor in escritores:
+                escritor.abortar()
+            # O encerramento espera o carregamento em curso no Chrome: fora do event loop
+            await asyncio.to_thread(self.navegador.encerrar)
+
+def main(argv=None, pool=None):
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Coleta assíncrona (URLs + dados nutricionais) Max Titanium Europa")
+    parser.add_argument('--concorrencia', type=int, default=8,
+                        help="Máximo de requisições HTTP simultâneas (padrão: 8)")
+    parser.add_argument('--timeout', type=float, default=15,
+                        help="Timeout de cada requisição, em segundos (padrão: 15)")
+    parser.add_argument('--prazo', type=float, default=None,
+                        help="Prazo total da execução em segundos; ao estourar, tudo é cancelado")
+    args = parser.parse_args(argv)
+
+    motor = MotorAssincrono(concorrencia=args.concorrencia, timeout=args.timeout, pool=pool)
+    inicio = time.monotonic()
+
+    try:
+        dados_nutricionais = asyncio.run(asyncio.wait_for(motor.executar(), timeout=args.prazo))
+    except asyncio.TimeoutError:
+        print(f"\n⏰ Prazo de {args.prazo}s esgotado, coleta cancelada")
+        return False
+    except KeyboardInterrupt:
+        print("\n⚠️  Coleta interrompida pelo usuário.")
+        return False
+
+    duracao = time.monotonic() - inicio
+    print(f"\n✅ {len(motor.produtos)} URLs e {len(dados_nutricionais)} produtos em {duracao:.1f}s")
+    return bool(dados_nutricionais)
+
+if __name__ == "__main__":
+    print("⚡ COLETA ASSÍNCRONA")
+    print("=" * 50)
+    main()
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+🏁 Benchmark offline
+Sobe um servidor HTTP local com um catálogo sintético montado a partir das
+páginas de referência em config/fixtures (grid da coleção, listagem
+products.json e página de produto com o dropdown "Informação Nutricional")
+e roda os coletores de URLs e de dados nutricionais contra ele, medindo
+throughput, percentis de latência e memória sem acessar a rede
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager, redirect_stdout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from string import Template
+from urllib.parse import parse_qs, urlparse
+
+from coleta import abrir_csv_saida, coletar_produtos, linha_csv
+from metricas import METRICAS, percentil
+from processos import rss_arvore_mb
+from ritmo import RitmoAdaptativo
+from urls import CATEGORIAS, LIMITE_PAGINA_JSON, ColetorURLsEuropaEstruturaReal, categorias_da_loja
+
+PASTA_FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+TAMANHOS_PADRAO = [20, 1000, 10000]
+
+# Cards por página do grid (como no tema da loja), para exercitar a paginação
+PRODUTOS_POR_PAGINA_GRID = 24
+
+# Sem limite prático de ritmo: o servidor local aguenta o que vier
+TAXA_BENCHMARK = 10000.0
+
+# Intervalo entre as amostras de memória de cada cenário, em segundos
+INTERVALO_MEMORIA = 0.1
+
+def carregar_fixture(nome):
+    with open(os.path.join(PASTA_FIXTURES, nome), 'r', encoding='utf-8') as f:
+        return Template(f.read())
+
+class CatalogoSintetico:
+    """Catálogo com `tamanho` produtos distribuídos entre as categorias reais"""
+
+    def __init__(self, tamanho):
+        self.modelo_colecao = carregar_fixture('colecao.html')
+        self.modelo_card = carregar_fixture('card.html')
+        self.modelo_produto = carregar_fixture('produto.html')
+        self.base = ''
+
+        self.categorias = {}
+        for categoria in CATEGORIAS:
+            handle = urlparse(categoria['url']).path.rstrip('/').split('/')[-1]
+            self.categorias[handle] = {'nome': categoria['nome'], 'produtos': []}
+
+        handles = list(self.categorias)
+        self.produtos = {}
+        for i in range(tamanho):
+            handle_categoria = handles[i % len(handles)]
+            produto = {
+                'handle': f"{handle_categoria}-produto-{i:05d}",
+                'nome': f"Produto {i:05d} ({self.categorias[handle_categoria]['nome']})",
+                'porcao': 30 + i % 10,
+                'calorias': 100 + i % 300,
+                'carboidratos': round(2 + (i % 50) * 0.5, 1),
+                'proteinas': 10 + i % 25,
+                'gorduras': round(1 + (i % 10) * 0.3, 1),
+                'saturadas': round((i % 10) * 0.1, 1),
+                'fibras': i % 5,
+                'sodio': 50 + i % 200
+            }
+            self.produtos[produto['handle']] = produto
+            self.categorias[handle_categoria]['produtos'].append(produto)
+
+    def pagina_colecao(self, handle, pagina=1):
+        categoria = self.categorias[handle]
+        inicio = (pagina - 1) * PRODUTOS_POR_PAGINA_GRID
+        produtos = categoria['produtos'][inicio:inicio + PRODUTOS_POR_PAGINA_GRID]
+        if not produtos and pagina > 1:
+            raise KeyError(pagina)
+
+        cards = ''.join(
+            self.modelo_card.substitute(url=f"{self.base}/products/{produto['handle']}", nome=produto['nome'])
+            for produto in produtos
+        )
+        return self.modelo_colecao.substitute(titulo=categoria['nome'], base=self.base, cards=cards,
+                                              paginacao=self.paginacao(handle, pagina))
+
+    def paginacao(self, handle, pagina):
+        """Links como os do tema: primeiras páginas, "…", última página e "próxima" """
+        ultima = max(1, math.ceil(len(self.categorias[handle]['produtos']) / PRODUTOS_POR_PAGINA_GRID))
+        if ultima == 1:
+            return ''
+        caminho = f"/collections/{handle}"
+        links = [f'<a href="{caminho}?page={numero}">{numero}</a>' for numero in range(1, min(3, ultima) + 1)]
+        if ultima > 3:
+            links += ['<span>…</span>', f'<a href="{caminho}?page={ultima}">{ultima}</a>']
+        if pagina < ultima:
+            links.append(f'<a rel="next" class="pagination__item--next" href="{caminho}?page={pagina + 1}">›</a>')
+        return '\n'.join(links)
+
+    def listagem_json(self, handle, limite, pagina):
+        produtos = self.categorias[handle]['produtos'][(pagina - 1) * limite:pagina * limite]
+        return json.dumps({'products': [{'title': p['nome'], 'handle': p['handle']} for p in produtos]})
+
+    def pagina_produto(self, handle):
+        return self.modelo_produto.substitute(self.produtos[handle])
+
+class ManipuladorCatalogo(BaseHTTPRequestHandler):
+    """Serve /collections/<handle>, /collections/<handle>/products.json e /products/<handle>"""
+
+    catalogo = None
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        partes = [parte for parte in url.path.split('/') if parte]
+
+        try:
+            if len(partes) == 2 and partes[0] == 'collections':
+                pagina = int(parse_qs(url.query).get('page', [1])[0])
+                self._responder(self.catalogo.pagina_colecao(partes[1], pagina), 'text/html; charset=utf-8')
+            elif len(partes) == 3 and partes[0] == 'collections' and partes[2] == 'products.json':
+                parametros = parse_qs(url.query)
+                limite = int(parametros.get('limit', [LIMITE_PAGINA_JSON])[0])
+                pagina = int(parametros.get('page', [1])[0])
+                self._responder(self.catalogo.listagem_json(partes[1], limite, pagina), 'application/json')
+            elif len(partes) == 2 and partes[0] == 'products':
+                self._responder(self.catalogo.pagina_produto(partes[1]), 'text/html; charset=utf-8')
+            else:
+                self.send_error(404)
+        except KeyError:
+            self.send_error(404)
+
+    def _responder(self, corpo, tipo):
+        dados = corpo.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', tipo)
+        self.send_header('Content-Length', str(len(dados)))
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def log_message(self, formato, *args):
+        pass
+
+@contextmanager
+def servidor_local(catalogo):
+    """Sobe o servidor numa porta livre de 127.0.0.1 e retorna a URL base"""
+    manipulador = type('ManipuladorBenchmark', (ManipuladorCatalogo,), {'catalogo': catalogo})
+    servidor = ThreadingHTTPServer(('127.0.0.1', 0), manipulador)
+    servidor.daemon_threads = True
+    catalogo.base = f"http://127.0.0.1:{servidor.server_address[1]}"
+
+    thread = threading.Thread(target=servidor.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield catalogo.base
+    finally:
+        servidor.shutdown()
+        servidor.server_close()
+
+class AmostradorMemoria:
+    """
+    Pico de memória residente do processo e dos navegadores filhos durante um
+    cenário (amostrado em /proc; None fora do Linux). O ru_maxrss não serve:
+    é o pico do processo desde o início, acumulado entre os cenários.
+    """
+
+    def __init__(self, intervalo=INTERVALO_MEMORIA):
+        self.intervalo = intervalo
+        self.pico = None
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._amostrar, daemon=True)
+
+    def _amostrar(self):
+        while True:
+            atual = rss_arvore_mb(os.getpid())
+            if atual is not None:
+                self.pico = max(self.pico or 0.0, atual)
+            if self._parar.wait(self.intervalo):
+                return
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *erro):
+        self._parar.set()
+        self._thread.join()
+
+def latencias_produtos():
+    """Duração total de cada produto, ordenada (sem os registros de categoria da descoberta)"""
+    return sorted(registro['total'] for registro in METRICAS.registros if registro.get('tipo') != 'categoria')
+
+def executar_cenario(tamanho, motor='http', backend='json', workers=4, pool=None, verboso=False):
+    """Roda descoberta + extração contra um catálogo local de `tamanho` produtos"""
+    catalogo = CatalogoSintetico(tamanho)
+    with servidor_local(catalogo) as base, tempfile.TemporaryDirectory() as pasta, \
+            open(os.devnull, 'w', encoding='utf-8') as nulo:
+        METRICAS.reiniciar()
+        ritmo = RitmoAdaptativo(taxa=TAXA_BENCHMARK, capacidade=workers, taxa_maxima=TAXA_BENCHMARK)
+        escritor = abrir_csv_saida(os.path.join(pasta, 'dados_nutricionais.csv'))
+
+        with redirect_stdout(sys.stdout if verboso else nulo), AmostradorMemoria() as memoria:
+            inicio = time.perf_counter()
+            coletor = ColetorURLsEuropaEstruturaReal(backend=backend, pool=pool, ritmo=ritmo,
+                                                     categorias=categorias_da_loja(base))
+            produtos = coletor.coletar_todas_urls()
+            duracao_urls = time.perf_counter() - inicio
+
+            # Sem reaproveitamento de tabelas: as tabelas sintéticas se repetem e o cenário
+            # mediria acertos do cache em vez da extração
+            resultados = coletar_produtos(produtos, motor=motor, num_workers=workers, max_por_host=workers,
+                                          pool=pool, ritmo=ritmo, variantes='nenhum',
+                                          ao_coletar=lambda dados: escritor.escrever(linha_csv(dados)))
+            duracao_total = time.perf_counter() - inicio
+
+        escritor.concluir()
+
+    coletados = sum(1 for dados in resultados if dados)
+    latencias = latencias_produtos()
+    duracao_dados = duracao_total - duracao_urls
+
+    return {
+        'tamanho': tamanho,
+        'motor': motor,
+        'backend': backend,
+        'workers': workers,
+        'urls': len(produtos),
+        'coletados': coletados,
+        'duracao_urls_s': round(duracao_urls, 3),
+        'duracao_total_s': round(duracao_total, 3),
+        'produtos_por_s': round(coletados / duracao_dados, 2) if duracao_dados else None,
+        'latencia_p50_s': round(percentil(latencias, 0.5), 4),
+        'latencia_p95_s': round(percentil(latencias, 0.95), 4),
+        'latencia_p99_s': round(percentil(latencias, 0.99), 4),
+        'memoria_max_mb': round(memoria.pico, 1) if memoria.pico is not None else None
+    }
+
+def exibir_resultado(resultado):
+    print(f"\n📦 {resultado['tamanho']} produtos (motor {resultado['motor']}, backend {resultado['backend']}, "
+          f"{resultado['workers']} workers)")
+    print(f"  • URLs: {resultado['urls']} em {resultado['duracao_urls_s']}s")
+    print(f"  • Coletados: {resultado['coletados']} | total {resultado['duracao_total_s']}s | "
+          f"{resultado['produtos_por_s']} produtos/s")
+    print(f"  • Latência por produto: p50 {resultado['latencia_p50_s']}s | p95 {resultado['latencia_p95_s']}s | "
+          f"p99 {resultado['latencia_p99_s']}s")
+    if resultado['memoria_max_mb'] is not None:
+        print(f"  • Memória máxima no cenário: {resultado['memoria_max_mb']} MB")
+
+def main(argv=None, pool=None):
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Benchmark offline dos coletores (servidor HTTP local)")
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=TAMANHOS_PADRAO,
+                        help=f"Tamanhos de catálogo a testar (padrão: {' '.join(map(str, TAMANHOS_PADRAO))})")
+    parser.add_argument('--motor', choices=['http', 'selenium'], default='http',
+                        help="Motor de extração (padrão: http)")
+    parser.add_argument('--backend', choices=['json', 'dom'], default='json',
+                        help="Descoberta de URLs (padrão: json)")
+    parser.add_argument('--workers', type=int, default=4,
+                        help="Workers em paralelo (padrão: 4)")
+    parser.add_argument('--saida', default=None,
+                        help="Grava os resultados em JSON (ex.: dados/benchmark.json)")
+    parser.add_argument('--verboso', action='store_true',
+                        help="Mostra a saída dos coletores durante o benchmark")
+    args = parser.parse_args(argv)
+
+    resultados = []
+    for tamanho in args.tamanhos:
+        resultado = executar_cenario(tamanho, motor=args.motor, backend=args.backend, workers=max(1, args.workers),
+                                     pool=pool, verboso=args.verboso)
+        exibir_resultado(resultado)
+        resultados.append(resultado)
+
+    if args.saida:
+        os.makedirs(os.path.dirname(args.saida) or '.', exist_ok=True)
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            json.dump(resultados, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 Resultados salvos em: {args.saida}")
+
+    return all(resultado['coletados'] == resultado['tamanho'] for resultado in resultados)
+
+if __name__ == "__main__":
+    print("🏁 BENCHMARK OFFLINE")
+    print("=" * 50)
+    main()
@@ -7,24 +7,123 @@ Compatível com Linux e Windows
 
 import os
 import sys
+import json
+import argparse
 import platform
 import shutil
+import subprocess
+import threading
+from contextlib import contextmanager
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from ciclo_driver import DriverGerenciado
+from metricas import medir
+from perfil_enxuto import (PERFIL_COMPLETO, PERFIL_ENXUTO, PERFIL_PADRAO, aplicar_perfil,
+                           formatar_bytes, medir_transferencia)
+
+# Cache em disco do resultado da detecção (navegador, chromedriver e versão)
+CAMINHO_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'dados', '.cache_navegador.json')
+
+def _mtime(caminho):
+    """Retorna o mtime de um arquivo, ou None se não existir"""
+    try:
+        return os.path.getmtime(caminho)
+    except (OSError, TypeError):
+        return None
 
 class BrowserDetector:
     """Classe para detectar e configurar navegadores automaticamente"""
     
-    def __init__(self):
+    def __init__(self, caminho_cache=CAMINHO_CACHE):
         self.sistema = platform.system().lower()
         self.navegador_encontrado = None
         self.caminho_navegador = None
         self.driver_path = None
+        self.versao_navegador = None
+        self.caminho_cache = caminho_cache
+        self.cache_hit = None
+        self._detectado = False
+        
+    def obter_versao_navegador(self):
+        """Lê a versão do navegador (ex.: 'Google Chrome 126.0.6478.126')"""
+        try:
+            resultado = subprocess.run([self.caminho_navegador, '--version'],
+                                       capture_output=True, text=True, timeout=10)
+            return resultado.stdout.strip() or None
+        except Exception:
+            return None
+    
+    def carregar_cache(self):
+        """
+        Carrega a detecção salva em disco. O cache só é válido se o navegador e o
+        chromedriver ainda existirem com o mesmo mtime da detecção original.
+        """
+        try:
+            with open(self.caminho_cache, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return False
+        
+        if cache.get('sistema') != self.sistema:
+            return False
+        if _mtime(cache.get('caminho_navegador')) != cache.get('mtime_navegador'):
+            return False
+        if cache.get('driver_path'):
+            if _mtime(cache['driver_path']) != cache.get('mtime_driver'):
+                return False
+        elif shutil.which("chromedriver") or shutil.which("chromedriver.exe"):
+            # Um chromedriver foi instalado depois da última detecção
+            return False
+        
+        self.navegador_encontrado = cache['navegador']
+        self.caminho_navegador = cache['caminho_navegador']
+        self.driver_path = cache.get('driver_path')
+        self.versao_navegador = cache.get('versao_navegador')
+        return True
+    
+    def salvar_cache(self):
+        """Salva o resultado da detecção em disco"""
+        cache = {
+            'sistema': self.sistema,
+            'navegador': self.navegador_encontrado,
+            'caminho_navegador': self.caminho_navegador,
+            'mtime_navegador': _mtime(self.caminho_navegador),
+            'versao_navegador': self.versao_navegador,
+            'driver_path': self.driver_path,
+            'mtime_driver': _mtime(self.driver_path)
+        }
+        try:
+            os.makedirs(os.path.dirname(self.caminho_cache), exist_ok=True)
+            with open(self.caminho_cache, 'w', encoding='utf-8') as f:
+                json.dump(cache, f, indent=2)
+        except OSError as e:
+            print(f"⚠️ Não foi possível salvar o cache do navegador: {e}", flush=True)
+    
+    def detectar(self, usar_cache=True):
+        """Detecta navegador e ChromeDriver, usando o cache em disco quando válido"""
+        if self._detectado:
+            return True
+        
+        if usar_cache and self.carregar_cache():
+            self.cache_hit = True
+            self._detectado = True
+            print(f"⚡ Navegador em cache: {self.navegador_encontrado} ({self.caminho_navegador})", flush=True)
+            return True
         
+        self.cache_hit = False
+        if not self.detectar_navegador():
+            return False
+        
+        self.detectar_chromedriver()
+        self.versao_navegador = self.obter_versao_navegador()
+        self.salvar_cache()
+        self._detectado = True
+        return True
+    
     def detectar_navegador(self):
         """Detecta qual navegador está disponível no sistema"""
         print("🔍 Detectando navegador disponível...", flush=True)
@@ -91,7 +190,6 @@ class BrowserDetector:
         options.add_argument("--disable-gpu")
         options.add_argument("--disable-extensions")
         options.add_argument("--disable-plugins")
-        options.add_argument("--disable-images")
         options.add_argument("--disable-javascript")
         options.add_argument("--window-size=1920,1080")
         
@@ -155,34 +253,40 @@ class BrowserDetector:
         print("💡 Tentando usar ChromeDriver padrão do Selenium...", flush=True)
         return False
     
-    def criar_driver(self, headless=True, zoom=100):
-        """Cria e retorna uma instância do WebDriver configurada"""
+    def criar_driver(self, headless=True, zoom=100, perfil=PERFIL_PADRAO, permitidos=()):
+        """
+        Cria e retorna uma instância do WebDriver configurada.
+        
+        No perfil 'enxuto', imagens, fontes e scripts de terceiros são bloqueados
+        (exceto os da allow-list `permitidos`).
+        """
         print("🚀 Configurando WebDriver...", flush=True)
         
-        # Detectar navegador
-        if not self.detectar_navegador():
+        # Detectar navegador e ChromeDriver (ou reaproveitar o cache)
+        if not self.detectar():
             raise Exception("❌ Nenhum navegador compatível encontrado. Instale Google Chrome ou Chromium.")
         
         # Configurar opções
         options = self.configurar_opcoes(headless=headless, zoom=zoom)
         
-        # Detectar ChromeDriver
-        self.detectar_chromedriver()
-        
         try:
             # Tentar criar driver com caminho específico
-            if self.driver_path:
-                service = Service(self.driver_path)
-                driver = webdriver.Chrome(service=service, options=options)
-            else:
-                # Usar driver padrão do Selenium
-                driver = webdriver.Chrome(options=options)
+            with medir('criacao_driver'):
+                if self.driver_path:
+                    service = Service(self.driver_path)
+                    driver = webdriver.Chrome(service=service, options=options)
+                else:
+                    # Usar driver padrão do Selenium
+                    driver = webdriver.Chrome(options=options)
+            
+            aplicar_perfil(driver, perfil, permitidos)
             
             print(f"✅ WebDriver criado com sucesso!", flush=True)
             print(f"📱 Navegador: {self.navegador_encontrado}", flush=True)
             print(f"🖥️ Sistema: {self.sistema.title()}", flush=True)
             print(f"👁️ Modo: {'Headless' if headless else 'Visual'}", flush=True)
             print(f"🔍 Zoom: {zoom}%", flush=True)
+            print(f"🪶 Perfil: {perfil}", flush=True)
             
             return driver
             
@@ -193,7 +297,9 @@ class BrowserDetector:
             if self.driver_path:
                 print("🔄 Tentando sem caminho específico do driver...", flush=True)
                 try:
-                    driver = webdriver.Chrome(options=options)
+                    with medir('criacao_driver'):
+                        driver = webdriver.Chrome(options=options)
+                    aplicar_perfil(driver, perfil, permitidos)
                     print("✅ WebDriver criado com sucesso (método alternativo)!", flush=True)
                     return driver
                 except Exception as e2:
@@ -208,23 +314,184 @@ class BrowserDetector:
             'navegador': self.navegador_encontrado,
             'caminho_navegador': self.caminho_navegador,
             'driver_path': self.driver_path,
+            'versao_navegador': self.versao_navegador,
+            'cache_hit': self.cache_hit,
+            'caminho_cache': os.path.normpath(self.caminho_cache),
             'python_version': sys.version,
             'platform': platform.platform()
         }
         return info
 
+def aplicar_zoom(driver, zoom=100):
+    """Ajusta o zoom de um driver já aberto (equivalente ao --force-device-scale-factor)"""
+    if zoom == 100:
+        driver.execute_cdp_cmd("Emulation.clearDeviceMetricsOverride", {})
+        return
+    
+    fator = zoom / 100
+    driver.execute_cdp_cmd("Emulation.setDeviceMetricsOverride", {
+        'width': int(1920 / fator),
+        'height': int(1080 / fator),
+        'deviceScaleFactor': fator,
+        'mobile': False
+    })
+
+class PoolDrivers:
+    """
+    Mantém navegadores abertos durante a sessão para serem emprestados às etapas
+    (coleta de URLs, teste, coleta de dados), evitando uma nova inicialização
+    do Chrome a cada etapa
+    """
+    
+    def __init__(self, headless=True, max_ociosos=4):
+        self.headless = headless
+        self.max_ociosos = max_ociosos
+        self.detector = BrowserDetector()
+        self._ociosos = []
+        self._lock = threading.Lock()
+    
+    def _driver_ativo(self, driver):
+        """Verifica se o navegador ainda responde"""
+        try:
+            driver.current_url
+            return True
+        except Exception:
+            return False
+    
+    def _descartar(self, driver):
+        try:
+            driver.quit()
+        except Exception:
+            pass
+    
+    def _devolver(self, driver):
+        # Um navegador encerrado (ex.: reciclado pelo DriverGerenciado) não volta ao pool
+        if not self._driver_ativo(driver):
+            self._descartar(driver)
+            return
+        with self._lock:
+            if len(self._ociosos) < self.max_ociosos:
+                self._ociosos.append(driver)
+                return
+        self._descartar(driver)
+    
+    @contextmanager
+    def emprestar(self, zoom=100, perfil=PERFIL_PADRAO, permitidos=()):
+        """Empresta um driver do pool (criando um novo se não houver ocioso)"""
+        driver = None
+        with self._lock:
+            while self._ociosos and driver is None:
+                candidato = self._ociosos.pop()
+                if self._driver_ativo(candidato):
+                    driver = candidato
+                else:
+                    self._descartar(candidato)
+        
+        if driver is None:
+            driver = self.detector.criar_driver(headless=self.headless, perfil=perfil, permitidos=permitidos)
+        else:
+            print("♻️ Reutilizando navegador já aberto", flush=True)
+            aplicar_perfil(driver, perfil, permitidos)
+        
+        try:
+            aplicar_zoom(driver, zoom)
+            yield driver
+        except Exception:
+            # O driver pode ter ficado em estado inconsistente
+            self._descartar(driver)
+            raise
+        else:
+            self._devolver(driver)
+    
+    def encerrar(self):
+        """Fecha todos os navegadores ociosos"""
+        with self._lock:
+            ociosos, self._ociosos = self._ociosos, []
+        for driver in ociosos:
+            self._descartar(driver)
+
 # Funções de conveniência
-def criar_driver_automatico(headless=True, zoom=100):
+def criar_driver_automatico(headless=True, zoom=100, perfil=PERFIL_PADRAO, permitidos=()):
     """Cria um driver automaticamente detectando o navegador"""
     detector = BrowserDetector()
-    return detector.criar_driver(headless=headless, zoom=zoom)
+    return detector.criar_driver(headless=headless, zoom=zoom, perfil=perfil, permitidos=permitidos)
 
-def testar_configuracao():
+@contextmanager
+def obter_driver(pool=None, headless=True, zoom=100, detector=None, perfil=PERFIL_PADRAO, permitidos=(), ciclo=None):
+    """
+    Empresta um driver do pool ou, sem pool, cria um novo e o encerra ao final.
+    
+    Com `ciclo` (ex.: {'max_paginas': 150, 'limite_rss_mb': 1500}), retorna um
+    DriverGerenciado que recicla e reinicia o navegador durante a coleta.
+    """
+    if ciclo is not None:
+        gerenciado = DriverGerenciado(
+            lambda: obter_driver(pool, headless=headless, zoom=zoom, detector=detector, perfil=perfil,
+                                 permitidos=permitidos),
+            **ciclo
+        )
+        try:
+            yield gerenciado
+        finally:
+            gerenciado.encerrar()
+        return
+    
+    if pool is not None:
+        with pool.emprestar(zoom=zoom, perfil=perfil, permitidos=permitidos) as driver:
+            yield driver
+        return
+    
+    detector = detector or BrowserDetector()
+    driver = detector.criar_driver(headless=headless, zoom=zoom, perfil=perfil, permitidos=permitidos)
+    try:
+        yield driver
+    finally:
+        driver.quit()
+
+def medir_pagina(driver, url, perfil, permitidos=()):
+    """Carrega a URL sem cache no perfil indicado e retorna os bytes transferidos"""
+    aplicar_perfil(driver, perfil, permitidos)
+    driver.execute_cdp_cmd("Network.setCacheDisabled", {'cacheDisabled': True})
+    try:
+        driver.get(url)
+        WebDriverWait(driver, 15).until(
+            EC.presence_of_element_located((By.TAG_NAME, "body"))
+        )
+        return medir_transferencia(driver)
+    finally:
+        driver.execute_cdp_cmd("Network.setCacheDisabled", {'cacheDisabled': False})
+
+def comparar_perfis(urls, pool=None, permitidos=()):
+    """
+    Carrega cada URL no perfil completo e no enxuto, exibindo os bytes
+    economizados por página. Retorna a economia total em bytes.
+    """
+    economia_total = 0
+    
+    with obter_driver(pool, headless=True, perfil=PERFIL_COMPLETO) as driver:
+        for url in urls:
+            completo = medir_pagina(driver, url, PERFIL_COMPLETO)
+            enxuto = medir_pagina(driver, url, PERFIL_ENXUTO, permitidos)
+            economia = completo['bytes'] - enxuto['bytes']
+            economia_total += economia
+            
+            percentual = (economia / completo['bytes'] * 100) if completo['bytes'] else 0
+            print(f"📉 {url}", flush=True)
+            print(f"   completo: {formatar_bytes(completo['bytes'])} ({completo['recursos']} recursos) | "
+                  f"enxuto: {formatar_bytes(enxuto['bytes'])} ({enxuto['recursos']} recursos) | "
+                  f"economia: {formatar_bytes(max(economia, 0))} ({percentual:.0f}%)", flush=True)
+        
+        # O driver pode voltar ao pool: restaura o perfil padrão
+        aplicar_perfil(driver, PERFIL_PADRAO)
+    
+    return economia_total
+
+def testar_configuracao(pool=None):
     """Testa a configuração do navegador"""
     print("🧪 TESTANDO CONFIGURAÇÃO DO NAVEGADOR")
     print("=" * 50)
     
-    detector = BrowserDetector()
+    detector = pool.detector if pool is not None else BrowserDetector()
     
     # Mostrar informações do sistema
     print(f"🖥️ Sistema Operacional: {detector.sistema.title()}")
@@ -232,23 +499,20 @@ def testar_configuracao():
     print(f"🌐 Plataforma: {platform.platform()}")
     
     try:
-        # Tentar criar driver
-        driver = detector.criar_driver(headless=True, zoom=100)
-        
-        # Testar navegação
-        print("\n🔍 Testando navegação...", flush=True)
-        driver.get("https://www.google.com")
-        
-        # Verificar se a página carregou
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.TAG_NAME, "body"))
-        )
-        
-        titulo = driver.title
-        print(f"✅ Página carregada: {titulo}", flush=True)
+        # Tentar criar (ou emprestar) driver
+        with obter_driver(pool, headless=True, zoom=100, detector=detector) as driver:
+            # Testar navegação
+            print("\n🔍 Testando navegação...", flush=True)
+            driver.get("https://www.google.com")
+            
+            # Verificar se a página carregou
+            WebDriverWait(driver, 10).until(
+                EC.presence_of_element_located((By.TAG_NAME, "body"))
+            )
+            
+            titulo = driver.title
+            print(f"✅ Página carregada: {titulo}", flush=True)
         
-        # Fechar driver
-        driver.quit()
         print("✅ Teste concluído com sucesso!", flush=True)
         
         # Mostrar informações finais
@@ -257,6 +521,8 @@ def testar_configuracao():
         print(f"  • Navegador: {info['navegador']}")
         print(f"  • Caminho: {info['caminho_navegador']}")
         print(f"  • Driver: {info['driver_path'] or 'Padrão do Selenium'}")
+        print(f"  • Versão: {info['versao_navegador'] or 'Desconhecida'}")
+        print(f"  • Cache: {'hit' if info['cache_hit'] else 'miss'} ({info['caminho_cache']})")
         
         return True
         
@@ -265,5 +531,15 @@ def testar_configuracao():
         return False
 
 if __name__ == "__main__":
-    # Executar teste se chamado diretamente
-    testar_configuracao() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Teste de configuração do navegador")
+    parser.add_argument('--comparar-perfis', nargs='+', metavar='URL',
+                        help="Mede os bytes baixados por página nos perfis completo e enxuto")
+    parser.add_argument('--permitir', nargs='*', default=[],
+                        help="Allow-list do perfil enxuto: domínios ou extensões que não devem ser bloqueados")
+    args = parser.parse_args()
+    
+    if args.comparar_perfis:
+        comparar_perfis(args.comparar_perfis, permitidos=args.permitir)
+    else:
+        # Executar teste se chamado diretamente
+        testar_configuracao() 
\ No newline at end of file
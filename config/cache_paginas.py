@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+🗂️ Cache de páginas de produto
+Guarda, por URL, o ETag/Last-Modified da última resposta e um hash do HTML
+do dropdown "Informação Nutricional", para que só os produtos cuja tabela
+mudou sejam extraídos novamente. As entradas novas ficam pendentes até a
+linha do produto entrar no CSV concluído (confirmar); numa coleta abortada
+elas são descartadas, para o próximo --incremental não reaproveitar uma
+linha antiga como se estivesse atualizada
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+CAMINHO_CACHE_PAGINAS = 'dados/cache_paginas.json'
+
+def hash_conteudo(html):
+    """Hash SHA-256 do HTML extraído"""
+    return hashlib.sha256(html.encode('utf-8')).hexdigest()
+
+class CachePaginas:
+    """Metadados de validação HTTP e hash da tabela de cada produto"""
+    
+    def __init__(self, caminho=CAMINHO_CACHE_PAGINAS):
+        self.caminho = caminho
+        self._entradas = {}
+        self._pendentes = {}
+        self._lock = threading.Lock()
+        self.carregar()
+    
+    def carregar(self):
+        """Lê o cache do disco (cache ausente ou corrompido = cache vazio)"""
+        try:
+            with open(self.caminho, 'r', encoding='utf-8') as f:
+                self._entradas = json.load(f)
+        except (OSError, ValueError):
+            self._entradas = {}
+    
+    def salvar(self):
+        """Grava o cache em disco de forma atômica"""
+        with self._lock:
+            conteudo = json.dumps(self._entradas, ensure_ascii=False, indent=2)
+        
+        os.makedirs(os.path.dirname(self.caminho) or '.', exist_ok=True)
+        temporario = self.caminho + '.tmp'
+        with open(temporario, 'w', encoding='utf-8') as f:
+            f.write(conteudo)
+        os.replace(temporario, self.caminho)
+    
+    def cabecalhos_condicionais(self, url):
+        """Cabeçalhos If-None-Match / If-Modified-Since para a URL"""
+        with self._lock:
+            entrada = self._entradas.get(url, {})
+        
+        cabecalhos = {}
+        if entrada.get('etag'):
+            cabecalhos['If-None-Match'] = entrada['etag']
+        if entrada.get('last_modified'):
+            cabecalhos['If-Modified-Since'] = entrada['last_modified']
+        return cabecalhos
+    
+    def tabela_inalterada(self, url, hash_tabela):
+        """True se o hash da tabela é igual ao da última extração"""
+        with self._lock:
+            return self._entradas.get(url, {}).get('hash_tabela') == hash_tabela
+    
+    def atualizar(self, url, cabecalhos_resposta, hash_tabela):
+        """Registra (pendente) os validadores HTTP e o hash da tabela da última resposta"""
+        with self._lock:
+            self._pendentes[url] = {
+                'etag': cabecalhos_resposta.get('ETag'),
+                'last_modified': cabecalhos_resposta.get('Last-Modified'),
+                'hash_tabela': hash_tabela
+            }
+    
+    def confirmar(self, urls):
+        """Efetiva as entradas pendentes das URLs cujas linhas foram gravadas no CSV"""
+        with self._lock:
+            for url in urls:
+                if url in self._pendentes:
+                    self._entradas[url] = self._pendentes.pop(url)
+            self._pendentes.clear()
+    
+    def descartar(self):
+        """Descarta as entradas pendentes (coleta abortada)"""
+        with self._lock:
+            self._pendentes.clear()
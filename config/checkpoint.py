@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+💾 Checkpoint da coleta de dados nutricionais
+Registro append-only (JSON lines) dos produtos já coletados, gravado em disco
+a cada produto para que uma execução interrompida possa ser retomada
+"""
+
+import json
+import os
+import threading
+
+CAMINHO_CHECKPOINT = 'dados/dados_nutricionais.checkpoint.jsonl'
+
+class CheckpointColeta:
+    """Armazena os dados coletados por URL, um registro por linha"""
+    
+    def __init__(self, caminho=CAMINHO_CHECKPOINT):
+        self.caminho = caminho
+        self._lock = threading.Lock()
+    
+    def carregar(self):
+        """Retorna {url: dados} com o último registro de cada URL"""
+        coletados = {}
+        if not os.path.exists(self.caminho):
+            return coletados
+        
+        with open(self.caminho, 'r', encoding='utf-8') as f:
+            for linha in f:
+                try:
+                    dados = json.loads(linha)
+                except ValueError:
+                    # Última linha incompleta (execução interrompida durante a escrita)
+                    continue
+                coletados[dados['url']] = dados
+        
+        return coletados
+    
+    def registrar(self, dados):
+        """Acrescenta os dados de um produto e força a gravação em disco"""
+        linha = json.dumps(dados, ensure_ascii=False) + '\n'
+        with self._lock:
+            with open(self.caminho, 'a', encoding='utf-8') as f:
+                f.write(linha)
+                f.flush()
+                os.fsync(f.fileno())
+    
+    def limpar(self):
+        """Descarta o checkpoint de execuções anteriores"""
+        with self._lock:
+            if os.path.exists(self.caminho):
+                os.remove(self.caminho)
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+♻️ Ciclo de vida do navegador em coletas longas
+DriverGerenciado se comporta como o WebDriver, mas troca o navegador por
+baixo: recicla o Chrome após N páginas ou quando a memória residente passa
+do limite, limpa cache e cookies entre produtos e reinicia o navegador
+quando ele para de responder (WebDriverException), para que a memória e o
+throughput se mantenham estáveis em catálogos grandes
+"""
+
+import functools
+from contextlib import ExitStack
+
+from selenium.common.exceptions import WebDriverException
+
+from metricas import medir
+from processos import rss_arvore_mb
+
+# Páginas carregadas antes de trocar o navegador (0 = sem limite)
+MAX_PAGINAS_PADRAO = 150
+
+# Memória residente do Chrome (todos os processos) que força a troca, em MB (0 = sem limite)
+LIMITE_RSS_MB_PADRAO = 1500
+
+CICLO_PADRAO = {'max_paginas': MAX_PAGINAS_PADRAO, 'limite_rss_mb': LIMITE_RSS_MB_PADRAO}
+
+SCRIPT_LIMPAR_ARMAZENAMENTO = """
+try { window.localStorage.clear(); window.sessionStorage.clear(); } catch (e) {}
+"""
+
+class DriverGerenciado:
+    """
+    Proxy do WebDriver. `fabrica()` retorna um context manager que fornece um
+    navegador novo (ex.: obter_driver com pool e perfil); cada troca fecha o
+    anterior e abre outro na próxima chamada.
+    """
+
+    def __init__(self, fabrica, max_paginas=MAX_PAGINAS_PADRAO, limite_rss_mb=LIMITE_RSS_MB_PADRAO, limpar=True):
+        self._driver = None
+        self._recursos = None
+        self._fabrica = fabrica
+        self.max_paginas = max_paginas
+        self.limite_rss_mb = limite_rss_mb
+        self.limpar = limpar
+        self.paginas = 0
+        self.reciclagens = 0
+        self.reinicios = 0
+
+    @property
+    def driver(self):
+        """Navegador atual (aberto sob demanda)"""
+        if self._driver is None:
+            recursos = ExitStack()
+            self._driver = recursos.enter_context(self._fabrica())
+            self._recursos = recursos
+            self.paginas = 0
+        return self._driver
+
+    def __getattr__(self, nome):
+        # Só é chamado para atributos do WebDriver (os do proxy são encontrados antes)
+        atributo = getattr(self.driver, nome)
+        if not callable(atributo):
+            return atributo
+
+        @functools.wraps(atributo)
+        def chamada(*args, **kwargs):
+            try:
+                return atributo(*args, **kwargs)
+            except WebDriverException:
+                # Navegador morto: o próximo uso (ex.: a retentativa do produto) já abre outro
+                if not self.ativo():
+                    self.reiniciar("navegador não responde")
+                raise
+        return chamada
+
+    def get(self, url):
+        carregar = self.__getattr__('get')
+        self.paginas += 1
+        return carregar(url)
+
+    def ativo(self):
+        """Verifica se o navegador atual ainda responde"""
+        if self._driver is None:
+            return True
+        try:
+            self._driver.current_url
+            return True
+        except Exception:
+            return False
+
+    def _fechar(self, encerrar):
+        """Fecha o navegador atual; com `encerrar`, garante que ele não volte ao pool"""
+        driver, recursos = self._driver, self._recursos
+        self._driver = self._recursos = None
+        if driver is None:
+            return
+        if encerrar:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+        try:
+            recursos.close()
+        except Exception:
+            pass
+
+    def reiniciar(self, motivo):
+        print(f"🔄 Reiniciando navegador ({motivo})", flush=True)
+        self._fechar(encerrar=True)
+        self.reinicios += 1
+
+    def reciclar(self, motivo):
+        print(f"♻️ Reciclando navegador ({motivo})", flush=True)
+        with medir('reciclagem_driver'):
+            self._fechar(encerrar=True)
+        self.reciclagens += 1
+
+    def rss_mb(self):
+        """Memória residente do chromedriver + Chrome, em MB (None se não for possível medir)"""
+        servico = getattr(self._driver, 'service', None)
+        processo = getattr(servico, 'process', None)
+        return rss_arvore_mb(getattr(processo, 'pid', None))
+
+    def limpar_estado(self):
+        """Limpa cache, cookies e armazenamento local do navegador atual"""
+        try:
+            with medir('limpeza_driver'):
+                self._driver.execute_cdp_cmd('Network.clearBrowserCache', {})
+                self._driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+                self._driver.execute_script(SCRIPT_LIMPAR_ARMAZENAMENTO)
+        except WebDriverException:
+            if not self.ativo():
+                self.reiniciar("navegador não responde")
+
+    def preparar_produto(self):
+        """Chamado antes de cada produto: recicla o navegador se preciso, senão limpa o estado"""
+        if self._driver is None:
+            return
+
+        if self.max_paginas and self.paginas >= self.max_paginas:
+            self.reciclar(f"{self.paginas} páginas")
+            return
+
+        if self.limite_rss_mb:
+            rss = self.rss_mb()
+            if rss is not None and rss > self.limite_rss_mb:
+                self.reciclar(f"{rss:.0f} MB de memória")
+                return
+
+        if self.limpar:
+            self.limpar_estado()
+
+    def encerrar(self):
+        """Devolve o navegador atual (ao pool ou encerrando-o)"""
+        if self.reciclagens or self.reinicios:
+            print(f"♻️ Navegador reciclado {self.reciclagens}x e reiniciado {self.reinicios}x", flush=True)
+        self._fechar(encerrar=False)
@@ -7,193 +7,612 @@ Script final para coletar dados nutricionais de todos os produtos Max Titanium E
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from urllib3.exceptions import HTTPError as ErroConexaoDriver
+import argparse
 import csv
-import re
-import time
+import json
+import os
+import queue
+import threading
 import sys
-from browser import criar_driver_automatico
-
-def extrair_numero(texto):
-    """Extrai número de um texto, retornando 0 se não encontrar"""
-    if not texto:
-        return 0
-    match = re.search(r'(\d+(?:\.\d+)?)', texto.replace(',', '.'))
-    if match:
-        return float(match.group(1))
-    return 0
-
-def coletar_dados_produto(driver, url, categoria):
-    """Coleta dados nutricionais de um produto"""
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+from browser import obter_driver
+from ciclo_driver import CICLO_PADRAO, LIMITE_RSS_MB_PADRAO, MAX_PAGINAS_PADRAO, DriverGerenciado
+from perfil_enxuto import PERFIL_PADRAO, PERFIS
+from coleta_http import criar_sessao, coletar_dados_produto_http
+from checkpoint import CheckpointColeta
+from historico import registrar_historico
+from escrita import EscritorCSVStreaming, EscritorColunar, FORMATOS_COLUNARES, colunar_disponivel
+from cache_paginas import CachePaginas
+from eventos import emitir, emitir_para, relatar_erro
+from metricas import METRICAS, medir, produto_medido
+from ritmo import TAXA_PADRAO, ErroTransitorio, RitmoAdaptativo, com_retentativas
+from nutricao import CAMPOS_DADOS, CAMPOS_NUMERICOS, dados_padrao, preencher_dados
+from supervisor import PRAZO_PADRAO, Supervisor, servir
+from variantes import MODO_PADRAO, MODOS_VARIANTES, TabelasCompartilhadas, coletar_por_variantes
+from esperas import TIMEOUT_PADRAO, aguardar_dropdown, abrir_dropdown, aguardar_tabela, aguardar_linhas_estaveis
+
+# Lê o h1 e todas as linhas da tabela numa única ida ao navegador
+SCRIPT_TABELA = """
+const tabela = arguments[0];
+const h1 = document.querySelector('h1');
+const linhas = [];
+for (const tr of tabela.querySelectorAll('tr')) {
+    const colunas = tr.querySelectorAll('td');
+    if (colunas.length >= 2) {
+        linhas.push([colunas[0].innerText.trim(), colunas[1].innerText.trim()]);
+    }
+}
+return JSON.stringify({nome: h1 ? h1.innerText.trim() : '', linhas: linhas});
+"""
+
+# HTML do acordeão do dropdown, só quando a tabela já está no DOM (o <details> fechado
+# também guarda o conteúdo); vazio quando a tabela é montada apenas ao abrir
+SCRIPT_ACORDEAO = """
+const detalhes = arguments[0].closest('details');
+return detalhes && detalhes.querySelector('table tr td') ? detalhes.innerHTML : '';
+"""
+
+# Falhas do navegador (WebDriver, timeouts) ou da conexão com um chromedriver morto: vale repetir
+FALHAS_NAVEGADOR = (WebDriverException, ErroConexaoDriver, ConnectionError)
+
+class PaginaSemProduto(Exception):
+    """Página carregada sem o conteúdo de um produto (h1 ausente: 404, produto removido)"""
+
+def extrair_tabela_js(driver, tabela):
+    """Retorna (nome do produto, [(campo, valor), ...]) com um único execute_script"""
+    resultado = json.loads(driver.execute_script(SCRIPT_TABELA, tabela))
+    return resultado['nome'], [(campo, valor) for campo, valor in resultado['linhas']]
+
+def coletar_dados_produto(driver, url, categoria, timeout=TIMEOUT_PADRAO, tabelas=None):
+    """
+    Coleta dados nutricionais de um produto.
+    
+    Com `tabelas` (TabelasCompartilhadas), um acordeão idêntico ao de um produto
+    já extraído reaproveita as células, sem abrir o dropdown.
+    """
     try:
-        print(f"🔗 Processando: {url}", flush=True)
-        
-        driver.get(url)
-        wait = WebDriverWait(driver, 10)
-        wait.until(EC.presence_of_element_located((By.TAG_NAME, "h1")))
-        
-        # Nome do produto
-        nome_produto = driver.find_element(By.TAG_NAME, "h1").text.strip()
-        print(f"📦 Produto: {nome_produto}", flush=True)
-        
-        # Dados padrão
-        dados = {
-            'nome_produto': nome_produto,
-            'url': url,
-            'categoria': categoria,
-            'porcao_g': 0,
-            'calorias_kcal': 0,
-            'carboidratos_g': 0,
-            'proteinas_g': 0,
-            'gorduras_totais_g': 0,
-            'gorduras_saturadas_g': 0,
-            'fibras_g': 0,
-            'acucares_g': 0,
-            'sodio_mg': 0
-        }
-        
-        time.sleep(2)
+        return _extrair_dados_produto(driver, url, categoria, timeout, tabelas)
+    except Exception as e:
+        print(f"❌ Erro geral: {str(e)}", flush=True)
+        return None
+
+def _extrair_dados_produto(driver, url, categoria, timeout, tabelas):
+    """Corpo de coletar_dados_produto; propaga as falhas da página"""
+    print(f"🔗 Processando: {url}", flush=True)
+    
+    with medir('driver_get'):
+        try:
+            driver.get(url)
+        except WebDriverException as e:
+            # Timeout de carregamento ou erro de rede do Chrome: sinais de servidor sobrecarregado
+            if isinstance(e, TimeoutException) or 'net::ERR_' in str(e):
+                raise ErroTransitorio(f"falha ao carregar a página ({e.msg})") from e
+            raise
+        wait = WebDriverWait(driver, timeout)
+        try:
+            h1 = wait.until(EC.presence_of_element_located((By.TAG_NAME, "h1")))
+        except TimeoutException as e:
+            raise PaginaSemProduto("página sem h1 (404 ou produto removido)") from e
+    
+    # Dados padrão (o nome vem junto com a tabela)
+    dados = dados_padrao('', url, categoria)
+    celulas = None
+    
+    try:
+        # Rolar até o dropdown "Informação Nutricional" aparecer
+        try:
+            with medir('busca_dropdown'):
+                dropdown = aguardar_dropdown(driver, timeout)
+        except TimeoutException:
+            dropdown = None
+            print("❌ Dropdown 'Informação Nutricional' não encontrado", flush=True)
         
-        # Rolar para baixo e procurar pelo dropdown "Informação Nutricional"
-        dropdown = None
-        max_scrolls = 10
-        scroll_count = 0
+        # Variante com o mesmo acordeão de um produto já extraído
+        chave = None
+        if dropdown and tabelas is not None:
+            chave = tabelas.chave(driver.execute_script(SCRIPT_ACORDEAO, dropdown))
+            celulas = tabelas.obter(chave)
+            if celulas is not None:
+                print("🧬 Tabela idêntica à de outra variante, reaproveitando", flush=True)
         
-        while not dropdown and scroll_count < max_scrolls:
+        # Abrir o dropdown e extrair dados da tabela
+        if dropdown and celulas is None:
             try:
-                # Estratégia 1: Procurar pelo h2 específico com o texto "Informação Nutricional"
-                h2_elemento = driver.find_element(By.XPATH, "//h2[@class=' font-heading h5 inline-richtext' and text()='Informação Nutricional']")
-                dropdown = h2_elemento.find_element(By.XPATH, "./ancestor::summary[@class='accordion-details__summary flex items-center justify-between focus-inset']")
-                break
-            except:
-                try:
-                    # Estratégia 2: Procurar por qualquer summary que contenha "Informação Nutricional"
-                    dropdown = driver.find_element(By.XPATH, "//summary[contains(., 'Informação Nutricional')]")
-                    break
-                except:
-                    try:
-                        # Estratégia 3: Procurar por todos os summary e verificar o texto
-                        summaries = driver.find_elements(By.TAG_NAME, "summary")
-                        for summary in summaries:
-                            if "Informação Nutricional" in summary.text:
-                                dropdown = summary
-                                break
-                        if dropdown:
-                            break
-                    except:
-                        pass
+                with medir('extracao_tabela'):
+                    abrir_dropdown(driver, dropdown)
+                    tabela = aguardar_tabela(driver, dropdown, timeout)
+                    aguardar_linhas_estaveis(driver, tabela, timeout)
+                    dados['nome_produto'], celulas = extrair_tabela_js(driver, tabela)
+                if tabelas is not None:
+                    tabelas.guardar(chave, celulas)
+            except TimeoutException:
+                print("❌ Tabela não encontrada", flush=True)
+    
+    except Exception as e:
+        print(f"❌ Erro no dropdown: {str(e)}", flush=True)
+    
+    # Nome do produto
+    if not dados['nome_produto']:
+        dados['nome_produto'] = h1.text.strip()
+    print(f"📦 Produto: {dados['nome_produto']}", flush=True)
+    
+    if celulas:
+        with medir('parsing'):
+            preencher_dados(dados, celulas)
+        print(f"✅ Dados extraídos: {dados['calorias_kcal']}kcal, {dados['proteinas_g']}g proteína", flush=True)
+    
+    return dados
+
+def _coletar_ou_falhar(driver, url, categoria, timeout, tabelas=None):
+    """Uma tentativa de coletar_com_retentativas: só falhas de carregamento e do navegador são repetidas"""
+    try:
+        return _extrair_dados_produto(driver, url, categoria, timeout, tabelas)
+    except ErroTransitorio as e:
+        print(f"❌ Erro geral: {str(e)}", flush=True)
+        raise
+    except FALHAS_NAVEGADOR as e:
+        print(f"❌ Erro geral: {str(e)}", flush=True)
+        # Navegador travado ou reiniciado: repete, mas sem reduzir o ritmo
+        raise ErroTransitorio(str(e), sobrecarga=False) from e
+    except Exception as e:
+        # Conteúdo ausente (404, produto removido): outra tentativa não muda nada
+        print(f"❌ Erro geral: {str(e)}", flush=True)
+        return None
+
+def coletar_com_retentativas(driver, url, categoria, timeout=TIMEOUT_PADRAO, ritmo=None, tabelas=None):
+    """
+    Coleta um produto pelo navegador respeitando o ritmo, repetindo com backoff
+    quando a página ou o navegador falha. Retorna None se todas as tentativas
+    falharem ou, sem repetir, se a página não tiver o produto.
+    
+    Com um DriverGerenciado, o navegador é reciclado ou limpo antes do produto.
+    """
+    if isinstance(driver, DriverGerenciado):
+        driver.preparar_produto()
+    try:
+        return com_retentativas(_coletar_ou_falhar, driver, url, categoria, timeout, tabelas, ritmo=ritmo,
+                                descricao=f"Navegador {url}")
+    except ErroTransitorio:
+        print(f"❌ Desistindo após várias tentativas: {url}", flush=True)
+        return None
+
+CAMINHO_URLS = 'dados/urls_produtos_europa_estrutura_real.csv'
+CAMINHO_SAIDA = 'dados/dados_nutricionais.csv'
+
+CABECALHO_CSV = [
+    'NOME_PRODUTO', 'URL', 'CATEGORIA', 'PORCAO (g)', 'CALORIAS (kcal)',
+    'CARBOIDRATOS (g)', 'PROTEINAS (g)', 'GORDURAS_TOTAIS (g)', 'GORDURAS_SATURADAS (g)',
+    'FIBRAS (g)', 'ACUCARES (g)', 'SODIO (mg)'
+]
+
+CAMPOS_CSV = CAMPOS_DADOS
+
+def ler_produtos(caminho=CAMINHO_URLS):
+    """Lê a lista de produtos (url + categoria) gerada pelo coletor de URLs"""
+    produtos = []
+    with open(caminho, 'r', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            produtos.append({'url': row['url'], 'categoria': row['categoria'],
+                             'nome_produto': row.get('nome_produto', '')})
+    return produtos
+
+def _valor_csv(texto):
+    """Converte um valor numérico lido do CSV (int quando inteiro, senão float)"""
+    try:
+        return int(texto)
+    except ValueError:
+        return float(texto)
+
+def ler_csv(caminho=CAMINHO_SAIDA):
+    """Lê um dados_nutricionais.csv existente, retornando {url: dados}"""
+    anteriores = {}
+    try:
+        with open(caminho, 'r', newline='', encoding='utf-8') as f:
+            reader = csv.reader(f, delimiter='\t')
+            if next(reader, None) != CABECALHO_CSV:
+                return anteriores
+            for linha in reader:
+                dados = dict(zip(CAMPOS_CSV, linha))
+                for campo in CAMPOS_NUMERICOS:
+                    dados[campo] = _valor_csv(dados[campo])
+                anteriores[dados['url']] = dados
+    except (OSError, ValueError, KeyError):
+        return {}
+    return anteriores
+
+def linha_csv(dados):
+    """Converte os dados de um produto na linha do CSV final"""
+    return [dados[campo] for campo in CAMPOS_CSV]
+
+def abrir_csv_saida(caminho=CAMINHO_SAIDA):
+    """Abre o CSV final (separado por tabulação) para escrita linha a linha"""
+    return EscritorCSVStreaming(caminho, cabecalho=CABECALHO_CSV, delimiter='\t')
+
+def salvar_csv(dados_nutricionais, caminho=CAMINHO_SAIDA):
+    """Salva os dados nutricionais no CSV final (separado por tabulação)"""
+    with abrir_csv_saida(caminho) as escritor:
+        for dados in dados_nutricionais:
+            escritor.escrever(linha_csv(dados))
+
+def coletar_em_serie(produtos, ritmo=None, timeout=TIMEOUT_PADRAO, pool=None, ao_coletar=None, opcoes_driver=None,
+                     tabelas=None):
+    """Coleta todos os produtos com um único driver, um após o outro"""
+    resultados = []
+    ritmo = ritmo or RitmoAdaptativo()
+    
+    with obter_driver(pool, **(opcoes_driver or {})) as driver:
+        for i, produto in enumerate(produtos, 1):
+            print(f"\n[{i}/{len(produtos)}]", flush=True)
             
-            # Se não encontrou, rolar para baixo
-            if not dropdown:
-                driver.execute_script("window.scrollBy(0, 500);")
-                time.sleep(2)
-                scroll_count += 1
-        
-        # Clicar no dropdown
+            with produto_medido(produto['url'], motor='selenium'):
+                dados = coletar_com_retentativas(driver, produto['url'], produto['categoria'], timeout, ritmo,
+                                                 tabelas)
+                if dados and ao_coletar:
+                    ao_coletar(dados)
+            resultados.append(dados)
+            emitir('item', etapa='dados', ok=bool(dados), url=produto['url'],
+                   nome=dados['nome_produto'] if dados else None)
+    
+    return resultados
+
+class LimitadorPorHost:
+    """Limita quantas páginas do mesmo host podem ser carregadas ao mesmo tempo"""
+    
+    def __init__(self, max_por_host=2):
+        self.max_por_host = max_por_host
+        self._semaforos = {}
+        self._lock = threading.Lock()
+    
+    def semaforo(self, url):
+        """Retorna o semáforo associado ao host da URL"""
+        host = urlparse(url).netloc
+        with self._lock:
+            if host not in self._semaforos:
+                self._semaforos[host] = threading.BoundedSemaphore(self.max_por_host)
+            return self._semaforos[host]
+
+def coletar_em_paralelo(produtos, num_workers=3, max_por_host=2, ritmo=None, timeout=TIMEOUT_PADRAO, pool=None,
+                        ao_coletar=None, opcoes_driver=None, tabelas=None):
+    """
+    Coleta os produtos com um pool de workers, cada um com seu próprio driver.
+    
+    As URLs são distribuídas através de uma fila compartilhada (cada worker pega
+    o próximo produto livre) e os resultados são devolvidos na ordem original.
+    """
+    if not produtos:
+        return []
+    
+    fila = queue.Queue()
+    for indice, produto in enumerate(produtos):
+        fila.put((indice, produto))
+    
+    resultados = [None] * len(produtos)
+    limitador = LimitadorPorHost(max_por_host)
+    ritmo = ritmo or RitmoAdaptativo()
+    
+    def worker(numero):
         try:
-            
-            if dropdown:
-                driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", dropdown)
-                time.sleep(2)
-                driver.execute_script("arguments[0].click();", dropdown)
-                time.sleep(3)
-                
-                # Extrair dados da tabela
-                tabelas = driver.find_elements(By.TAG_NAME, "table")
-                
-                if tabelas:
-                    tabela = tabelas[0]
-                    linhas = tabela.find_elements(By.TAG_NAME, "tr")
-                    
-                    for linha in linhas:
-                        colunas = linha.find_elements(By.TAG_NAME, "td")
-                        if len(colunas) >= 2:
-                            campo = colunas[0].text.strip()
-                            valor = colunas[1].text.strip()
-                            
-                            if 'Porção' in campo:
-                                dados['porcao_g'] = extrair_numero(valor)
-                            elif 'Valor Energético' in campo:
-                                match = re.search(r'(\d+(?:\.\d+)?)\s*kcal', valor)
-                                if match:
-                                    dados['calorias_kcal'] = float(match.group(1))
-                            elif 'Carboidratos' in campo:
-                                dados['carboidratos_g'] = extrair_numero(valor)
-                            elif 'Proteínas' in campo:
-                                dados['proteinas_g'] = extrair_numero(valor)
-                            elif 'Gorduras Totais' in campo:
-                                dados['gorduras_totais_g'] = extrair_numero(valor)
-                            elif 'Gorduras Saturadas' in campo:
-                                dados['gorduras_saturadas_g'] = extrair_numero(valor)
-                            elif 'Fibra Alimentar' in campo:
-                                dados['fibras_g'] = extrair_numero(valor)
-                            elif 'Sódio' in campo:
-                                dados['sodio_mg'] = extrair_numero(valor)
+            with obter_driver(pool, **(opcoes_driver or {})) as driver:
+                while True:
+                    try:
+                        indice, produto = fila.get_nowait()
+                    except queue.Empty:
+                        break
                     
-                    print(f"✅ Dados extraídos: {dados['calorias_kcal']}kcal, {dados['proteinas_g']}g proteína", flush=True)
-                else:
-                    print("❌ Tabela não encontrada", flush=True)
-        
+                    print(f"\n[W{numero}] [{indice + 1}/{len(produtos)}]", flush=True)
+                    with produto_medido(produto['url'], motor='selenium'):
+                        with limitador.semaforo(produto['url']):
+                            resultados[indice] = coletar_com_retentativas(driver, produto['url'], produto['categoria'],
+                                                                          timeout, ritmo, tabelas)
+                        if resultados[indice] and ao_coletar:
+                            ao_coletar(resultados[indice])
+                    dados = resultados[indice]
+                    emitir('item', etapa='dados', ok=bool(dados), url=produto['url'],
+                           nome=dados['nome_produto'] if dados else None)
         except Exception as e:
-            print(f"❌ Erro no dropdown: {str(e)}", flush=True)
-        
+            print(f"❌ [W{numero}] Erro no worker: {str(e)}", flush=True)
+    
+    num_workers = max(1, min(num_workers, len(produtos)))
+    print(f"👷 Iniciando {num_workers} workers (máx. {max_por_host} por host)", flush=True)
+    
+    threads = [threading.Thread(target=worker, args=(n,), daemon=True) for n in range(1, num_workers + 1)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    return resultados
+
+def coletar_com_navegador(produtos, num_workers=1, max_por_host=2, timeout=TIMEOUT_PADRAO, pool=None,
+                          ao_coletar=None, opcoes_driver=None, ritmo=None, tabelas=None):
+    """
+    Coleta os produtos pelo Selenium, em série ou com pool de workers.
+    
+    `opcoes_driver` é repassado ao obter_driver (ex.: perfil e allow-list).
+    """
+    if num_workers > 1:
+        return coletar_em_paralelo(produtos, num_workers=num_workers, max_por_host=max_por_host,
+                                   ritmo=ritmo, timeout=timeout, pool=pool, ao_coletar=ao_coletar,
+                                   opcoes_driver=opcoes_driver, tabelas=tabelas)
+    return coletar_em_serie(produtos, ritmo=ritmo, timeout=timeout, pool=pool, ao_coletar=ao_coletar,
+                            opcoes_driver=opcoes_driver, tabelas=tabelas)
+
+def _processo_coleta(conexao, timeout, taxa, opcoes_driver):
+    """Worker de um processo filho do supervisor: um navegador (gerenciado) por processo"""
+    ritmo = RitmoAdaptativo(taxa=taxa)
+    tabelas = TabelasCompartilhadas()
+    with obter_driver(None, **opcoes_driver) as driver:
+        servir(conexao, lambda produto: coletar_com_retentativas(driver, produto['url'], produto['categoria'],
+                                                                 timeout, ritmo, tabelas))
+
+def coletar_isolado(produtos, num_workers=1, prazo=PRAZO_PADRAO, timeout=TIMEOUT_PADRAO, ao_coletar=None,
+                    opcoes_driver=None, ritmo=None):
+    """
+    Coleta os produtos pelo Selenium em processos filhos supervisionados: um
+    produto que passa do `prazo` (ou derruba o navegador) tem o worker e o
+    Chrome encerrados e volta para a fila.
+    
+    Cada processo tem o próprio ritmo, com a taxa atual dividida entre os workers.
+    """
+    taxa = (ritmo or RitmoAdaptativo()).taxa / max(1, num_workers)
+    
+    def ao_concluir(indice, dados):
+        if dados and ao_coletar:
+            ao_coletar(dados)
+        emitir('item', etapa='dados', ok=bool(dados), url=produtos[indice]['url'],
+               nome=dados['nome_produto'] if dados else None)
+    
+    supervisor = Supervisor(_processo_coleta, num_workers=num_workers, prazo=prazo,
+                            args_worker=(timeout, taxa, opcoes_driver or {}))
+    return supervisor.executar(produtos, ao_concluir)
+
+def coletar_via_http(produtos, num_workers=1, max_por_host=2, timeout=TIMEOUT_PADRAO, ao_coletar=None,
+                     cache=None, anteriores=None, ritmo=None, tabelas=None):
+    """
+    Coleta os produtos via HTTP, sem navegador.
+    
+    Posições None no resultado indicam produtos que precisam do Selenium.
+    Com `cache` e `anteriores`, produtos cuja tabela não mudou reaproveitam
+    a linha anterior (ver coletar_dados_produto_http).
+    """
+    sessao = criar_sessao(tamanho_pool=max(1, num_workers))
+    limitador = LimitadorPorHost(max_por_host)
+    
+    def coletar(produto):
+        with produto_medido(produto['url'], motor='http'):
+            with limitador.semaforo(produto['url']):
+                dados = coletar_dados_produto_http(sessao, produto['url'], produto['categoria'], timeout,
+                                                   cache=cache, anteriores=anteriores, ritmo=ritmo,
+                                                   tabelas=tabelas)
+            if dados and ao_coletar:
+                ao_coletar(dados)
+        if dados:
+            # Produtos sem dados ainda passam pelo navegador: só o sucesso é definitivo aqui
+            emitir('item', etapa='dados', ok=True, url=produto['url'], nome=dados['nome_produto'])
         return dados
-        
-    except Exception as e:
-        print(f"❌ Erro geral: {str(e)}", flush=True)
-        return None
+    
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, num_workers)) as executor:
+            return list(executor.map(coletar, produtos))
+    finally:
+        sessao.close()
 
-def main():
-    """Função principal"""
-    # Criar driver automaticamente
-    driver = criar_driver_automatico(headless=True)
+def coletar_produtos(produtos, motor='http', num_workers=1, max_por_host=2, timeout=TIMEOUT_PADRAO, pool=None,
+                     ao_coletar=None, cache=None, anteriores=None, opcoes_driver=None, ritmo=None,
+                     variantes=MODO_PADRAO, prazo=None):
+    """
+    Coleta os produtos com o motor escolhido, mantendo a ordem original.
+    
+    No motor 'http' apenas os produtos cuja tabela não veio no HTML são
+    reprocessados pelo Selenium. `ao_coletar(dados)` é chamado assim que
+    cada produto é coletado com sucesso. O `ritmo` (RitmoAdaptativo) controla
+    as requisições HTTP; o navegador usa um balde derivado dele, para que as
+    latências de vários segundos do Selenium não freiem o HTTP.
+    
+    `variantes`: 'html' reaproveita tabelas de acordeões idênticos; 'handle'
+    também coleta só um sabor por grupo e replica a tabela para os demais
+    (ver variantes.py); 'nenhum' extrai cada página por completo.
+    
+    Com `prazo` (segundos), o Selenium roda em processos filhos supervisionados
+    (ver supervisor.py) e nenhum produto passa desse tempo.
+    """
+    ritmo = ritmo or RitmoAdaptativo()
+    ritmo_navegador = ritmo.derivado() if motor == 'http' else ritmo
+    tabelas = TabelasCompartilhadas() if variantes != 'nenhum' else None
+    
+    def coletar(lista, ao_coletar):
+        return _coletar_com_motor(lista, motor, num_workers, max_por_host, timeout, pool, ao_coletar, cache,
+                                  anteriores, opcoes_driver, ritmo, ritmo_navegador, tabelas, prazo)
+    
+    if variantes == 'handle':
+        resultados = coletar_por_variantes(produtos, coletar, ao_coletar)
+    else:
+        resultados = coletar(produtos, ao_coletar)
+    
+    if tabelas is not None and tabelas.reaproveitadas:
+        print(f"🧬 {tabelas.reaproveitadas} tabelas reaproveitadas de acordeões idênticos", flush=True)
+    return resultados
+
+def _navegador(produtos, num_workers, max_por_host, timeout, pool, ao_coletar, opcoes_driver, ritmo, tabelas, prazo):
+    if prazo:
+        return coletar_isolado(produtos, num_workers, prazo, timeout, ao_coletar, opcoes_driver, ritmo)
+    return coletar_com_navegador(produtos, num_workers, max_por_host, timeout, pool, ao_coletar, opcoes_driver,
+                                 ritmo, tabelas)
+
+def _coletar_com_motor(produtos, motor, num_workers, max_por_host, timeout, pool, ao_coletar, cache, anteriores,
+                       opcoes_driver, ritmo, ritmo_navegador, tabelas, prazo):
+    if motor != 'http':
+        return _navegador(produtos, num_workers, max_por_host, timeout, pool, ao_coletar, opcoes_driver,
+                          ritmo_navegador, tabelas, prazo)
+    
+    resultados = coletar_via_http(produtos, num_workers, max_por_host, timeout, ao_coletar, cache, anteriores, ritmo,
+                                  tabelas)
+    
+    pendentes = [i for i, dados in enumerate(resultados) if dados is None]
+    if pendentes:
+        print(f"\n🌐 {len(pendentes)} produtos sem tabela no HTML, usando navegador...", flush=True)
+        recoletados = _navegador([produtos[i] for i in pendentes], num_workers, max_por_host, timeout, pool,
+                                 ao_coletar, opcoes_driver, ritmo_navegador, tabelas, prazo)
+        for i, dados in zip(pendentes, recoletados):
+            resultados[i] = dados
+    
+    return resultados
+
+def main(argv=None, pool=None):
+    """
+    Função principal.
+    
+    Quando chamada pelo menu, recebe o pool de navegadores da sessão para
+    reaproveitar o Chrome já aberto. Retorna True se algum dado foi salvo.
+    """
+    parser = argparse.ArgumentParser(description="Coleta de dados nutricionais Max Titanium Europa")
+    parser.add_argument('--motor', choices=['http', 'selenium'], default='http',
+                        help="Motor de coleta: 'http' (sem navegador, com fallback para Selenium) ou 'selenium' (padrão: http)")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Número de workers (drivers ou conexões HTTP) em paralelo (padrão: 1)")
+    parser.add_argument('--max-por-host', type=int, default=2,
+                        help="Máximo de páginas simultâneas por host no modo paralelo (padrão: 2)")
+    parser.add_argument('--timeout', type=float, default=TIMEOUT_PADRAO,
+                        help=f"Tempo máximo de espera por elemento, em segundos (padrão: {TIMEOUT_PADRAO})")
+    parser.add_argument('--resume', action='store_true',
+                        help="Retoma a última execução, pulando as URLs já salvas no checkpoint")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Motor http: usa ETag/Last-Modified e o hash da tabela para reaproveitar "
+                             "as linhas do último CSV dos produtos que não mudaram")
+    parser.add_argument('--colunar', choices=sorted(FORMATOS_COLUNARES),
+                        help="Também grava uma saída colunar tipada (requer pyarrow), "
+                             "ex.: dados/dados_nutricionais.parquet")
+    parser.add_argument('--historico', action='store_true',
+                        help="Registra as alterações desta execução no histórico (dados/historico.sqlite)")
+    parser.add_argument('--perfil', choices=PERFIS, default=PERFIL_PADRAO,
+                        help="Perfil do navegador: 'enxuto' bloqueia imagens, fontes e scripts de terceiros; "
+                             f"'completo' carrega tudo (padrão: {PERFIL_PADRAO})")
+    parser.add_argument('--permitir', nargs='*', default=[],
+                        help="Allow-list do perfil enxuto: domínios ou extensões que não devem ser bloqueados")
+    parser.add_argument('--paginas-por-navegador', type=int, default=MAX_PAGINAS_PADRAO,
+                        help=f"Recicla o navegador após N páginas (0 = nunca; padrão: {MAX_PAGINAS_PADRAO})")
+    parser.add_argument('--limite-rss-mb', type=int, default=LIMITE_RSS_MB_PADRAO,
+                        help="Recicla o navegador quando a memória do Chrome passa do limite, em MB "
+                             f"(0 = sem limite; padrão: {LIMITE_RSS_MB_PADRAO})")
+    parser.add_argument('--taxa', type=float, default=TAXA_PADRAO,
+                        help=f"Taxa inicial de requisições por segundo; ajustada conforme a latência e "
+                             f"as respostas 429/5xx (padrão: {TAXA_PADRAO})")
+    parser.add_argument('--prazo-produto', type=float, metavar='SEGUNDOS',
+                        help="Roda o navegador em processos filhos supervisionados: um produto que passa do prazo "
+                             f"tem o worker e o Chrome encerrados e volta à fila (ex.: {PRAZO_PADRAO})")
+    parser.add_argument('--variantes', choices=MODOS_VARIANTES, default=MODO_PADRAO,
+                        help="Variantes de sabor: 'html' reaproveita tabelas de acordeões idênticos; 'handle' coleta "
+                             "um sabor por grupo e replica a tabela; 'nenhum' extrai cada página (padrão: "
+                             f"{MODO_PADRAO})")
+    parser.add_argument('--metricas', action='store_true',
+                        help="Exibe p50/p95/p99 por etapa e grava dados/metricas.jsonl e dados/metricas.prom")
+    parser.add_argument('--eventos', metavar='CAMINHO',
+                        help="Grava os eventos de progresso em JSON lines (arquivo, FIFO, /dev/fd/N ou '-' para stdout)")
+    args = parser.parse_args(argv)
+    
+    with emitir_para(args.eventos):
+        return _executar(args, pool)
+
+def _executar(args, pool):
+    """Executa a coleta com os argumentos já interpretados"""
+    METRICAS.reiniciar()
+    opcoes_driver = {
+        'perfil': args.perfil,
+        'permitidos': tuple(args.permitir),
+        'ciclo': dict(CICLO_PADRAO, max_paginas=args.paginas_por_navegador, limite_rss_mb=args.limite_rss_mb)
+    }
+    
+    if args.colunar and not colunar_disponivel():
+        relatar_erro("--colunar requer o pacote 'pyarrow' (pip install pyarrow)", 'dados')
+        return False
     
     try:
         # Ler URLs
-        produtos = []
-        with open('dados/urls_produtos_europa_estrutura_real.csv', 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                produtos.append({'url': row['url'], 'categoria': row['categoria']})
+        produtos = ler_produtos()
+        
+        # Checkpoint: cada produto coletado é gravado imediatamente em disco
+        checkpoint = CheckpointColeta()
+        if args.resume:
+            ja_coletados = checkpoint.carregar()
+            print(f"♻️ Retomando: {len(ja_coletados)} produtos já coletados no checkpoint", flush=True)
+        else:
+            checkpoint.limpar()
+            ja_coletados = {}
         
-        print(f"📋 Processando {len(produtos)} produtos", flush=True)
+        pendentes = [produto for produto in produtos if produto['url'] not in ja_coletados]
+        
+        print(f"📋 Processando {len(pendentes)} produtos", flush=True)
+        emitir('inicio', etapa='dados', total=len(pendentes))
+        
+        # Detecção de mudanças: cache de páginas + linhas do último CSV
+        cache, anteriores = None, None
+        if args.incremental:
+            cache = CachePaginas()
+            anteriores = ler_csv()
+            print(f"🗂️ Modo incremental: {len(anteriores)} produtos no CSV anterior", flush=True)
+        
+        # Saída: cada produto vai para o checkpoint e para o CSV parcial assim que é extraído
+        escritor = abrir_csv_saida()
+        escritor_colunar = None
+        if args.colunar:
+            caminho_colunar = os.path.splitext(CAMINHO_SAIDA)[0] + FORMATOS_COLUNARES[args.colunar]
+            escritor_colunar = EscritorColunar(caminho_colunar, formato=args.colunar)
+        
+        def escrever_saidas(dados):
+            with medir('escrita_csv'):
+                escritor.escrever(linha_csv(dados))
+                if escritor_colunar:
+                    escritor_colunar.escrever(dados)
+        
+        for produto in produtos:
+            if produto['url'] in ja_coletados:
+                escrever_saidas(ja_coletados[produto['url']])
+        
+        def ao_coletar(dados):
+            checkpoint.registrar(dados)
+            escrever_saidas(dados)
         
         # Coletar dados
-        dados_nutricionais = []
+        try:
+            resultados = coletar_produtos(pendentes, motor=args.motor, num_workers=args.workers,
+                                          max_por_host=args.max_por_host, timeout=args.timeout, pool=pool,
+                                          ao_coletar=ao_coletar, cache=cache, anteriores=anteriores,
+                                          opcoes_driver=opcoes_driver, ritmo=RitmoAdaptativo(taxa=args.taxa),
+                                          variantes=args.variantes, prazo=args.prazo_produto)
+        except BaseException:
+            escritor.abortar()
+            if escritor_colunar:
+                escritor_colunar.abortar()
+            if cache is not None:
+                cache.descartar()
+            raise
         
-        for i, produto in enumerate(produtos, 1):
-            print(f"\n[{i}/{len(produtos)}]", flush=True)
-            
-            dados = coletar_dados_produto(driver, produto['url'], produto['categoria'])
-            if dados:
-                dados_nutricionais.append(dados)
-            
-            time.sleep(3)
+        # Junta os dados do checkpoint com os recém-coletados, na ordem original
+        coletados = {produto['url']: dados for produto, dados in zip(pendentes, resultados) if dados}
+        coletados.update(ja_coletados)
+        dados_nutricionais = [coletados[produto['url']] for produto in produtos if produto['url'] in coletados]
         
-        # Salvar CSV
+        # Concluir CSV (rename atômico do arquivo parcial). As linhas foram gravadas na
+        # ordem de conclusão (workers, fallback, supervisor): o arquivo final segue a das URLs
         if dados_nutricionais:
-            with open('dados/dados_nutricionais.csv', 'w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f, delimiter='\t')
-                writer.writerow([
-                    'NOME_PRODUTO', 'URL', 'CATEGORIA', 'PORCAO (g)', 'CALORIAS (kcal)',
-                    'CARBOIDRATOS (g)', 'PROTEINAS (g)', 'GORDURAS_TOTAIS (g)', 'GORDURAS_SATURADAS (g)',
-                    'FIBRAS (g)', 'ACUCARES (g)', 'SODIO (mg)'
-                ])
-                
-                for dados in dados_nutricionais:
-                    writer.writerow([
-                        dados['nome_produto'],
-                        dados['url'],
-                        dados['categoria'],
-                        dados['porcao_g'],
-                        dados['calorias_kcal'],
-                        dados['carboidratos_g'],
-                        dados['proteinas_g'],
-                        dados['gorduras_totais_g'],
-                        dados['gorduras_saturadas_g'],
-                        dados['fibras_g'],
-                        dados['acucares_g'],
-                        dados['sodio_mg']
-                    ])
+            escritor.reescrever([linha_csv(dados) for dados in dados_nutricionais])
+            escritor.concluir()
+            if escritor_colunar:
+                escritor_colunar.reescrever(dados_nutricionais)
+                escritor_colunar.concluir()
+                print(f"📦 Saída colunar: {escritor_colunar.caminho}")
+            
+            # O cache só guarda validadores de linhas que estão no CSV concluído
+            if cache is not None:
+                cache.confirmar(coletados)
+                cache.salvar()
+            
+            if args.historico:
+                registrar_historico(dados_nutricionais, 'nutricao')
             
             print(f"\n✅ Dados salvos! Total: {len(dados_nutricionais)} produtos")
             
@@ -202,15 +621,28 @@ def main():
             for dados in dados_nutricionais:
                 print(f"• {dados['nome_produto']} ({dados['categoria']})")
                 print(f"  {dados['calorias_kcal']}kcal | {dados['proteinas_g']}g proteína | {dados['carboidratos_g']}g carbo")
+            
+            return True
+        
+        escritor.abortar()
+        if escritor_colunar:
+            escritor_colunar.abortar()
+        if cache is not None:
+            cache.descartar()
+        relatar_erro("Nenhum produto foi coletado!", 'dados')
+        return False
         
     except Exception as e:
-        print(f"❌ Erro: {str(e)}")
+        relatar_erro(f"Erro: {str(e)}", 'dados')
+        return False
     
     finally:
-        driver.quit()
+        emitir('fim', etapa='dados')
+        if args.metricas:
+            METRICAS.exportar()
         print("\n🏁 Concluído")
 
 if __name__ == "__main__":
     print("🚀 COLETA DE DADOS NUTRICIONAIS")
     print("=" * 50)
-    main() 
\ No newline at end of file
+    main()
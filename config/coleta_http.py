@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+⚡ Coleta via HTTP (sem navegador)
+As páginas de produto da Shopify já vêm com o título e a tabela do dropdown
+"Informação Nutricional" no HTML do servidor, então basta baixar a página
+com uma sessão HTTP reutilizável e ler a tabela com o lxml
+"""
+
+import requests
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup
+from nutricao import dados_padrao, preencher_dados
+from cache_paginas import hash_conteudo
+from metricas import medir
+from ritmo import STATUS_TRANSITORIOS, ErroTransitorio, com_retentativas, ler_retry_after
+
+# Falhas de rede/servidor que são repetidas com backoff antes de desistir
+EXCECOES_TRANSITORIAS = (ErroTransitorio, requests.ConnectionError, requests.Timeout)
+
+TEXTO_DROPDOWN = "Informação Nutricional"
+
+CABECALHOS = {
+    'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml',
+    'Accept-Language': 'pt-PT,pt;q=0.9,en;q=0.8'
+}
+
+def criar_sessao(tamanho_pool=10):
+    """Cria uma sessão HTTP com pool de conexões keep-alive"""
+    sessao = requests.Session()
+    adaptador = HTTPAdapter(pool_connections=tamanho_pool, pool_maxsize=tamanho_pool)
+    sessao.mount('https://', adaptador)
+    sessao.mount('http://', adaptador)
+    sessao.headers.update(CABECALHOS)
+    return sessao
+
+def baixar(sessao, url, timeout=10, cabecalhos=None, **kwargs):
+    """GET que transforma 429/5xx em ErroTransitorio (com o Retry-After do servidor)"""
+    resposta = sessao.get(url, timeout=timeout, headers=cabecalhos or {}, **kwargs)
+    if resposta.status_code in STATUS_TRANSITORIOS:
+        raise ErroTransitorio(f"HTTP {resposta.status_code}", ler_retry_after(resposta.headers.get('Retry-After')))
+    return resposta
+
+def localizar_tabela(soup):
+    """Retorna (nome do produto, tag <table> do dropdown ou None)"""
+    h1 = soup.find('h1')
+    nome_produto = h1.get_text(strip=True) if h1 else ''
+    
+    for summary in soup.find_all('summary'):
+        if TEXTO_DROPDOWN in summary.get_text():
+            detalhes = summary.find_parent('details')
+            return nome_produto, detalhes.find('table') if detalhes else soup.find('table')
+    
+    return nome_produto, None
+
+def ler_celulas(tabela):
+    """Lê as linhas (campo, valor) de uma tabela"""
+    celulas = []
+    for linha in tabela.find_all('tr'):
+        colunas = linha.find_all('td')
+        if len(colunas) >= 2:
+            celulas.append((colunas[0].get_text(strip=True), colunas[1].get_text(strip=True)))
+    return celulas
+
+def extrair_tabela_html(html):
+    """
+    Lê o nome do produto (h1) e as linhas (campo, valor) da tabela nutricional.
+    
+    Retorna (nome, None) quando a tabela não está no HTML.
+    """
+    nome_produto, tabela = localizar_tabela(BeautifulSoup(html, 'lxml'))
+    
+    if tabela is None:
+        return nome_produto, None
+    
+    return nome_produto, ler_celulas(tabela)
+
+def coletar_dados_produto_http(sessao, url, categoria, timeout=10, cache=None, anteriores=None, ritmo=None,
+                               tabelas=None):
+    """
+    Coleta dados nutricionais de um produto sem abrir o navegador.
+    
+    Com `cache` (CachePaginas) e `anteriores` ({url: dados} da última execução),
+    a página é pedida com cabeçalhos condicionais e a linha anterior é
+    reaproveitada quando o servidor responde 304 ou a tabela não mudou.
+    
+    Com `ritmo` (RitmoAdaptativo), a requisição respeita o balde de fichas e
+    falhas transitórias (rede, 429, 5xx) são repetidas com backoff.
+    
+    Com `tabelas` (TabelasCompartilhadas), uma tabela idêntica à de outra
+    variante reaproveita as células já lidas.
+    
+    Retorna None quando a página não pôde ser baixada ou não contém a tabela,
+    sinalizando que o produto deve ser coletado pelo Selenium.
+    """
+    try:
+        print(f"🔗 Processando (HTTP): {url}", flush=True)
+        
+        anterior = anteriores.get(url) if (cache is not None and anteriores) else None
+        cabecalhos = cache.cabecalhos_condicionais(url) if anterior else {}
+        
+        with medir('http_get'):
+            resposta = com_retentativas(baixar, sessao, url, timeout, cabecalhos, ritmo=ritmo,
+                                        excecoes=EXCECOES_TRANSITORIAS, descricao=f"HTTP {url}")
+        
+        if resposta.status_code == 304:
+            print("♻️ Página não modificada (304), reaproveitando dados anteriores", flush=True)
+            return dict(anterior, categoria=categoria)
+        
+        resposta.raise_for_status()
+        
+        with medir('parsing_html'):
+            nome_produto, tabela = localizar_tabela(BeautifulSoup(resposta.text, 'lxml'))
+        
+        if not nome_produto or tabela is None:
+            print(f"⚠️ Tabela não encontrada no HTML, usando navegador: {url}", flush=True)
+            return None
+        
+        html_tabela = str(tabela)
+        if cache is not None:
+            hash_tabela = hash_conteudo(html_tabela)
+            inalterada = anterior is not None and cache.tabela_inalterada(url, hash_tabela)
+            cache.atualizar(url, resposta.headers, hash_tabela)
+            
+            if inalterada:
+                print(f"♻️ Tabela inalterada, reaproveitando dados anteriores: {nome_produto}", flush=True)
+                return dict(anterior, nome_produto=nome_produto, categoria=categoria)
+        
+        with medir('extracao_tabela'):
+            chave = tabelas.chave(html_tabela) if tabelas is not None else None
+            celulas = tabelas.obter(chave) if tabelas is not None else None
+            if celulas is None:
+                celulas = ler_celulas(tabela)
+                if tabelas is not None:
+                    tabelas.guardar(chave, celulas)
+        if not celulas:
+            print(f"⚠️ Tabela vazia no HTML, usando navegador: {url}", flush=True)
+            return None
+        
+        with medir('parsing'):
+            dados = preencher_dados(dados_padrao(nome_produto, url, categoria), celulas)
+        print(f"✅ {nome_produto}: {dados['calorias_kcal']}kcal, {dados['proteinas_g']}g proteína", flush=True)
+        return dados
+    
+    except Exception as e:
+        print(f"⚠️ Falha no HTTP ({str(e)}), usando navegador: {url}", flush=True)
+        return None
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+📝 Escrita incremental de arquivos de saída
+Cada linha é gravada assim que é extraída em um arquivo '.parcial' (que pode
+ser acompanhado com `tail -f` durante a coleta) e, ao final, o arquivo é
+renomeado atomicamente para o nome definitivo. Com workers em paralelo as
+linhas chegam na ordem de conclusão; reescrever() regrava o arquivo parcial
+na ordem original antes de concluir()
+"""
+
+import csv
+import os
+import threading
+import time
+from nutricao import CAMPOS_TEXTO, CAMPOS_NUMERICOS
+
+# Saída colunar (Parquet / Arrow IPC) é opcional: requer o pyarrow
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+FORMATOS_COLUNARES = {'parquet': '.parquet', 'arrow': '.arrow'}
+
+class ArquivoStreaming:
+    """Arquivo gravado linha a linha com política de flush e rename atômico"""
+    
+    def __init__(self, caminho, flush_a_cada=1, intervalo_flush=2.0):
+        self.caminho = caminho
+        self.caminho_parcial = caminho + '.parcial'
+        self.flush_a_cada = flush_a_cada
+        self.intervalo_flush = intervalo_flush
+        self.linhas = 0
+        self._pendentes = 0
+        self._ultimo_flush = time.monotonic()
+        self._lock = threading.Lock()
+        
+        os.makedirs(os.path.dirname(caminho) or '.', exist_ok=True)
+        self._arquivo = open(self.caminho_parcial, 'w', newline='', encoding='utf-8')
+    
+    def _gravar(self, linha):
+        """Implementado pelas subclasses: grava uma linha em self._arquivo"""
+        raise NotImplementedError
+    
+    def _gravar_cabecalho(self):
+        """Cabeçalho do arquivo (nenhum por padrão)"""
+    
+    def reescrever(self, linhas):
+        """Substitui o conteúdo do arquivo parcial por `linhas` (ex.: na ordem original)"""
+        with self._lock:
+            self._arquivo.seek(0)
+            self._arquivo.truncate()
+            self._gravar_cabecalho()
+            for linha in linhas:
+                self._gravar(linha)
+            self.linhas = len(linhas)
+            self._pendentes = 0
+            self._arquivo.flush()
+    
+    def escrever(self, linha):
+        """Grava uma linha e faz flush conforme a política configurada"""
+        with self._lock:
+            self._gravar(linha)
+            self.linhas += 1
+            self._pendentes += 1
+            
+            agora = time.monotonic()
+            if self._pendentes >= self.flush_a_cada or agora - self._ultimo_flush >= self.intervalo_flush:
+                self._arquivo.flush()
+                self._pendentes = 0
+                self._ultimo_flush = agora
+    
+    def concluir(self):
+        """Fecha o arquivo e o move para o nome definitivo"""
+        with self._lock:
+            self._arquivo.flush()
+            os.fsync(self._arquivo.fileno())
+            self._arquivo.close()
+            os.replace(self.caminho_parcial, self.caminho)
+    
+    def abortar(self):
+        """Fecha e descarta o arquivo parcial, mantendo o arquivo definitivo anterior"""
+        with self._lock:
+            self._arquivo.close()
+            if os.path.exists(self.caminho_parcial):
+                os.remove(self.caminho_parcial)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, tipo, valor, traceback):
+        if tipo is None:
+            self.concluir()
+        else:
+            self.abortar()
+        return False
+
+class EscritorCSVStreaming(ArquivoStreaming):
+    """
+    CSV gravado linha a linha. Com `campos`, as linhas são dicionários
+    (como no csv.DictWriter); sem `campos`, são listas.
+    """
+    
+    def __init__(self, caminho, cabecalho=None, campos=None, delimiter=',', **kwargs):
+        super().__init__(caminho, **kwargs)
+        self.cabecalho = cabecalho
+        if campos:
+            self._writer = csv.DictWriter(self._arquivo, fieldnames=campos, delimiter=delimiter)
+        else:
+            self._writer = csv.writer(self._arquivo, delimiter=delimiter)
+        self._gravar_cabecalho()
+    
+    def _gravar_cabecalho(self):
+        if isinstance(self._writer, csv.DictWriter):
+            self._writer.writeheader()
+        elif self.cabecalho:
+            self._writer.writerow(self.cabecalho)
+    
+    def _gravar(self, linha):
+        self._writer.writerow(linha)
+
+class EscritorTextoStreaming(ArquivoStreaming):
+    """Arquivo texto com um valor por linha"""
+    
+    def _gravar(self, linha):
+        self._arquivo.write(f"{linha}\n")
+
+def colunar_disponivel():
+    """True se o pyarrow está instalado"""
+    return pa is not None
+
+def esquema_dados_nutricionais():
+    """Esquema fixo dos dados de um produto: textos como string, valores como float64"""
+    return pa.schema(
+        [pa.field(campo, pa.string()) for campo in CAMPOS_TEXTO] +
+        [pa.field(campo, pa.float64()) for campo in CAMPOS_NUMERICOS]
+    )
+
+class EscritorColunar:
+    """
+    Grava os dados dos produtos em Parquet ou Arrow IPC, em lotes de
+    `tamanho_lote` linhas, com o mesmo esquema dos dicionários de dados.
+    Mesmo ciclo de vida dos demais escritores: arquivo '.parcial' e rename
+    atômico em concluir().
+    """
+    
+    def __init__(self, caminho, formato='parquet', tamanho_lote=500):
+        if pa is None:
+            raise RuntimeError("Saída colunar requer o pacote 'pyarrow' (pip install pyarrow)")
+        if formato not in FORMATOS_COLUNARES:
+            raise ValueError(f"Formato colunar inválido: {formato}")
+        
+        self.caminho = caminho
+        self.caminho_parcial = caminho + '.parcial'
+        self.formato = formato
+        self.tamanho_lote = tamanho_lote
+        self.esquema = esquema_dados_nutricionais()
+        self.linhas = 0
+        self._lote = []
+        self._lock = threading.Lock()
+        
+        os.makedirs(os.path.dirname(caminho) or '.', exist_ok=True)
+        self._abrir()
+    
+    def _abrir(self):
+        if self.formato == 'parquet':
+            self._arquivo = None
+            self._writer = pq.ParquetWriter(self.caminho_parcial, self.esquema)
+        else:
+            self._arquivo = pa.OSFile(self.caminho_parcial, 'wb')
+            self._writer = pa.ipc.new_file(self._arquivo, self.esquema)
+    
+    def _descarregar(self):
+        """Grava o lote acumulado como um record batch"""
+        if not self._lote:
+            return
+        lote = pa.RecordBatch.from_pylist(self._lote, schema=self.esquema)
+        if self.formato == 'parquet':
+            self._writer.write_table(pa.Table.from_batches([lote]))
+        else:
+            self._writer.write_batch(lote)
+        self._lote = []
+    
+    def escrever(self, dados):
+        """Acrescenta os dados de um produto ao lote atual"""
+        linha = {campo: dados[campo] for campo in CAMPOS_TEXTO}
+        linha.update({campo: float(dados[campo]) for campo in CAMPOS_NUMERICOS})
+        
+        with self._lock:
+            self._lote.append(linha)
+            self.linhas += 1
+            if len(self._lote) >= self.tamanho_lote:
+                self._descarregar()
+    
+    def _fechar(self):
+        self._writer.close()
+        if self._arquivo is not None:
+            self._arquivo.close()
+    
+    def reescrever(self, registros):
+        """Recria o arquivo parcial com os dados de `registros` (ex.: na ordem original)"""
+        with self._lock:
+            self._lote = []
+            self._fechar()
+            self._abrir()
+            self.linhas = 0
+        for dados in registros:
+            self.escrever(dados)
+    
+    def concluir(self):
+        """Grava o último lote, fecha e move o arquivo para o nome definitivo"""
+        with self._lock:
+            self._descarregar()
+            self._fechar()
+            os.replace(self.caminho_parcial, self.caminho)
+    
+    def abortar(self):
+        """Fecha e descarta o arquivo parcial"""
+        with self._lock:
+            self._lote = []
+            self._fechar()
+            if os.path.exists(self.caminho_parcial):
+                os.remove(self.caminho_parcial)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, tipo, valor, traceback):
+        if tipo is None:
+            self.concluir()
+        else:
+            self.abortar()
+        return False
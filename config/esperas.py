@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+⏱️ Esperas baseadas em eventos
+Condições de WebDriverWait usadas no lugar de pausas fixas (time.sleep),
+para que o tempo por produto acompanhe a velocidade real da página
+"""
+
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+
+# Tempo máximo (segundos) que cada espera aguarda antes de desistir
+TIMEOUT_PADRAO = 10
+
+# Intervalo entre verificações das condições
+INTERVALO_VERIFICACAO = 0.25
+
+# Quanto esperar por novos itens depois de cada rolagem/"carregar mais" (grids com scroll infinito)
+TIMEOUT_ROLAGEM = 3
+
+# Rolagens máximas numa mesma página, caso o grid nunca pare de crescer
+LIMITE_ROLAGENS = 50
+
+TEXTO_DROPDOWN = "Informação Nutricional"
+
+def encontrar_dropdown(driver):
+    """Procura o summary do dropdown 'Informação Nutricional', retornando None se não existir"""
+    # Estratégia 1: Procurar pelo h2 específico com o texto "Informação Nutricional"
+    elementos = driver.find_elements(By.XPATH, f"//h2[@class=' font-heading h5 inline-richtext' and text()='{TEXTO_DROPDOWN}']")
+    for h2_elemento in elementos:
+        summaries = h2_elemento.find_elements(By.XPATH, "./ancestor::summary[@class='accordion-details__summary flex items-center justify-between focus-inset']")
+        if summaries:
+            return summaries[0]
+    
+    # Estratégia 2: Procurar por qualquer summary que contenha "Informação Nutricional"
+    elementos = driver.find_elements(By.XPATH, f"//summary[contains(., '{TEXTO_DROPDOWN}')]")
+    if elementos:
+        return elementos[0]
+    
+    # Estratégia 3: Procurar por todos os summary e verificar o texto
+    for summary in driver.find_elements(By.TAG_NAME, "summary"):
+        if TEXTO_DROPDOWN in summary.text:
+            return summary
+    
+    return None
+
+def aguardar_dropdown(driver, timeout=TIMEOUT_PADRAO):
+    """
+    Aguarda o dropdown aparecer, rolando a página a cada verificação sem sucesso
+    (conteúdo carregado sob demanda só aparece depois do scroll)
+    """
+    def condicao(driver):
+        dropdown = encontrar_dropdown(driver)
+        if dropdown is None:
+            driver.execute_script("window.scrollBy(0, 500);")
+            return False
+        return dropdown
+    
+    return WebDriverWait(driver, timeout, poll_frequency=INTERVALO_VERIFICACAO).until(condicao)
+
+def abrir_dropdown(driver, dropdown):
+    """Abre o <details> do dropdown via JavaScript (sem fechar se já estiver aberto)"""
+    driver.execute_script("""
+        const summary = arguments[0];
+        summary.scrollIntoView({block: 'center'});
+        const details = summary.closest('details');
+        if (!details || !details.open) {
+            summary.click();
+        }
+    """, dropdown)
+
+def aguardar_tabela(driver, dropdown, timeout=TIMEOUT_PADRAO):
+    """Aguarda a <table> ficar visível dentro do <details> aberto pelo dropdown"""
+    detalhes = dropdown.find_elements(By.XPATH, "./ancestor::details[1]")
+    
+    def condicao(driver):
+        try:
+            if detalhes:
+                if detalhes[0].get_attribute("open") is None:
+                    return False
+                tabelas = detalhes[0].find_elements(By.TAG_NAME, "table")
+            else:
+                # Sem <details>: usa a primeira tabela da página
+                tabelas = driver.find_elements(By.TAG_NAME, "table")
+            if tabelas and tabelas[0].is_displayed():
+                return tabelas[0]
+        except StaleElementReferenceException:
+            pass
+        return False
+    
+    return WebDriverWait(driver, timeout, poll_frequency=INTERVALO_VERIFICACAO).until(condicao)
+
+def aguardar_linhas_estaveis(driver, tabela, timeout=TIMEOUT_PADRAO):
+    """
+    Aguarda a quantidade de linhas da tabela parar de mudar entre duas verificações,
+    retornando essa quantidade
+    """
+    estado = {'quantidade': -1}
+    
+    def condicao(driver):
+        quantidade = driver.execute_script("return arguments[0].rows.length;", tabela)
+        if quantidade and quantidade == estado['quantidade']:
+            return quantidade
+        estado['quantidade'] = quantidade
+        return False
+    
+    return WebDriverWait(driver, timeout, poll_frequency=INTERVALO_VERIFICACAO).until(condicao)
+
+def contar_elementos(driver, seletor):
+    return driver.execute_script("return document.querySelectorAll(arguments[0]).length;", seletor)
+
+def aguardar_contagem_estavel(driver, seletor, timeout=TIMEOUT_PADRAO):
+    """
+    Aguarda existir ao menos um elemento do seletor CSS e a quantidade parar de
+    mudar entre duas verificações, retornando essa quantidade
+    """
+    estado = {'quantidade': -1}
+    
+    def condicao(driver):
+        quantidade = contar_elementos(driver, seletor)
+        if quantidade and quantidade == estado['quantidade']:
+            return quantidade
+        estado['quantidade'] = quantidade
+        return False
+    
+    return WebDriverWait(driver, timeout, poll_frequency=INTERVALO_VERIFICACAO).until(condicao)
+
+def carregar_sob_demanda(driver, seletor, seletor_botao, timeout=TIMEOUT_ROLAGEM):
+    """
+    Rola até o fim da página (clicando em "carregar mais", se existir) enquanto
+    surgirem novos elementos do seletor, retornando a quantidade final
+    """
+    quantidade = contar_elementos(driver, seletor)
+    
+    for _ in range(LIMITE_ROLAGENS):
+        driver.execute_script("""
+            window.scrollTo(0, document.body.scrollHeight);
+            const botao = document.querySelector(arguments[0]);
+            if (botao) {
+                botao.click();
+            }
+        """, seletor_botao)
+        
+        try:
+            WebDriverWait(driver, timeout, poll_frequency=INTERVALO_VERIFICACAO).until(
+                lambda driver: contar_elementos(driver, seletor) > quantidade
+            )
+        except TimeoutException:
+            # Nada novo apareceu: todo o conteúdo já foi carregado
+            break
+        quantidade = aguardar_contagem_estavel(driver, seletor, timeout)
+    
+    return quantidade
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+📡 Fluxo de eventos de progresso
+Os coletores emitem eventos estruturados (início de etapa, produto coletado,
+falha, fim) em vez de depender de linhas de texto. No mesmo processo os
+eventos vão direto para os ouvintes registrados (ex.: o painel do menu); para
+outros processos, SaidaJSONL os grava como JSON lines num pipe ou arquivo.
+"""
+
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+_ouvintes = []
+_lock = threading.Lock()
+
+def emitir(tipo, **dados):
+    """Envia um evento a todos os ouvintes (sem custo quando não há nenhum)"""
+    if not _ouvintes:
+        return
+    evento = {'tipo': tipo, 'instante': time.time(), **dados}
+    with _lock:
+        ouvintes = list(_ouvintes)
+    for ouvinte in ouvintes:
+        ouvinte(evento)
+
+def relatar_erro(mensagem, etapa, **dados):
+    """Mostra o erro no log e o emite como evento 'erro' (o painel do menu descarta o log)"""
+    print(f"❌ {mensagem}", flush=True)
+    emitir('erro', etapa=etapa, mensagem=mensagem, **dados)
+
+@contextmanager
+def ouvir(ouvinte):
+    """Registra `ouvinte(evento)` enquanto o bloco estiver ativo"""
+    with _lock:
+        _ouvintes.append(ouvinte)
+    try:
+        yield ouvinte
+    finally:
+        with _lock:
+            _ouvintes.remove(ouvinte)
+
+class SaidaJSONL:
+    """Ouvinte que grava cada evento como uma linha JSON (pipe, FIFO ou arquivo)"""
+
+    def __init__(self, arquivo):
+        self.arquivo = arquivo
+        self._lock = threading.Lock()
+
+    def __call__(self, evento):
+        linha = json.dumps(evento, ensure_ascii=False)
+        with self._lock:
+            self.arquivo.write(linha + '\n')
+            self.arquivo.flush()
+
+@contextmanager
+def emitir_para(caminho):
+    """Encaminha os eventos do bloco para `caminho` em JSON lines ('-' = stdout; None = desligado)"""
+    if not caminho:
+        yield None
+        return
+
+    if caminho == '-':
+        with ouvir(SaidaJSONL(sys.stdout)) as saida:
+            yield saida
+        return
+
+    with open(caminho, 'a', encoding='utf-8', buffering=1) as arquivo, ouvir(SaidaJSONL(arquivo)) as saida:
+        yield saida
+
+def ler_eventos(linhas):
+    """Lê eventos de um fluxo de JSON lines, ignorando linhas que não são eventos"""
+    for linha in linhas:
+        linha = linha.strip()
+        if not linha.startswith('{'):
+            continue
+        try:
+            evento = json.loads(linha)
+        except ValueError:
+            continue
+        if isinstance(evento, dict) and 'tipo' in evento:
+            yield evento
+
+class Progresso:
+    """
+    Acumula os eventos de uma etapa: total, concluídos, falhas e ETA.
+
+    Eventos usados (todos com o campo 'etapa'): 'inicio' (total), 'total'
+    (total atualizado), 'item' (ok, nome/url), 'erro' (mensagem) e 'fim'. Com `etapa`, eventos
+    de outras etapas são ignorados. Eventos 'total' marcados com 'loja' (agendador
+    multi-loja) são somados entre as lojas.
+    """
+
+    def __init__(self, etapa=None):
+        self.etapa = etapa
+        self.total = None
+        self.concluidos = 0
+        self.falhas = 0
+        self.ultimo = None
+        self.finalizado = False
+        self.erros = []
+        self._totais_lojas = {}
+        self.inicio = time.monotonic()
+
+    def __call__(self, evento):
+        if self.etapa is not None and evento.get('etapa') != self.etapa:
+            return
+
+        tipo = evento['tipo']
+        if tipo == 'inicio':
+            self.etapa = evento.get('etapa')
+            self.total = evento.get('total')
+            self.inicio = time.monotonic()
+        elif tipo == 'total' and 'loja' in evento:
+            self._totais_lojas[evento['loja']] = evento.get('total') or 0
+            self.total = sum(self._totais_lojas.values())
+        elif tipo == 'total':
+            self.total = evento.get('total')
+        elif tipo == 'item':
+            if evento.get('ok'):
+                self.concluidos += 1
+            else:
+                self.falhas += 1
+            self.ultimo = evento.get('nome') or evento.get('url')
+        elif tipo == 'erro':
+            self.erros.append(evento.get('mensagem'))
+        elif tipo == 'fim':
+            self.finalizado = True
+
+    @property
+    def processados(self):
+        return self.concluidos + self.falhas
+
+    def eta(self):
+        """Segundos estimados até o fim, ou None se ainda não há base para estimar"""
+        if not self.total or not self.processados:
+            return None
+        decorrido = time.monotonic() - self.inicio
+        return decorrido / self.processados * max(0, self.total - self.processados)
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+🕰️ Histórico de coletas
+Banco SQLite que guarda, a cada execução, apenas os campos que mudaram por
+produto (chave: slug). Permite consultar o estado do catálogo em qualquer
+execução e o que mudou entre duas execuções sem manter cópias completas dos CSVs.
+
+Uso:
+    python config/historico.py execucoes
+    python config/historico.py estado <execucao> [--conjunto nutricao|urls]
+    python config/historico.py diff <execucao_x> <execucao_y> [--conjunto nutricao|urls]
+"""
+
+import argparse
+import os
+import sqlite3
+from datetime import datetime
+from nutricao import CAMPOS_DADOS
+
+CAMINHO_HISTORICO = 'dados/historico.sqlite'
+
+# Campos versionados por conjunto de dados (data_coleta muda a cada execução e fica de fora)
+CAMPOS_POR_CONJUNTO = {
+    'urls': ['nome_produto', 'url', 'categoria'],
+    'nutricao': CAMPOS_DADOS
+}
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS execucoes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    conjunto TEXT NOT NULL,
+    iniciada_em TEXT NOT NULL,
+    produtos INTEGER NOT NULL DEFAULT 0,
+    alteracoes INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS alteracoes (
+    execucao_id INTEGER NOT NULL REFERENCES execucoes(id),
+    conjunto TEXT NOT NULL,
+    slug TEXT NOT NULL,
+    campo TEXT NOT NULL,
+    valor TEXT,
+    PRIMARY KEY (conjunto, slug, campo, execucao_id)
+);
+CREATE INDEX IF NOT EXISTS idx_alteracoes_execucao ON alteracoes (execucao_id);
+CREATE TABLE IF NOT EXISTS estado_atual (
+    conjunto TEXT NOT NULL,
+    slug TEXT NOT NULL,
+    campo TEXT NOT NULL,
+    valor TEXT,
+    PRIMARY KEY (conjunto, slug, campo)
+);
+"""
+
+def slug_de(dados):
+    """Slug do produto (o mesmo de extrair_produtos_grid_real)"""
+    return dados.get('slug') or dados['url'].split('/products/')[-1]
+
+def normalizar_valor(valor):
+    """Representação textual estável (163, 163.0 e '163' viram '163.0')"""
+    if valor is None:
+        return None
+    if isinstance(valor, (int, float)):
+        return repr(float(valor))
+    try:
+        return repr(float(valor))
+    except ValueError:
+        return str(valor)
+
+class HistoricoColeta:
+    """Armazena as alterações campo a campo de cada produto por execução"""
+    
+    def __init__(self, caminho=CAMINHO_HISTORICO):
+        os.makedirs(os.path.dirname(caminho) or '.', exist_ok=True)
+        self.conexao = sqlite3.connect(caminho)
+        self.conexao.executescript(ESQUEMA)
+    
+    def fechar(self):
+        self.conexao.close()
+    
+    def registrar_execucao(self, registros, conjunto='nutricao', prefixo=''):
+        """
+        Registra uma execução, gravando só os campos que diferem do estado atual.
+        `prefixo` separa as chaves de lojas diferentes (ex.: 'europa/').
+        Retorna (id da execução, quantidade de alterações).
+        """
+        campos = CAMPOS_POR_CONJUNTO[conjunto]
+        
+        with self.conexao:
+            cursor = self.conexao.execute(
+                "INSERT INTO execucoes (conjunto, iniciada_em) VALUES (?, ?)",
+                (conjunto, datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+            )
+            execucao_id = cursor.lastrowid
+            
+            estado = {}
+            for slug, campo, valor in self.conexao.execute(
+                    "SELECT slug, campo, valor FROM estado_atual WHERE conjunto = ?", (conjunto,)):
+                estado[(slug, campo)] = valor
+            
+            novas = []
+            produtos = 0
+            for dados in registros:
+                produtos += 1
+                slug = prefixo + slug_de(dados)
+                for campo in campos:
+                    valor = normalizar_valor(dados.get(campo))
+                    if (slug, campo) not in estado or estado[(slug, campo)] != valor:
+                        novas.append((execucao_id, conjunto, slug, campo, valor))
+                        estado[(slug, campo)] = valor
+            
+            self.conexao.executemany(
+                "INSERT INTO alteracoes (execucao_id, conjunto, slug, campo, valor) VALUES (?, ?, ?, ?, ?)", novas
+            )
+            self.conexao.executemany(
+                "INSERT OR REPLACE INTO estado_atual (conjunto, slug, campo, valor) VALUES (?, ?, ?, ?)",
+                [(conjunto, slug, campo, valor) for _, _, slug, campo, valor in novas]
+            )
+            self.conexao.execute(
+                "UPDATE execucoes SET produtos = ?, alteracoes = ? WHERE id = ?",
+                (produtos, len(novas), execucao_id)
+            )
+        
+        return execucao_id, len(novas)
+    
+    def listar_execucoes(self):
+        """Lista (id, conjunto, iniciada_em, produtos, alteracoes) de todas as execuções"""
+        return self.conexao.execute(
+            "SELECT id, conjunto, iniciada_em, produtos, alteracoes FROM execucoes ORDER BY id"
+        ).fetchall()
+    
+    def estado_em(self, execucao_id, conjunto='nutricao'):
+        """Estado do catálogo ao final da execução: {slug: {campo: valor}}"""
+        linhas = self.conexao.execute("""
+            SELECT a.slug, a.campo, a.valor
+            FROM alteracoes a
+            WHERE a.conjunto = ?
+              AND a.execucao_id = (
+                  SELECT MAX(b.execucao_id) FROM alteracoes b
+                  WHERE b.conjunto = a.conjunto AND b.slug = a.slug AND b.campo = a.campo
+                    AND b.execucao_id <= ?
+              )
+        """, (conjunto, execucao_id))
+        
+        estado = {}
+        for slug, campo, valor in linhas:
+            estado.setdefault(slug, {})[campo] = valor
+        return estado
+    
+    def alteracoes_entre(self, execucao_x, execucao_y, conjunto='nutricao'):
+        """Lista (slug, campo, valor em X, valor em Y) dos campos que mudaram de X para Y"""
+        antes = self.estado_em(execucao_x, conjunto)
+        tocados = self.conexao.execute("""
+            SELECT DISTINCT slug, campo FROM alteracoes
+            WHERE conjunto = ? AND execucao_id > ? AND execucao_id <= ?
+        """, (conjunto, execucao_x, execucao_y)).fetchall()
+        
+        depois = self.estado_em(execucao_y, conjunto)
+        mudancas = []
+        for slug, campo in sorted(tocados):
+            valor_x = antes.get(slug, {}).get(campo)
+            valor_y = depois.get(slug, {}).get(campo)
+            if valor_x != valor_y:
+                mudancas.append((slug, campo, valor_x, valor_y))
+        return mudancas
+
+def registrar_historico(registros, conjunto, caminho=CAMINHO_HISTORICO, prefixo=''):
+    """Registra uma execução no histórico e mostra quantos campos mudaram"""
+    historico = HistoricoColeta(caminho)
+    try:
+        execucao_id, alteracoes = historico.registrar_execucao(registros, conjunto, prefixo)
+        rotulo = f"{conjunto}, {prefixo.rstrip('/')}" if prefixo else conjunto
+        print(f"🕰️ Histórico: execução #{execucao_id} ({rotulo}) com {alteracoes} campos alterados", flush=True)
+        return execucao_id
+    finally:
+        historico.fechar()
+
+def main():
+    """Consultas ao histórico pela linha de comando"""
+    parser = argparse.ArgumentParser(description="Histórico de coletas Max Titanium Europa")
+    sub = parser.add_subparsers(dest='comando', required=True)
+    sub.add_parser('execucoes', help="Lista as execuções registradas")
+    estado = sub.add_parser('estado', help="Estado do catálogo em uma execução")
+    estado.add_argument('execucao', type=int)
+    estado.add_argument('--conjunto', choices=sorted(CAMPOS_POR_CONJUNTO), default='nutricao')
+    diff = sub.add_parser('diff', help="O que mudou entre duas execuções")
+    diff.add_argument('execucao_x', type=int)
+    diff.add_argument('execucao_y', type=int)
+    diff.add_argument('--conjunto', choices=sorted(CAMPOS_POR_CONJUNTO), default='nutricao')
+    args = parser.parse_args()
+    
+    historico = HistoricoColeta()
+    try:
+        if args.comando == 'execucoes':
+            for execucao_id, conjunto, iniciada_em, produtos, alteracoes in historico.listar_execucoes():
+                print(f"#{execucao_id:<4} {iniciada_em}  {conjunto:<9} {produtos:>5} produtos  {alteracoes:>6} alterações")
+        
+        elif args.comando == 'estado':
+            for slug, campos in sorted(historico.estado_em(args.execucao, args.conjunto).items()):
+                print(f"• {slug}")
+                for campo, valor in campos.items():
+                    print(f"    {campo}: {valor}")
+        
+        elif args.comando == 'diff':
+            mudancas = historico.alteracoes_entre(args.execucao_x, args.execucao_y, args.conjunto)
+            for slug, campo, valor_x, valor_y in mudancas:
+                print(f"• {slug} | {campo}: {valor_x} → {valor_y}")
+            print(f"\n{len(mudancas)} campos alterados entre #{args.execucao_x} e #{args.execucao_y}")
+    finally:
+        historico.fechar()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+🏬 Configuração declarativa das lojas
+Cada loja (EU, BR, outras regiões) é descrita em config/lojas.json com a URL
+base, as coleções, os seletores do grid e o orçamento de concorrência.
+Novas lojas entram no arquivo, sem mudanças no código.
+"""
+
+import json
+import os
+
+CAMINHO_LOJAS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'lojas.json')
+
+# Saídas de cada loja quando várias são coletadas juntas (dados/lojas/<nome>/)
+PASTA_LOJAS = os.path.join('dados', 'lojas')
+
+# Seletores do tema usado pela loja europeia (usados quando a loja não define os seus)
+SELETORES_PADRAO = {
+    'grid': "#ProductsList",
+    'cards': "#ProductsList .f-column .product-card",
+    'link': "a[href*='/products/']",
+    'titulo': "h3.product-card__title a",
+    # Paginação do grid: links "?page=N", link para a próxima página e botão "carregar mais"
+    'paginas': "a[href*='page=']",
+    'proxima': "link[rel='next'], a[rel='next'], .pagination__item--next",
+    'carregar_mais': "button.load-more, a.load-more, [data-load-more]"
+}
+
+ORCAMENTO_PADRAO = {
+    'workers': 2,
+    'max_por_host': 2,
+    'taxa': 0.5
+}
+
+def normalizar_loja(loja):
+    """Completa uma loja do arquivo com os valores padrão"""
+    return {
+        'nome': loja['nome'],
+        'descricao': loja.get('descricao', loja['nome']),
+        'base_url': loja['base_url'].rstrip('/'),
+        'ativa': loja.get('ativa', True),
+        'colecoes': loja.get('colecoes', []),
+        'seletores': {**SELETORES_PADRAO, **loja.get('seletores', {})},
+        'orcamento': {**ORCAMENTO_PADRAO, **loja.get('orcamento', {})}
+    }
+
+def carregar_configuracao(caminho=CAMINHO_LOJAS):
+    """Lê o arquivo de lojas, retornando (nome da loja padrão, {nome: loja})"""
+    with open(caminho, 'r', encoding='utf-8') as f:
+        configuracao = json.load(f)
+
+    lojas = {}
+    for loja in configuracao['lojas']:
+        loja = normalizar_loja(loja)
+        lojas[loja['nome']] = loja
+    return configuracao.get('padrao', next(iter(lojas))), lojas
+
+def carregar_lojas(nomes=None, caminho=CAMINHO_LOJAS):
+    """Lojas a coletar: as indicadas em `nomes` ou, sem nomes, todas as ativas"""
+    _, lojas = carregar_configuracao(caminho)
+    if not nomes:
+        return [loja for loja in lojas.values() if loja['ativa']]
+
+    desconhecidas = [nome for nome in nomes if nome not in lojas]
+    if desconhecidas:
+        raise ValueError(f"Lojas não configuradas em {caminho}: {', '.join(desconhecidas)}")
+    return [lojas[nome] for nome in nomes]
+
+def loja_padrao(caminho=CAMINHO_LOJAS):
+    """A loja usada pelos scripts individuais (urls.py, coleta.py)"""
+    padrao, lojas = carregar_configuracao(caminho)
+    return lojas[padrao]
+
+def categorias_configuradas(loja):
+    """Converte as coleções da loja no formato [{'nome', 'url'}] usado pelo coletor de URLs"""
+    return [
+        {'nome': colecao['nome'], 'url': f"{loja['base_url']}/collections/{colecao['handle']}"}
+        for colecao in loja['colecoes']
+    ]
+
+def pasta_da_loja(loja):
+    """Pasta de saída da loja no agendador multi-loja"""
+    return os.path.join(PASTA_LOJAS, loja['nome'])
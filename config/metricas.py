@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+⏱️ Métricas de tempo por etapa
+Mede as etapas do caminho crítico (criação do driver, driver.get, busca do
+dropdown, extração da tabela, parsing, escrita do CSV...) e gera registros
+por produto e resumos p50/p95/p99, exportados em JSON lines e no formato
+texto do Prometheus
+"""
+
+import json
+import math
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+CAMINHO_JSONL = 'dados/metricas.jsonl'
+CAMINHO_PROMETHEUS = 'dados/metricas.prom'
+
+QUANTIS = (0.5, 0.95, 0.99)
+
+def percentil(valores, quantil):
+    """Percentil pelo método nearest-rank (valores já ordenados)"""
+    if not valores:
+        return 0.0
+    posicao = max(1, math.ceil(quantil * len(valores)))
+    return valores[posicao - 1]
+
+class RegistroMetricas:
+    """
+    Acumula as durações de cada etapa. Dentro de `produto(url)`, as etapas
+    medidas pela mesma thread também entram no registro daquele produto.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.reiniciar()
+
+    def reiniciar(self):
+        """Descarta as medições anteriores (início de uma nova execução)"""
+        with self._lock:
+            self.registros = []
+            self.duracoes = defaultdict(list)
+
+    def _acumular(self, etapa, duracao):
+        with self._lock:
+            self.duracoes[etapa].append(duracao)
+
+    @contextmanager
+    def produto(self, url, **extras):
+        """Abre o registro de um produto (ou categoria); a etapa 'total' mede o bloco inteiro"""
+        registro = {'url': url, **extras, 'inicio': time.time(), 'etapas': {}}
+        anterior = getattr(self._local, 'registro', None)
+        self._local.registro = registro
+        inicio = time.perf_counter()
+        try:
+            yield registro
+        finally:
+            duracao = time.perf_counter() - inicio
+            self._local.registro = anterior
+            registro['total'] = round(duracao, 4)
+            self._acumular('total', duracao)
+            with self._lock:
+                self.registros.append(registro)
+
+    @contextmanager
+    def medir(self, etapa):
+        """Mede a duração de uma etapa"""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            duracao = time.perf_counter() - inicio
+            self._acumular(etapa, duracao)
+            registro = getattr(self._local, 'registro', None)
+            if registro is not None:
+                registro['etapas'][etapa] = round(registro['etapas'].get(etapa, 0) + duracao, 4)
+
+    def resumo(self):
+        """Retorna {etapa: {'quantidade', 'soma', 'p50', 'p95', 'p99'}}"""
+        with self._lock:
+            duracoes = {etapa: sorted(valores) for etapa, valores in self.duracoes.items()}
+
+        resumo = {}
+        for etapa, valores in duracoes.items():
+            resumo[etapa] = {'quantidade': len(valores), 'soma': sum(valores)}
+            for quantil in QUANTIS:
+                resumo[etapa][f'p{int(quantil * 100)}'] = percentil(valores, quantil)
+        return resumo
+
+    def exibir_resumo(self):
+        """Mostra a tabela de percentis por etapa"""
+        resumo = self.resumo()
+        if not resumo:
+            return
+
+        print("\n⏱️ TEMPOS POR ETAPA (segundos):")
+        print(f"  {'etapa':<20} {'n':>6} {'p50':>8} {'p95':>8} {'p99':>8} {'total':>9}")
+        for etapa, valores in sorted(resumo.items(), key=lambda item: -item[1]['soma']):
+            print(f"  {etapa:<20} {valores['quantidade']:>6} {valores['p50']:>8.3f} {valores['p95']:>8.3f} "
+                  f"{valores['p99']:>8.3f} {valores['soma']:>9.2f}")
+
+    def exportar_jsonl(self, caminho=CAMINHO_JSONL):
+        """Grava um registro JSON por produto"""
+        os.makedirs(os.path.dirname(caminho) or '.', exist_ok=True)
+        with self._lock:
+            registros = list(self.registros)
+        with open(caminho, 'w', encoding='utf-8') as f:
+            for registro in registros:
+                f.write(json.dumps(registro, ensure_ascii=False) + '\n')
+
+    def exportar_prometheus(self, caminho=CAMINHO_PROMETHEUS):
+        """Grava os resumos no formato texto do Prometheus (metric type summary)"""
+        os.makedirs(os.path.dirname(caminho) or '.', exist_ok=True)
+        linhas = [
+            '# HELP scraper_etapa_segundos Duração das etapas da coleta',
+            '# TYPE scraper_etapa_segundos summary'
+        ]
+        for etapa, valores in sorted(self.resumo().items()):
+            for quantil in QUANTIS:
+                valor = valores[f'p{int(quantil * 100)}']
+                linhas.append(f'scraper_etapa_segundos{{etapa="{etapa}",quantile="{quantil}"}} {valor:.6f}')
+            linhas.append(f'scraper_etapa_segundos_sum{{etapa="{etapa}"}} {valores["soma"]:.6f}')
+            linhas.append(f'scraper_etapa_segundos_count{{etapa="{etapa}"}} {valores["quantidade"]}')
+
+        with open(caminho, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(linhas) + '\n')
+
+    def exportar(self, caminho_jsonl=CAMINHO_JSONL, caminho_prometheus=CAMINHO_PROMETHEUS):
+        """Exibe o resumo e grava os dois arquivos de métricas"""
+        self.exibir_resumo()
+        self.exportar_jsonl(caminho_jsonl)
+        self.exportar_prometheus(caminho_prometheus)
+        print(f"📈 Métricas salvas em: {caminho_jsonl} e {caminho_prometheus}", flush=True)
+
+# Registro global da execução
+METRICAS = RegistroMetricas()
+medir = METRICAS.medir
+produto_medido = METRICAS.produto
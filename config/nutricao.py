@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+🥗 Mapeamento da tabela nutricional
+Funções compartilhadas pelos motores de coleta (Selenium e HTTP) para montar
+o dicionário de dados de um produto a partir das linhas da tabela
+"""
+
+import json
+import os
+import re
+import unicodedata
+from functools import lru_cache
+
+# Campos do dicionário de dados de um produto, na ordem do CSV final
+CAMPOS_TEXTO = ['nome_produto', 'url', 'categoria']
+CAMPOS_NUMERICOS = [
+    'porcao_g', 'calorias_kcal', 'carboidratos_g', 'proteinas_g', 'gorduras_totais_g',
+    'gorduras_saturadas_g', 'fibras_g', 'acucares_g', 'sodio_mg'
+]
+CAMPOS_DADOS = CAMPOS_TEXTO + CAMPOS_NUMERICOS
+
+def dados_padrao(nome_produto, url, categoria):
+    """Retorna o dicionário de dados do produto com valores padrão 0"""
+    return {
+        'nome_produto': nome_produto,
+        'url': url,
+        'categoria': categoria,
+        'porcao_g': 0,
+        'calorias_kcal': 0,
+        'carboidratos_g': 0,
+        'proteinas_g': 0,
+        'gorduras_totais_g': 0,
+        'gorduras_saturadas_g': 0,
+        'fibras_g': 0,
+        'acucares_g': 0,
+        'sodio_mg': 0
+    }
+
+# Rótulos da tabela → campo do dicionário de dados, na ordem de prioridade.
+# Novos rótulos podem ser adicionados em rotulos_nutricionais.json
+CAMINHO_ROTULOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'rotulos_nutricionais.json')
+
+# Fatores para converter cada unidade para a unidade base da grandeza
+UNIDADES = {
+    'g': ('massa', 1.0),
+    'mg': ('massa', 0.001),
+    'mcg': ('massa', 0.000001),
+    'µg': ('massa', 0.000001),
+    'kcal': ('energia', 1.0),
+    'kj': ('energia', 1 / 4.184)
+}
+
+REGEX_VALOR = re.compile(r'(\d+(?:\.\d+)?)\s*(kcal|kj|mcg|µg|mg|g)?\b', re.IGNORECASE)
+
+# Unidade entre parênteses no rótulo ('sodio (mg)' → 'sodio')
+REGEX_PARENTESES = re.compile(r'\s*\([^)]*\)')
+
+def normalizar_rotulo(texto):
+    """Minúsculas, sem acentos e com espaços simples ('Sódio  (mg)' → 'sodio (mg)')"""
+    sem_acentos = unicodedata.normalize('NFKD', texto).encode('ascii', 'ignore').decode('ascii')
+    return ' '.join(sem_acentos.lower().split())
+
+def carregar_rotulos(caminho=CAMINHO_ROTULOS):
+    """Lê o mapeamento de rótulos, já normalizados: [(rótulo, campo, unidade), ...]"""
+    with open(caminho, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    return [
+        (normalizar_rotulo(item['rotulo']), item['campo'], item['unidade'].lower())
+        for item in config['rotulos']
+    ]
+
+class MapeadorNutricional:
+    """
+    Mapeia as linhas (rótulo, valor) da tabela para os campos do produto.
+    O rótulo normalizado é buscado primeiro num dicionário de rótulos exatos;
+    só os rótulos fora dele percorrem as regras de substring. O campo de cada
+    rótulo já visto fica em cache.
+    """
+    
+    def __init__(self, rotulos=None):
+        self.rotulos = rotulos if rotulos is not None else carregar_rotulos()
+        self.exatos = {}
+        for chave, campo, unidade in self.rotulos:
+            self.exatos.setdefault(chave, (campo, unidade))
+        self.campo_do_rotulo = lru_cache(maxsize=1024)(self._campo_do_rotulo)
+    
+    def _campo_do_rotulo(self, rotulo):
+        """Mapeamento exato do rótulo (com ou sem a unidade) ou o primeiro contido nele, ou None"""
+        normalizado = normalizar_rotulo(rotulo)
+        exato = self.exatos.get(normalizado) or self.exatos.get(REGEX_PARENTESES.sub('', normalizado).strip())
+        if exato:
+            return exato
+        
+        for chave, campo, unidade in self.rotulos:
+            if chave in normalizado:
+                return campo, unidade
+        return None
+    
+    def mapear(self, linhas):
+        """Retorna {campo: valor} para as linhas reconhecidas, em uma única passada"""
+        valores = {}
+        for rotulo, valor in linhas:
+            mapeamento = self.campo_do_rotulo(rotulo)
+            if mapeamento:
+                campo, unidade = mapeamento
+                numero = converter_valor(valor, unidade)
+                if numero is not None:
+                    valores[campo] = numero
+        return valores
+
+def converter_valor(texto, unidade_alvo):
+    """
+    Lê o valor de uma célula na unidade desejada ('163 kcal / 682 kJ', '0,5 g', '73mg').
+    
+    Usa o número que já está na unidade alvo; senão converte o primeiro número
+    com unidade da mesma grandeza (g ↔ mg, kJ → kcal); sem unidade alguma, usa
+    o primeiro número. Retorna None se não houver número.
+    """
+    if not texto:
+        return None
+    
+    encontrados = [(float(numero), unidade.lower() if unidade else None)
+                   for numero, unidade in REGEX_VALOR.findall(texto.replace(',', '.'))]
+    if not encontrados:
+        return None
+    
+    grandeza_alvo, fator_alvo = UNIDADES[unidade_alvo]
+    for numero, unidade in encontrados:
+        if unidade == unidade_alvo:
+            return numero
+    for numero, unidade in encontrados:
+        if unidade and UNIDADES[unidade][0] == grandeza_alvo:
+            return round(numero * UNIDADES[unidade][1] / fator_alvo, 3)
+    for numero, unidade in encontrados:
+        if unidade is None:
+            return numero
+    return None
+
+_mapeador_padrao = None
+
+def obter_mapeador():
+    """Mapeador compartilhado, carregado na primeira utilização"""
+    global _mapeador_padrao
+    if _mapeador_padrao is None:
+        _mapeador_padrao = MapeadorNutricional()
+    return _mapeador_padrao
+
+def preencher_dados(dados, linhas):
+    """Preenche os dados a partir de pares (campo, valor) lidos da tabela"""
+    dados.update(obter_mapeador().mapear(linhas))
+    return dados
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+🪶 Perfil enxuto do navegador
+Bloqueia, via CDP (Network.setBlockedURLs), imagens, fontes, mídia e scripts
+de terceiros (analytics, pixels, chat) que não influenciam a tabela
+nutricional, reduzindo os bytes baixados e o tempo de carga por produto
+"""
+
+PERFIL_COMPLETO = 'completo'
+PERFIL_ENXUTO = 'enxuto'
+PERFIS = (PERFIL_COMPLETO, PERFIL_ENXUTO)
+PERFIL_PADRAO = PERFIL_ENXUTO
+
+# Tipos de recurso bloqueados em qualquer domínio (por extensão)
+EXTENSOES_BLOQUEADAS = [
+    # Imagens
+    'jpg', 'jpeg', 'png', 'gif', 'webp', 'avif', 'svg', 'ico', 'bmp',
+    # Fontes
+    'woff', 'woff2', 'ttf', 'otf', 'eot',
+    # Mídia
+    'mp4', 'webm', 'mp3', 'ogg'
+]
+
+# Domínios de terceiros bloqueados por completo
+DOMINIOS_BLOQUEADOS = [
+    'google-analytics.com',
+    'googletagmanager.com',
+    'doubleclick.net',
+    'googleadservices.com',
+    'facebook.net',
+    'facebook.com',
+    'connect.facebook.net',
+    'analytics.tiktok.com',
+    'hotjar.com',
+    'clarity.ms',
+    'klaviyo.com',
+    'static.klaviyo.com',
+    'shopifycloud.com',
+    'monorail-edge.shopifysvc.com',
+    'youtube.com',
+    'ytimg.com',
+    'vimeo.com',
+    'fonts.googleapis.com',
+    'fonts.gstatic.com',
+    'widget.trustpilot.com',
+    'cdn.judge.me',
+    'tidio.co',
+    'zdassets.com'
+]
+
+# Lê os bytes transferidos pela página (documento + recursos do mesmo domínio)
+SCRIPT_TRANSFERENCIA = """
+const entradas = performance.getEntriesByType('navigation').concat(performance.getEntriesByType('resource'));
+let bytes = 0;
+for (const entrada of entradas) {
+    bytes += entrada.transferSize || 0;
+}
+return {bytes: bytes, recursos: entradas.length};
+"""
+
+def padroes_bloqueio(permitidos=()):
+    """
+    Monta a lista de padrões do Network.setBlockedURLs.
+
+    `permitidos` é a allow-list: domínios (ex.: 'cdn.shopify.com') ou
+    extensões (ex.: 'svg') que nunca devem ser bloqueados.
+    """
+    permitidos = {item.lower().lstrip('.') for item in permitidos}
+
+    padroes = [f'*.{extensao}*' for extensao in EXTENSOES_BLOQUEADAS if extensao not in permitidos]
+    padroes += [f'*://{dominio}/*' for dominio in DOMINIOS_BLOQUEADOS if dominio not in permitidos]
+    padroes += [f'*://*.{dominio}/*' for dominio in DOMINIOS_BLOQUEADOS if dominio not in permitidos]
+    return padroes
+
+def aplicar_perfil(driver, perfil=PERFIL_PADRAO, permitidos=()):
+    """Ativa (ou desativa, no perfil completo) o bloqueio de recursos num driver já aberto"""
+    driver.execute_cdp_cmd("Network.enable", {})
+    padroes = padroes_bloqueio(permitidos) if perfil == PERFIL_ENXUTO else []
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {'urls': padroes})
+
+def medir_transferencia(driver):
+    """
+    Bytes transferidos pela página atual, segundo a Resource Timing API.
+    Recursos de outros domínios sem Timing-Allow-Origin contam como 0.
+    """
+    medida = driver.execute_script(SCRIPT_TRANSFERENCIA)
+    return {'bytes': int(medida['bytes']), 'recursos': int(medida['recursos'])}
+
+def formatar_bytes(quantidade):
+    """Formata uma quantidade de bytes em B/KB/MB"""
+    if quantidade < 1024:
+        return f"{quantidade} B"
+    if quantidade < 1024 * 1024:
+        return f"{quantidade / 1024:.1f} KB"
+    return f"{quantidade / (1024 * 1024):.1f} MB"
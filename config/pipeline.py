@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+🔀 Pipeline de coleta completa (URLs + dados nutricionais) no mesmo processo
+Cada URL encontrada pelo coletor de URLs é colocada numa fila e consumida
+imediatamente pelos workers de extração, em vez de esperar o fim da
+descoberta e reler o CSV de URLs do disco.
+"""
+
+import argparse
+import os
+import queue
+import threading
+import time
+from contextlib import ExitStack
+
+from browser import obter_driver
+from ciclo_driver import CICLO_PADRAO
+from coleta import LimitadorPorHost, abrir_csv_saida, coletar_com_retentativas, linha_csv
+from coleta_http import criar_sessao, coletar_dados_produto_http
+from esperas import TIMEOUT_PADRAO
+from eventos import emitir, emitir_para, relatar_erro
+from historico import registrar_historico
+from lojas import categorias_configuradas, pasta_da_loja
+from metricas import METRICAS, medir, produto_medido
+from ritmo import TAXA_PADRAO, RitmoAdaptativo
+from urls import ColetorURLsEuropaEstruturaReal
+from variantes import TabelasCompartilhadas
+
+# Marca o fim da descoberta na fila (um por worker)
+FIM_DA_FILA = None
+
+def executar_pipeline(num_workers=2, max_por_host=2, backend='json', motor='http', timeout=TIMEOUT_PADRAO,
+                      pool=None, historico=False, taxa=TAXA_PADRAO, loja=None, sessao=None):
+    """
+    Descobre as URLs numa thread produtora enquanto `num_workers` threads extraem
+    os dados dos produtos já encontrados.
+
+    Com `loja` (uma entrada de config/lojas.json), coleta as coleções e usa os
+    seletores daquela loja, grava em dados/lojas/<nome>/ e marca os eventos com
+    o nome da loja; `sessao` permite compartilhar a sessão HTTP entre lojas.
+
+    Retorna (urls, dados_nutricionais); os dados ficam na ordem de conclusão.
+    """
+    fila = queue.Queue()
+    dados_nutricionais = []
+    lock = threading.Lock()
+    # Interrupção: os workers param e nada mais é gravado no arquivo parcial descartado
+    parar = threading.Event()
+    limitador = LimitadorPorHost(max_por_host)
+    ritmo = RitmoAdaptativo(taxa=taxa)
+    # Balde próprio para o navegador: latências do Selenium não se comparam às do HTTP
+    ritmo_navegador = ritmo.derivado()
+    # Variantes com acordeão idêntico reaproveitam a tabela já extraída
+    tabelas = TabelasCompartilhadas()
+    sessao_propria = sessao is None and motor == 'http'
+    if sessao_propria:
+        sessao = criar_sessao(tamanho_pool=max(1, num_workers))
+    elif motor != 'http':
+        sessao = None
+
+    if loja is None:
+        rotulo = {}
+        base_urls = 'urls_produtos_europa_estrutura_real'
+        escritor = abrir_csv_saida()
+        coletor = ColetorURLsEuropaEstruturaReal(backend=backend, pool=pool, ritmo=ritmo, sessao=sessao)
+    else:
+        rotulo = {'loja': loja['nome']}
+        pasta = pasta_da_loja(loja)
+        base_urls = os.path.relpath(os.path.join(pasta, 'urls_produtos'), 'dados')
+        escritor = abrir_csv_saida(os.path.join(pasta, 'dados_nutricionais.csv'))
+        coletor = ColetorURLsEuropaEstruturaReal(backend=backend, pool=pool, ritmo=ritmo, sessao=sessao,
+                                                 categorias=categorias_configuradas(loja),
+                                                 seletores=loja['seletores'])
+    resultado_descoberta = {'urls': [], 'erro': None}
+    descobertos = [0]
+
+    def ao_coletar(dados):
+        with medir('escrita_csv'), lock:
+            if parar.is_set():
+                return
+            dados_nutricionais.append(dados)
+            escritor.escrever(linha_csv(dados))
+
+    def ao_encontrar(produto):
+        # O total cresce à medida que a descoberta avança
+        descobertos[0] += 1
+        emitir('total', etapa='completa', total=descobertos[0], **rotulo)
+        fila.put(produto)
+
+    def produtor():
+        try:
+            resultado_descoberta['urls'] = coletor.coletar_todas_urls(
+                base_filename=base_urls, ao_encontrar=ao_encontrar
+            )
+        except Exception as e:
+            resultado_descoberta['erro'] = e
+            relatar_erro(f"Erro na coleta de URLs: {e}", 'completa', **rotulo)
+        finally:
+            for _ in range(num_workers):
+                fila.put(FIM_DA_FILA)
+
+    def worker(numero):
+        # Navegador aberto só se algum produto precisar dele
+        recursos = ExitStack()
+        driver = None
+        try:
+            while True:
+                produto = fila.get()
+                if produto is FIM_DA_FILA or parar.is_set():
+                    break
+
+                url, categoria = produto['url'], produto['categoria']
+                print(f"\n[W{numero}] {produto['nome_produto']}", flush=True)
+
+                with produto_medido(url, motor=motor) as registro:
+                    try:
+                        with limitador.semaforo(url):
+                            dados = None
+                            if sessao is not None:
+                                dados = coletar_dados_produto_http(sessao, url, categoria, timeout, ritmo=ritmo,
+                                                                   tabelas=tabelas)
+                            if dados is None:
+                                registro['motor'] = 'selenium'
+                                if driver is None:
+                                    driver = recursos.enter_context(obter_driver(pool, ciclo=CICLO_PADRAO))
+                                dados = coletar_com_retentativas(driver, url, categoria, timeout, ritmo_navegador, tabelas)
+                    except Exception as e:
+                        print(f"❌ [W{numero}] Erro em {url}: {str(e)}", flush=True)
+                        dados = None
+
+                    if dados:
+                        ao_coletar(dados)
+                emitir('item', etapa='completa', ok=bool(dados), url=url,
+                       nome=dados['nome_produto'] if dados else None, **rotulo)
+        finally:
+            recursos.close()
+
+    # Com várias lojas, o início e o fim da etapa são anunciados pelo agendador
+    if loja is None:
+        emitir('inicio', etapa='completa', total=None)
+    threads = [threading.Thread(target=produtor, daemon=True)]
+    threads += [threading.Thread(target=worker, args=(n,), daemon=True) for n in range(1, num_workers + 1)]
+
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    except BaseException:
+        # Ctrl+C ou erro: os workers terminam o produto atual antes de o arquivo ser descartado
+        parar.set()
+        for _ in range(num_workers):
+            fila.put(FIM_DA_FILA)
+        for thread in threads[1:]:
+            if thread.is_alive():
+                thread.join(timeout=timeout)
+        with lock:
+            escritor.abortar()
+        raise
+    finally:
+        if sessao_propria:
+            sessao.close()
+
+    if loja is None:
+        emitir('fim', etapa='completa')
+    urls = resultado_descoberta['urls']
+    if dados_nutricionais:
+        escritor.concluir()
+        if historico:
+            registrar_historico(urls, 'urls')
+            registrar_historico(dados_nutricionais, 'nutricao')
+    else:
+        escritor.abortar()
+
+    return urls, dados_nutricionais
+
+def main(argv=None, pool=None):
+    """
+    Função principal.
+
+    Quando chamada pelo menu, recebe o pool de navegadores da sessão.
+    Retorna True se algum dado nutricional foi salvo.
+    """
+    parser = argparse.ArgumentParser(description="Coleta completa (URLs + dados nutricionais) em pipeline")
+    parser.add_argument('--workers', type=int, default=2,
+                        help="Número de workers de extração (padrão: 2)")
+    parser.add_argument('--max-por-host', type=int, default=2,
+                        help="Máximo de páginas simultâneas por host (padrão: 2)")
+    parser.add_argument('--backend', choices=['json', 'dom'], default='json',
+                        help="Descoberta de URLs: 'json' (products.json, com fallback para o grid) ou 'dom' (padrão: json)")
+    parser.add_argument('--motor', choices=['http', 'selenium'], default='http',
+                        help="Extração: 'http' (com fallback para Selenium) ou 'selenium' (padrão: http)")
+    parser.add_argument('--timeout', type=float, default=TIMEOUT_PADRAO,
+                        help=f"Tempo máximo de espera por página/elemento, em segundos (padrão: {TIMEOUT_PADRAO})")
+    parser.add_argument('--historico', action='store_true',
+                        help="Registra as alterações desta execução no histórico (dados/historico.sqlite)")
+    parser.add_argument('--taxa', type=float, default=TAXA_PADRAO,
+                        help=f"Taxa inicial de requisições por segundo, ajustada conforme o site responde (padrão: {TAXA_PADRAO})")
+    parser.add_argument('--metricas', action='store_true',
+                        help="Exibe p50/p95/p99 por etapa e grava dados/metricas.jsonl e dados/metricas.prom")
+    parser.add_argument('--eventos', metavar='CAMINHO',
+                        help="Grava os eventos de progresso em JSON lines (arquivo, FIFO, /dev/fd/N ou '-' para stdout)")
+    args = parser.parse_args(argv)
+
+    METRICAS.reiniciar()
+    inicio = time.monotonic()
+    recursos = ExitStack()
+    recursos.enter_context(emitir_para(args.eventos))
+
+    try:
+        urls, dados_nutricionais = executar_pipeline(
+            num_workers=max(1, args.workers), max_por_host=args.max_por_host, backend=args.backend,
+            motor=args.motor, timeout=args.timeout, pool=pool, historico=args.historico, taxa=args.taxa
+        )
+    except KeyboardInterrupt:
+        print("\n⚠️  Coleta interrompida pelo usuário.")
+        return False
+    except Exception as e:
+        relatar_erro(f"Erro: {str(e)}", 'completa')
+        return False
+    finally:
+        if args.metricas:
+            METRICAS.exportar()
+        recursos.close()
+
+    duracao = time.monotonic() - inicio
+    print(f"\n✅ {len(urls)} URLs e {len(dados_nutricionais)} produtos em {duracao:.1f}s")
+    return bool(dados_nutricionais)
+
+if __name__ == "__main__":
+    print("🔀 COLETA COMPLETA EM PIPELINE")
+    print("=" * 50)
+    main()
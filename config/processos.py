@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+🧹 Processos do navegador
+Lê a árvore de processos em /proc (chromedriver → chrome → renderers) para
+medir a memória residente do navegador. Fora do Linux as funções retornam
+vazio/None e as políticas que dependem delas ficam desligadas.
+"""
+
+import os
+
+PASTA_PROC = '/proc'
+
+def proc_disponivel():
+    return os.path.isdir(os.path.join(PASTA_PROC, 'self'))
+
+def tabela_processos():
+    """Retorna {pid: (ppid, nome)} de todos os processos visíveis"""
+    processos = {}
+    if not proc_disponivel():
+        return processos
+
+    for entrada in os.listdir(PASTA_PROC):
+        if not entrada.isdigit():
+            continue
+        try:
+            with open(os.path.join(PASTA_PROC, entrada, 'stat'), 'r', encoding='utf-8', errors='replace') as f:
+                stat = f.read()
+        except OSError:
+            # Processo encerrado durante a leitura
+            continue
+        # Formato: "pid (nome) estado ppid ..."; o nome pode conter espaços e parênteses
+        nome = stat[stat.find('(') + 1:stat.rfind(')')]
+        campos = stat[stat.rfind(')') + 2:].split()
+        processos[int(entrada)] = (int(campos[1]), nome)
+    return processos
+
+def descendentes(pid, processos=None):
+    """PIDs de todos os processos descendentes de `pid`"""
+    processos = processos if processos is not None else tabela_processos()
+    filhos = {}
+    for filho, (pai, _) in processos.items():
+        filhos.setdefault(pai, []).append(filho)
+
+    encontrados = []
+    pendentes = list(filhos.get(pid, []))
+    while pendentes:
+        atual = pendentes.pop()
+        encontrados.append(atual)
+        pendentes.extend(filhos.get(atual, []))
+    return encontrados
+
+def rss_kb(pid):
+    """Memória residente de um processo, em KB (0 se não existir mais)"""
+    try:
+        with open(os.path.join(PASTA_PROC, str(pid), 'status'), 'r', encoding='utf-8') as f:
+            for linha in f:
+                if linha.startswith('VmRSS:'):
+                    return int(linha.split()[1])
+    except (OSError, ValueError, IndexError):
+        pass
+    return 0
+
+def rss_arvore_mb(pid):
+    """Memória residente de `pid` e seus descendentes, em MB (None fora do Linux)"""
+    if pid is None or not proc_disponivel():
+        return None
+    return sum(rss_kb(p) for p in [pid] + descendentes(pid)) / 1024
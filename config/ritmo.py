@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+🚦 Ritmo adaptativo e retentativas
+Balde de fichas (token bucket) que substitui as pausas fixas entre produtos:
+a taxa sobe enquanto o site responde bem e cai quando a latência aumenta ou
+chegam respostas 429/5xx. Falhas transitórias são repetidas com backoff
+exponencial e jitter, em vez de descartar o produto. Cada motor (HTTP,
+navegador) usa o próprio balde, já que as latências não são comparáveis.
+"""
+
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from metricas import medir
+
+# Respostas que indicam sobrecarga ou falha temporária do servidor
+STATUS_TRANSITORIOS = {429, 500, 502, 503, 504}
+
+TENTATIVAS_PADRAO = 4
+
+# Taxa inicial (requisições por segundo) do balde de fichas
+TAXA_PADRAO = 0.5
+
+class ErroTransitorio(Exception):
+    """
+    Falha que vale a pena repetir; `espera` vem do Retry-After, quando houver.
+    Com `sobrecarga=False` (ex.: conteúdo ausente na página) a falha é repetida
+    mas não reduz a taxa, que só cai com falhas do servidor ou da rede.
+    """
+
+    def __init__(self, mensagem, espera=None, sobrecarga=True):
+        super().__init__(mensagem)
+        self.espera = espera
+        self.sobrecarga = sobrecarga
+
+def ler_retry_after(valor):
+    """Converte o cabeçalho Retry-After (segundos ou data HTTP) em segundos"""
+    if not valor:
+        return None
+    try:
+        return max(0.0, float(valor))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(valor).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class RitmoAdaptativo:
+    """
+    Balde de fichas compartilhado entre os workers.
+
+    Cada requisição consome uma ficha; as fichas são repostas a `taxa` por
+    segundo até `capacidade`. Sucessos rápidos aumentam a taxa (aditivamente),
+    respostas lentas a reduzem um pouco e 429/5xx a cortam pela metade.
+    """
+
+    def __init__(self, taxa=TAXA_PADRAO, capacidade=2, taxa_minima=0.05, taxa_maxima=5.0, incremento=0.05):
+        self.taxa = taxa
+        self.capacidade = capacidade
+        self.taxa_minima = taxa_minima
+        self.taxa_maxima = taxa_maxima
+        self.incremento = incremento
+        self.latencia_media = None
+        self._fichas = float(capacidade)
+        self._ultima_reposicao = time.monotonic()
+        self._bloqueado_ate = 0.0
+        self._lock = threading.Lock()
+
+    def derivado(self):
+        """Balde independente com os mesmos parâmetros (para outro motor)"""
+        return RitmoAdaptativo(taxa=self.taxa, capacidade=self.capacidade, taxa_minima=self.taxa_minima,
+                               taxa_maxima=self.taxa_maxima, incremento=self.incremento)
+
+    def _repor(self, agora):
+        decorrido = agora - self._ultima_reposicao
+        self._fichas = min(self.capacidade, self._fichas + decorrido * self.taxa)
+        self._ultima_reposicao = agora
+
+    def aguardar(self):
+        """Bloqueia até haver uma ficha disponível e a consome"""
+        while True:
+            with self._lock:
+                agora = time.monotonic()
+                self._repor(agora)
+                if agora >= self._bloqueado_ate and self._fichas >= 1:
+                    self._fichas -= 1
+                    return
+                espera = max(self._bloqueado_ate - agora, (1 - self._fichas) / self.taxa)
+            time.sleep(espera)
+
+    def registrar_sucesso(self, latencia):
+        """Ajusta a taxa de acordo com a latência observada"""
+        with self._lock:
+            if self.latencia_media is None:
+                self.latencia_media = latencia
+            lenta = latencia > 2 * self.latencia_media
+            self.latencia_media = 0.8 * self.latencia_media + 0.2 * latencia
+
+            if lenta:
+                self.taxa = max(self.taxa_minima, self.taxa * 0.8)
+            else:
+                self.taxa = min(self.taxa_maxima, self.taxa + self.incremento)
+
+    def registrar_falha(self, espera=None):
+        """Reduz a taxa pela metade; com Retry-After, pausa todos os workers"""
+        with self._lock:
+            self.taxa = max(self.taxa_minima, self.taxa / 2)
+            self._fichas = min(self._fichas, 0.0)
+            if espera:
+                self._bloqueado_ate = max(self._bloqueado_ate, time.monotonic() + espera)
+
+def calcular_backoff(tentativa, base=1.0, maximo=30.0):
+    """Backoff exponencial com jitter completo: aleatório entre 0 e base * 2^tentativa"""
+    return random.uniform(0, min(maximo, base * (2 ** tentativa)))
+
+def com_retentativas(funcao, *args, tentativas=TENTATIVAS_PADRAO, ritmo=None, excecoes=(ErroTransitorio,),
+                     descricao='', **kwargs):
+    """
+    Executa `funcao(*args, **kwargs)` respeitando o ritmo, repetindo em caso
+    de `excecoes`. Após a última tentativa a exceção é propagada.
+    """
+    for tentativa in range(tentativas):
+        if ritmo is not None:
+            with medir('espera_ritmo'):
+                ritmo.aguardar()
+
+        inicio = time.monotonic()
+        try:
+            resultado = funcao(*args, **kwargs)
+        except excecoes as e:
+            espera_servidor = getattr(e, 'espera', None)
+            if ritmo is not None and getattr(e, 'sobrecarga', True):
+                ritmo.registrar_falha(espera_servidor)
+            if tentativa == tentativas - 1:
+                raise
+
+            espera = max(calcular_backoff(tentativa), espera_servidor or 0)
+            print(f"🔁 {descricao or 'Falha transitória'} ({e}); tentativa {tentativa + 2}/{tentativas} "
+                  f"em {espera:.1f}s", flush=True)
+            with medir('backoff'):
+                time.sleep(espera)
+        else:
+            if ritmo is not None:
+                ritmo.registrar_sucesso(time.monotonic() - inicio)
+            return resultado
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+🛡️ Supervisor de workers em processos filhos
+Cada worker roda num processo próprio e recebe um produto por vez. Se um
+produto passa do prazo (Chrome travado) ou o processo morre, o supervisor
+encerra o worker junto com os processos do navegador (chromedriver, chrome,
+renderers), sobe outro no lugar e devolve a URL à fila, limitando a latência
+de cauda da coleta ao prazo por produto.
+"""
+
+import multiprocessing
+import os
+import signal
+import sys
+import time
+from collections import deque
+from multiprocessing.connection import wait
+
+from metricas import percentil
+from processos import descendentes, tabela_processos
+
+# Prazo padrão por produto, em segundos (inclui as retentativas e a abertura do navegador)
+PRAZO_PADRAO = 120
+
+# Quantas vezes um produto volta à fila depois de derrubar um worker
+MAX_REENVIOS = 2
+
+# Intervalo entre verificações de prazo e das árvores de processos
+INTERVALO_VERIFICACAO = 0.5
+
+# Processos do navegador que podem ficar órfãos quando o worker é encerrado
+NOMES_NAVEGADOR = ('chrome', 'chromium', 'chromedriver')
+
+def servir(conexao, processar):
+    """
+    Laço do processo filho: recebe (índice, tarefa), responde ('fim', índice,
+    resultado) e termina ao receber None
+    """
+    while True:
+        try:
+            tarefa = conexao.recv()
+        except EOFError:
+            break
+        if tarefa is None:
+            break
+
+        indice, dados = tarefa
+        try:
+            resultado = processar(dados)
+        except Exception as e:
+            print(f"❌ Erro no worker {os.getpid()}: {e}", flush=True)
+            resultado = None
+        conexao.send(('fim', indice, resultado))
+
+def _iniciar_processo(alvo, silenciar, conexao, *args):
+    """
+    Ponto de entrada do processo filho. Com `silenciar`, o fd 1 (herdado do
+    terminal) passa a apontar para /dev/null, inclusive para o chromedriver
+    """
+    if silenciar:
+        nulo = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(nulo, 1)
+        os.close(nulo)
+    alvo(conexao, *args)
+
+def encerrar_arvore(pid, conhecidos=()):
+    """
+    Encerra (SIGKILL) o processo e seus descendentes. `conhecidos` são PIDs vistos
+    antes na árvore: os que sobreviveram órfãos só são encerrados se ainda forem
+    processos do navegador (o PID pode ter sido reaproveitado)
+    """
+    processos = tabela_processos()
+    alvos = set(descendentes(pid, processos))
+    alvos.update(p for p in conhecidos
+                 if p in processos and any(nome in processos[p][1].lower() for nome in NOMES_NAVEGADOR))
+
+    for alvo in [pid] + sorted(alvos):
+        try:
+            os.kill(alvo, getattr(signal, 'SIGKILL', signal.SIGTERM))
+        except (OSError, TypeError):
+            pass
+    return len(alvos)
+
+class Supervisor:
+    """
+    Distribui tarefas entre `num_workers` processos `alvo(conexao, *args_worker)`
+    (que devem chamar servir) e garante o prazo de cada tarefa. Se a saída do
+    processo principal foi redirecionada (ex.: painel de progresso do menu),
+    a dos workers é descartada, em vez de ir direto para o terminal.
+    """
+
+    def __init__(self, alvo, num_workers=1, prazo=PRAZO_PADRAO, args_worker=(), max_reenvios=MAX_REENVIOS,
+                 silenciar=None):
+        self.alvo = alvo
+        self.silenciar = sys.stdout is not sys.__stdout__ if silenciar is None else silenciar
+        self.num_workers = max(1, num_workers)
+        self.prazo = prazo
+        self.args_worker = args_worker
+        self.max_reenvios = max_reenvios
+        # spawn: o filho não herda threads nem navegadores abertos no processo principal
+        self.contexto = multiprocessing.get_context('spawn')
+        self.workers = {}
+        self.encerrados = 0
+        self.duracoes = []
+
+    def _iniciar_worker(self, numero):
+        conexao, conexao_filho = self.contexto.Pipe()
+        processo = self.contexto.Process(target=_iniciar_processo,
+                                         args=(self.alvo, self.silenciar, conexao_filho) + tuple(self.args_worker),
+                                         name=f'worker-{numero}', daemon=True)
+        processo.start()
+        conexao_filho.close()
+        self.workers[numero] = {
+            'processo': processo,
+            'conexao': conexao,
+            'tarefa': None,
+            'inicio': None,
+            'arvore': set(),
+            'desconectado': False
+        }
+
+    def _encerrar_worker(self, numero):
+        worker = self.workers.pop(numero)
+        processo = worker['processo']
+        if processo.is_alive():
+            worker['arvore'].update(descendentes(processo.pid))
+        orfaos = encerrar_arvore(processo.pid, worker['arvore'])
+        processo.join(timeout=5)
+        worker['conexao'].close()
+        self.encerrados += 1
+        return worker, orfaos
+
+    def _atualizar_arvores(self):
+        """Guarda os PIDs do navegador de cada worker (para encerrá-los se o worker morrer)"""
+        processos = tabela_processos()
+        for worker in self.workers.values():
+            worker['arvore'].update(descendentes(worker['processo'].pid, processos))
+
+    def executar(self, tarefas, ao_concluir=None):
+        """
+        Processa as tarefas e retorna os resultados na ordem original (None nas que
+        falharam). `ao_concluir(indice, resultado)` é chamado a cada conclusão.
+        """
+        resultados = [None] * len(tarefas)
+        pendentes = deque(range(len(tarefas)))
+        reenvios = [0] * len(tarefas)
+        concluidas = 0
+        ultima_arvore = 0.0
+
+        def concluir(indice, resultado):
+            nonlocal concluidas
+            resultados[indice] = resultado
+            concluidas += 1
+            if ao_concluir:
+                ao_concluir(indice, resultado)
+
+        for numero in range(1, min(self.num_workers, len(tarefas)) + 1):
+            self._iniciar_worker(numero)
+        print(f"🛡️ {len(self.workers)} workers isolados (prazo de {self.prazo:.0f}s por produto)", flush=True)
+
+        try:
+            while concluidas < len(tarefas):
+                # Repõe os workers encerrados enquanto houver produtos na fila
+                for numero in range(1, self.num_workers + 1):
+                    if numero not in self.workers and pendentes:
+                        self._iniciar_worker(numero)
+
+                # Uma tarefa por vez para cada worker livre
+                for worker in self.workers.values():
+                    if worker['tarefa'] is None and pendentes:
+                        indice = pendentes.popleft()
+                        worker['conexao'].send((indice, tarefas[indice]))
+                        worker['tarefa'], worker['inicio'] = indice, time.monotonic()
+
+                conexoes = {worker['conexao']: numero for numero, worker in self.workers.items()}
+                for conexao in wait(list(conexoes), timeout=INTERVALO_VERIFICACAO):
+                    worker = self.workers[conexoes[conexao]]
+                    try:
+                        _, indice, resultado = conexao.recv()
+                    except (EOFError, OSError):
+                        # Processo morrendo: o pipe fica sempre "pronto", então o worker é
+                        # encerrado abaixo em vez de voltar ao wait (laço sem espera)
+                        worker['processo'].join(timeout=1)
+                        worker['desconectado'] = True
+                        continue
+                    self.duracoes.append(time.monotonic() - worker['inicio'])
+                    worker['tarefa'] = worker['inicio'] = None
+                    concluir(indice, resultado)
+
+                agora = time.monotonic()
+                if agora - ultima_arvore > 2:
+                    self._atualizar_arvores()
+                    ultima_arvore = agora
+
+                for numero in list(self.workers):
+                    worker = self.workers[numero]
+                    if not worker['processo'].is_alive():
+                        motivo = f"encerrou inesperadamente (código {worker['processo'].exitcode})"
+                    elif worker['desconectado']:
+                        motivo = "fechou a conexão com o supervisor"
+                    elif worker['tarefa'] is not None and agora - worker['inicio'] > self.prazo:
+                        motivo = f"passou de {self.prazo:.0f}s"
+                    else:
+                        continue
+
+                    worker, orfaos = self._encerrar_worker(numero)
+                    indice = worker['tarefa']
+                    print(f"🛡️ Worker {numero} {motivo}; {orfaos} processos do navegador encerrados", flush=True)
+
+                    if indice is not None:
+                        self.duracoes.append(agora - worker['inicio'])
+                        reenvios[indice] += 1
+                        if reenvios[indice] > self.max_reenvios:
+                            print(f"❌ Desistindo após {self.max_reenvios} reenvios: {tarefas[indice]}", flush=True)
+                            concluir(indice, None)
+                        else:
+                            pendentes.appendleft(indice)
+        finally:
+            self.encerrar()
+
+        self.exibir_resumo()
+        return resultados
+
+    def encerrar(self):
+        """Pede aos workers que terminem e encerra os que não saírem"""
+        for worker in self.workers.values():
+            try:
+                worker['conexao'].send(None)
+            except (OSError, ValueError):
+                pass
+        for numero in list(self.workers):
+            worker = self.workers[numero]
+            worker['processo'].join(timeout=10)
+            if worker['processo'].is_alive():
+                self._encerrar_worker(numero)
+            else:
+                self.workers.pop(numero)['conexao'].close()
+
+    def exibir_resumo(self):
+        if not self.duracoes:
+            return
+        duracoes = sorted(self.duracoes)
+        print(f"🛡️ Tempo por produto: p50 {percentil(duracoes, 0.5):.1f}s | p99 {percentil(duracoes, 0.99):.1f}s | "
+              f"máx. {duracoes[-1]:.1f}s | {self.encerrados} workers reiniciados", flush=True)
@@ -6,34 +6,28 @@ Script para testar apenas um produto antes de executar o lote completo
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+import argparse
 import csv
-import re
 import time
-from browser import criar_driver_automatico
+from contextlib import ExitStack
+from browser import obter_driver
+from nutricao import dados_padrao, obter_mapeador, preencher_dados
 
-def extrair_numero(texto):
-    """
-    Extrai número de um texto, retornando 0 se não encontrar
-    """
-    if not texto:
-        return 0
-    
-    # Remove espaços e procura por números
-    match = re.search(r'(\d+(?:\.\d+)?)', texto.replace(',', '.'))
-    if match:
-        return float(match.group(1))
-    return 0
+URL_TESTE = "https://maxtitanium.eu/products/top-whey-3w-sabor-900g-brigadeiro"
 
-def testar_um_produto():
+def testar_um_produto(pool=None, url=URL_TESTE):
     """
     Testa coleta de dados de um produto específico
+    (usando o navegador do pool da sessão, quando informado).
+    Retorna True se a tabela foi extraída e salva no CSV de teste
     """
-    url = "https://maxtitanium.eu/products/top-whey-3w-sabor-900g-brigadeiro"
     categoria = "Proteínas"
+    sucesso = False
     
     # Configurar Chrome
-    # Criar driver automaticamente
-    driver = criar_driver_automatico(headless=True)
+    # Criar driver automaticamente (ou emprestar do pool)
+    recursos = ExitStack()
+    driver = recursos.enter_context(obter_driver(pool, headless=True))
     
     try:
         print(f"🔗 Testando produto: {url}")
@@ -50,20 +44,7 @@ def testar_um_produto():
         print(f"📦 Produto: {nome_produto}")
         
         # Dados nutricionais padrão
-        dados = {
-            'nome_produto': nome_produto,
-            'url': url,
-            'categoria': categoria,
-            'porcao_g': 0,
-            'calorias_kcal': 0,
-            'carboidratos_g': 0,
-            'proteinas_g': 0,
-            'gorduras_totais_g': 0,
-            'gorduras_saturadas_g': 0,
-            'fibras_g': 0,
-            'acucares_g': 0,
-            'sodio_mg': 0
-        }
+        dados = dados_padrao(nome_produto, url, categoria)
         
         # Aguardar carregamento completo
         time.sleep(3)
@@ -138,6 +119,9 @@ def testar_um_produto():
                     
                     print(f"📋 Processando {len(linhas)} linhas:")
                     
+                    mapeador = obter_mapeador()
+                    celulas = []
+                    
                     for i, linha in enumerate(linhas):
                         try:
                             colunas = linha.find_elements(By.TAG_NAME, "td")
@@ -145,38 +129,19 @@ def testar_um_produto():
                                 campo = colunas[0].text.strip()
                                 valor = colunas[1].text.strip()
                                 
-                                print(f"  {i+1}. {campo}: {valor}")
-                                
-                                # Extrair valores específicos
-                                if 'Porção' in campo:
-                                    dados['porcao_g'] = extrair_numero(valor)
-                                
-                                elif 'Valor Energético' in campo:
-                                    match = re.search(r'(\d+(?:\.\d+)?)\s*kcal', valor)
-                                    if match:
-                                        dados['calorias_kcal'] = float(match.group(1))
-                                
-                                elif 'Carboidratos' in campo:
-                                    dados['carboidratos_g'] = extrair_numero(valor)
+                                # Mostrar para qual campo o rótulo foi mapeado
+                                mapeamento = mapeador.campo_do_rotulo(campo)
+                                destino = mapeamento[0] if mapeamento else "não mapeado"
+                                print(f"  {i+1}. {campo}: {valor} → {destino}")
                                 
-                                elif 'Proteínas' in campo:
-                                    dados['proteinas_g'] = extrair_numero(valor)
-                                
-                                elif 'Gorduras Totais' in campo:
-                                    dados['gorduras_totais_g'] = extrair_numero(valor)
-                                
-                                elif 'Gorduras Saturadas' in campo:
-                                    dados['gorduras_saturadas_g'] = extrair_numero(valor)
-                                
-                                elif 'Fibra Alimentar' in campo:
-                                    dados['fibras_g'] = extrair_numero(valor)
-                                
-                                elif 'Sódio' in campo:
-                                    dados['sodio_mg'] = extrair_numero(valor)
+                                celulas.append((campo, valor))
                         except Exception as e:
                             print(f"    ❌ Erro na linha {i+1}: {str(e)}")
                             continue
                     
+                    # Extrair valores específicos
+                    preencher_dados(dados, celulas)
+                    
                     # Mostrar dados extraídos
                     print(f"\n📊 DADOS EXTRAÍDOS:")
                     print(f"  • Nome: {dados['nome_produto']}")
@@ -215,6 +180,7 @@ def testar_um_produto():
                         ])
                     
                     print(f"\n✅ Dados salvos em 'dados/teste_um_produto.csv'")
+                    sucesso = True
                     
                 else:
                     print("❌ Nenhuma tabela encontrada após clicar no dropdown")
@@ -232,10 +198,15 @@ def testar_um_produto():
         print(f"❌ Erro geral: {str(e)}")
         
     finally:
-        driver.quit()
+        recursos.close()
         print("\n🏁 Teste concluído")
+    
+    return sucesso
 
 if __name__ == "__main__":
     print("🧪 TESTE DE UM PRODUTO")
     print("=" * 40)
-    testar_um_produto() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Teste de coleta de um produto")
+    parser.add_argument('--url', default=URL_TESTE,
+                        help="Página de produto a testar (ex.: a servida pelo benchmark local)")
+    raise SystemExit(0 if testar_um_produto(url=parser.parse_args().url) else 1)
@@ -1,90 +1,174 @@
                                                                                                                                                                         #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import time
-import csv
 import os
+import json
+import argparse
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
 from datetime import datetime
+from urllib.parse import parse_qs, urlencode, urlparse, urlunparse
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from browser import criar_driver_automatico
+from browser import PoolDrivers, obter_driver
+from esperas import aguardar_contagem_estavel, carregar_sob_demanda
+from historico import registrar_historico
+from escrita import EscritorCSVStreaming, EscritorTextoStreaming
+from coleta_http import EXCECOES_TRANSITORIAS, baixar
+from eventos import emitir, emitir_para, relatar_erro
+from metricas import METRICAS, medir, produto_medido
+from ritmo import ErroTransitorio, RitmoAdaptativo, com_retentativas
+from lojas import SELETORES_PADRAO, categorias_configuradas, loja_padrao
+
+# Lê todos os cards do grid numa única ida ao navegador
+SCRIPT_CARDS = """
+return JSON.stringify(Array.from(document.querySelectorAll(arguments[0])).map(card => {
+    const link = card.querySelector(arguments[1]);
+    const titulo = card.querySelector(arguments[2]);
+    return {
+        href: link ? link.href : null,
+        titulo: titulo ? titulo.innerText.trim() : '',
+        aria: link ? (link.getAttribute('aria-label') || '') : ''
+    };
+}));
+"""
+
+# Última página listada nos links "?page=N" (do mesmo caminho da coleção) e link da próxima página
+SCRIPT_PAGINACAO = """
+const numeros = Array.from(document.querySelectorAll(arguments[0]))
+    .filter(link => new URL(link.href).pathname === location.pathname)
+    .map(link => Number(new URL(link.href).searchParams.get('page')))
+    .filter(numero => numero > 0);
+const proxima = document.querySelector(arguments[1]);
+return JSON.stringify({
+    ultima: numeros.length ? Math.max(...numeros) : null,
+    proxima: proxima && proxima.href ? proxima.href : null
+});
+"""
+
+CAMPOS_URLS = ['nome_produto', 'url', 'slug', 'categoria', 'data_coleta']
+
+# Loja e coleções padrão, definidas em config/lojas.json
+LOJA_PADRAO = loja_padrao()
+CATEGORIAS = categorias_configuradas(LOJA_PADRAO)
+
+# Máximo de produtos por página aceito pelo products.json da Shopify
+LIMITE_PAGINA_JSON = 250
+
+# Páginas do grid lidas ao mesmo tempo quando o total de páginas é conhecido
+PAGINAS_PARALELAS = 3
+
+# Limite de segurança de páginas seguidas pelo link "próxima" numa coleção
+LIMITE_PAGINAS_GRID = 100
+
+def categorias_da_loja(base_url):
+    """As mesmas categorias servidas a partir de outro endereço (ex.: servidor local do benchmark)"""
+    base = base_url.rstrip('/')
+    return [{'nome': categoria['nome'], 'url': base + urlparse(categoria['url']).path} for categoria in CATEGORIAS]
+
+def url_da_pagina(categoria_url, pagina):
+    """URL da coleção com o parâmetro ?page=N (mantendo os demais parâmetros)"""
+    partes = urlparse(categoria_url)
+    parametros = parse_qs(partes.query)
+    parametros['page'] = [str(pagina)]
+    return urlunparse(partes._replace(query=urlencode(parametros, doseq=True)))
+
+def endpoint_json(categoria_url):
+    """URL da listagem JSON da coleção e a base (esquema + host) da loja"""
+    partes = urlparse(categoria_url)
+    return categoria_url.rstrip('/') + '/products.json', f"{partes.scheme}://{partes.netloc}"
+
+def produto_de_item_json(item, base, categoria_nome, data_coleta):
+    """Converte um item do products.json no mesmo formato do grid HTML"""
+    return {
+        'nome_produto': item.get('title', '').strip(),
+        'url': f"{base}/products/{item['handle']}",
+        'slug': item['handle'],
+        'categoria': categoria_nome,
+        'data_coleta': data_coleta
+    }
 
 class ColetorURLsEuropaEstruturaReal:
-    def __init__(self):
-        self.base_url = "https://maxtitanium.eu"
+    def __init__(self, backend='json', pool=None, ritmo=None, categorias=CATEGORIAS, seletores=None, sessao=None,
+                 paginas_paralelas=PAGINAS_PARALELAS):
+        self.base_url = LOJA_PADRAO['base_url']
+        self.categorias = categorias
+        self.seletores = {**SELETORES_PADRAO, **(seletores or {})}
+        self.backend = backend
+        self.paginas_paralelas = max(1, paginas_paralelas)
+        self.pool = pool
+        self.ritmo = ritmo or RitmoAdaptativo()
+        # O grid no navegador tem balde próprio, separado do das listagens HTTP
+        self.ritmo_navegador = self.ritmo.derivado()
         self.driver = None
+        # Uma sessão recebida de fora (ex.: a do agendador multi-loja) não é fechada aqui
+        self.sessao = sessao
+        self._sessao_propria = sessao is None
         self.urls_coletadas = []
+        self._recursos = ExitStack()
+        self._pool_paginas = None
         
     def setup_driver(self):
         """Configura o driver do Selenium"""
-        # Criar driver automaticamente com zoom de 25%
-        self.driver = criar_driver_automatico(headless=True, zoom=25)
+        # Criar (ou emprestar do pool) driver com zoom de 25%
+        self.driver = self._recursos.enter_context(obter_driver(self.pool, headless=True, zoom=25))
         return self.driver
     
-    def aguardar_carregamento_grid(self):
+    def encerrar_driver(self):
+        """Encerra o driver (ou devolve ao pool)"""
+        self._recursos.close()
+        self.driver = None
+    
+    def aguardar_carregamento_grid(self, driver=None):
         """Aguarda o grid de produtos carregar"""
+        driver = driver or self.driver
         print("    → Aguardando grid de produtos carregar...")
         
         # Aguarda o grid principal carregar
-        WebDriverWait(self.driver, 15).until(
-            EC.presence_of_element_located((By.ID, "ProductsList"))
+        WebDriverWait(driver, 15).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, self.seletores['grid']))
         )
         
-        # Aguarda os produtos aparecerem
-        WebDriverWait(self.driver, 10).until(
-            EC.presence_of_all_elements_located((By.CSS_SELECTOR, "#ProductsList .product-card"))
-        )
-        
-        time.sleep(3)
-        print("    → Grid carregado com sucesso")
+        # Aguarda os produtos aparecerem e a quantidade de cards parar de mudar
+        quantidade = aguardar_contagem_estavel(driver, self.seletores['cards'], 10)
+        print(f"    → Grid carregado com sucesso ({quantidade} cards)")
     
-    def extrair_produtos_grid_real(self, categoria_nome):
+    def extrair_produtos_grid_real(self, categoria_nome, driver=None):
         """Extrai produtos usando a estrutura HTML real"""
+        driver = driver or self.driver
         print(f"    → Extraindo produtos do grid principal...")
         
-        # Seletor baseado na estrutura HTML real mostrada
-        seletor_grid = "#ProductsList .f-column .product-card"
-        
         try:
-            # Encontra todos os cards de produtos no grid principal
-            product_cards = self.driver.find_elements(By.CSS_SELECTOR, seletor_grid)
-            print(f"    → {len(product_cards)} product cards encontrados")
+            # Lê link, título e aria-label de todos os cards numa única chamada
+            cards = json.loads(driver.execute_script(SCRIPT_CARDS, self.seletores['cards'],
+                                                     self.seletores['link'], self.seletores['titulo']))
+            print(f"    → {len(cards)} product cards encontrados")
             
             produtos_encontrados = []
+            data_coleta = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             
-            for card in product_cards:
-                try:
-                    # Busca o link do produto dentro do card
-                    link_element = card.find_element(By.CSS_SELECTOR, "a[href*='/products/']")
-                    href = link_element.get_attribute('href')
+            for card in cards:
+                href = card['href']
+                
+                if href and '/products/' in href:
+                    slug = href.split('/products/')[-1]
                     
-                    if href and '/products/' in href:
-                        # Busca o nome do produto no título
-                        try:
-                            titulo_element = card.find_element(By.CSS_SELECTOR, "h3.product-card__title a")
-                            nome = titulo_element.text.strip()
-                        except:
-                            # Fallback para o texto do link
-                            nome = link_element.get_attribute('aria-label') or ''
-                            if not nome:
-                                # Último fallback: slug da URL
-                                slug = href.split('/products/')[-1]
-                                nome = slug.replace('-', ' ').title()
-                        
-                        produto = {
-                            'nome_produto': nome,
-                            'url': href,
-                            'slug': href.split('/products/')[-1],
-                            'categoria': categoria_nome,
-                            'data_coleta': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                        }
-                        
-                        produtos_encontrados.append(produto)
-                        
-                except Exception as e:
-                    print(f"      • Erro ao processar card: {e}")
-                    continue
+                    # Nome do título, com fallback para o aria-label do link e depois para o slug
+                    nome = card['titulo'] or card['aria'] or slug.replace('-', ' ').title()
+                    
+                    produto = {
+                        'nome_produto': nome,
+                        'url': href,
+                        'slug': slug,
+                        'categoria': categoria_nome,
+                        'data_coleta': data_coleta
+                    }
+                    
+                    produtos_encontrados.append(produto)
+                else:
+                    print(f"      • Card sem link de produto ignorado")
             
             print(f"    → {len(produtos_encontrados)} produtos extraídos:")
             for i, produto in enumerate(produtos_encontrados):
@@ -96,20 +180,110 @@ class ColetorURLsEuropaEstruturaReal:
             print(f"    ❌ Erro ao extrair produtos: {e}")
             return []
     
+    def ler_pagina_grid(self, driver, url, categoria_nome, rolar=False):
+        """
+        Abre uma página do grid e retorna (produtos, paginação), onde a paginação
+        traz a última página listada nos links e o link da próxima página.
+        
+        Com `rolar`, uma página sem links de paginação é rolada até o fim (scroll
+        infinito / botão "carregar mais") antes da extração.
+        """
+        print(f"    → Página: {url}")
+        with medir('driver_get'):
+            driver.get(url)
+        
+        with medir('carregamento_grid'):
+            self.aguardar_carregamento_grid(driver)
+            paginacao = json.loads(driver.execute_script(SCRIPT_PAGINACAO, self.seletores['paginas'],
+                                                         self.seletores['proxima']))
+            if rolar and not paginacao['ultima'] and not paginacao['proxima']:
+                quantidade = carregar_sob_demanda(driver, self.seletores['cards'], self.seletores['carregar_mais'])
+                print(f"    → {quantidade} cards após carregar sob demanda")
+        
+        with medir('extracao_grid'):
+            produtos = self.extrair_produtos_grid_real(categoria_nome, driver)
+        
+        return produtos, paginacao
+    
+    def _obter_pool_paginas(self):
+        """
+        Pool dos navegadores das páginas paralelas. Sem o pool da sessão (linha de
+        comando), um pool próprio mantém os navegadores abertos entre as páginas
+        e categorias até encerrar_driver, em vez de abrir um Chrome por página.
+        """
+        if self.pool is not None:
+            return self.pool
+        if self._pool_paginas is None:
+            self._pool_paginas = PoolDrivers(headless=True, max_ociosos=self.paginas_paralelas)
+            self._recursos.callback(self._encerrar_pool_paginas)
+        return self._pool_paginas
+    
+    def _encerrar_pool_paginas(self):
+        pool, self._pool_paginas = self._pool_paginas, None
+        pool.encerrar()
+    
+    def _ler_pagina_paralela(self, url, categoria_nome, pool):
+        """Lê uma página do grid num navegador próprio (emprestado do pool)"""
+        try:
+            with obter_driver(pool, headless=True, zoom=25) as driver:
+                return self.ler_pagina_grid(driver, url, categoria_nome)
+        except Exception as e:
+            print(f"    ❌ Erro na página {url}: {e}")
+            return [], {}
+    
     def coletar_urls_categoria(self, categoria_url, categoria_nome):
-        """Coleta URLs de uma categoria específica"""
+        """
+        Coleta URLs de uma categoria, incluindo as páginas seguintes do grid.
+        
+        Quando os links "?page=N" revelam o total de páginas, as demais páginas são
+        lidas em paralelo; depois disso (ou sem essa informação) segue o link da
+        próxima página até uma página não trazer nenhuma URL nova.
+        """
         print(f"\n=== COLETANDO: {categoria_nome} ===")
         print(f"URL: {categoria_url}")
         
+        produtos = []
+        urls_vistas = set()
+        
+        def acrescentar(encontrados):
+            """Acrescenta os produtos ainda não vistos, retornando quantos eram novos"""
+            novos = 0
+            for produto in encontrados:
+                if produto['url'] not in urls_vistas:
+                    urls_vistas.add(produto['url'])
+                    produtos.append(produto)
+                    novos += 1
+            return novos
+        
         try:
-            # Navega para a categoria
-            self.driver.get(categoria_url)
+            encontrados, paginacao = self.ler_pagina_grid(self.driver, categoria_url, categoria_nome, rolar=True)
+            acrescentar(encontrados)
+            pagina = paginacao['ultima'] or 1
+            proxima = paginacao['proxima']
             
-            # Aguarda o grid carregar
-            self.aguardar_carregamento_grid()
+            if pagina > 1:
+                urls_paginas = [url_da_pagina(categoria_url, numero) for numero in range(2, pagina + 1)]
+                print(f"    → {pagina} páginas: lendo {len(urls_paginas)} em paralelo")
+                pool = self._obter_pool_paginas()
+                with ThreadPoolExecutor(max_workers=min(self.paginas_paralelas, len(urls_paginas))) as executor:
+                    for encontrados, paginacao in executor.map(
+                            lambda url: self._ler_pagina_paralela(url, categoria_nome, pool), urls_paginas):
+                        acrescentar(encontrados)
+                # A última página pode apontar para outras além das listadas (paginação truncada)
+                proxima = paginacao.get('proxima')
             
-            # Extrai produtos do grid principal
-            produtos = self.extrair_produtos_grid_real(categoria_nome)
+            while proxima and pagina < LIMITE_PAGINAS_GRID:
+                pagina += 1
+                try:
+                    encontrados, paginacao = self.ler_pagina_grid(self.driver, proxima, categoria_nome)
+                except Exception as e:
+                    print(f"    ⚠️ Página {pagina} indisponível ({e}), fim da paginação")
+                    break
+                if not acrescentar(encontrados):
+                    # Página sem URLs novas: fim da coleção (ou a mesma página servida de novo)
+                    print(f"    → Página {pagina} sem produtos novos, fim da paginação")
+                    break
+                proxima = paginacao['proxima']
             
             print(f"    → ✅ {len(produtos)} produtos coletados de {categoria_nome}")
             return produtos
@@ -118,51 +292,169 @@ class ColetorURLsEuropaEstruturaReal:
             print(f"    ❌ Erro ao coletar {categoria_nome}: {e}")
             return []
     
-    def coletar_todas_urls(self):
-        """Coleta URLs de todas as categorias"""
-        print("=== COLETOR BASEADO NA ESTRUTURA HTML REAL ===")
+    def coletar_urls_categoria_json(self, categoria_url, categoria_nome, limite=LIMITE_PAGINA_JSON):
+        """
+        Coleta URLs de uma categoria pela listagem JSON da Shopify
+        (/collections/<handle>/products.json), paginando até esgotar os produtos.
+        
+        Retorna None em caso de falha, para que o grid HTML seja usado.
+        """
+        print(f"\n=== COLETANDO (JSON): {categoria_nome} ===")
         
-        # Configura o driver
-        self.setup_driver()
+        if self.sessao is None:
+            self.sessao = requests.Session()
         
-        categorias = [
-            {'nome': 'Pré-treinos', 'url': 'https://maxtitanium.eu/collections/pre-treinos'},
-            {'nome': 'Proteínas', 'url': 'https://maxtitanium.eu/collections/proteinas'},
-            {'nome': 'Creatinas e Aminoácidos', 'url': 'https://maxtitanium.eu/collections/creatinas-e-aminoacidos'}
-        ]
+        endpoint, base = endpoint_json(categoria_url)
+        print(f"URL: {endpoint}")
         
         try:
-            todas_urls = []
+            produtos = []
+            handles_vistos = set()
+            pagina = 1
             
-            for categoria in categorias:
-                urls_categoria = self.coletar_urls_categoria(categoria['url'], categoria['nome'])
-                todas_urls.extend(urls_categoria)
+            while True:
+                with medir('http_get'):
+                    resposta = com_retentativas(baixar, self.sessao, endpoint, 15,
+                                                params={'limit': limite, 'page': pagina},
+                                                ritmo=self.ritmo, excecoes=EXCECOES_TRANSITORIAS,
+                                                descricao=f"Listagem {categoria_nome} (página {pagina})")
+                resposta.raise_for_status()
+                with medir('parsing'):
+                    itens = resposta.json().get('products', [])
                 
-                print(f"    → Total acumulado: {len(todas_urls)} URLs")
-                print("=" * 80)
+                if not itens:
+                    break
+                
+                data_coleta = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                novos = [item for item in itens if item['handle'] not in handles_vistos]
+                for item in novos:
+                    handles_vistos.add(item['handle'])
+                    produtos.append(produto_de_item_json(item, base, categoria_nome, data_coleta))
+                
+                print(f"    → Página {pagina}: {len(itens)} produtos ({len(novos)} novos)")
                 
-                # Pausa entre categorias
-                time.sleep(3)
+                if not novos:
+                    # Servidor que ignora ?page= devolve a mesma página: para na repetição
+                    break
+                
+                if len(itens) < limite:
+                    break
+                pagina += 1
+            
+            if not produtos:
+                print("    ⚠️ Listagem JSON vazia")
+                return None
+            
+            for i, produto in enumerate(produtos):
+                print(f"      {i+1}. {produto['nome_produto']}")
             
-            # Remove duplicatas globais
+            print(f"    → ✅ {len(produtos)} produtos coletados de {categoria_nome}")
+            return produtos
+            
+        except Exception as e:
+            print(f"    ⚠️ Listagem JSON indisponível ({e})")
+            return None
+    
+    def _categoria_ou_falhar(self, categoria_url, categoria_nome):
+        produtos = self.coletar_urls_categoria(categoria_url, categoria_nome)
+        if not produtos:
+            raise ErroTransitorio("nenhum produto no grid", sobrecarga=False)
+        return produtos
+    
+    def coletar_urls_categoria_com_retentativas(self, categoria_url, categoria_nome):
+        """Coleta o grid da categoria no ritmo adaptativo, repetindo com backoff se vier vazio"""
+        try:
+            return com_retentativas(self._categoria_ou_falhar, categoria_url, categoria_nome,
+                                    ritmo=self.ritmo_navegador, descricao=f"Grid {categoria_nome}")
+        except ErroTransitorio:
+            print(f"    ❌ Nenhum produto coletado de {categoria_nome} após várias tentativas")
+            return []
+    
+    @staticmethod
+    def abrir_arquivos(base_filename='urls_produtos_europa_estrutura_real'):
+        """Abre o CSV e o TXT de saída para escrita incremental (arquivos '.parcial')"""
+        csv_path = os.path.join('dados', f'{base_filename}.csv')
+        txt_path = os.path.join('dados', f'{base_filename}.txt')
+        return (
+            EscritorCSVStreaming(csv_path, campos=CAMPOS_URLS),
+            EscritorTextoStreaming(txt_path)
+        )
+    
+    def coletar_todas_urls(self, base_filename=None, ao_encontrar=None):
+        """
+        Coleta URLs de todas as categorias.
+        
+        Com `base_filename`, cada URL nova é gravada no CSV/TXT assim que é
+        encontrada, e os arquivos são renomeados para o nome final ao terminar.
+        `ao_encontrar(url_info)` é chamado para cada URL nova, permitindo que a
+        extração comece antes do fim da descoberta.
+        """
+        print("=== COLETOR BASEADO NA ESTRUTURA HTML REAL ===")
+        
+        escritores = self.abrir_arquivos(base_filename) if base_filename else ()
+        emitir('inicio', etapa='urls', total=len(self.categorias))
+        
+        try:
             urls_unicas = []
             urls_vistas = set()
             
-            for url_info in todas_urls:
-                if url_info['url'] not in urls_vistas:
-                    urls_unicas.append(url_info)
-                    urls_vistas.add(url_info['url'])
+            for categoria in self.categorias:
+                with produto_medido(categoria['url'], tipo='categoria', backend=self.backend):
+                    urls_categoria = None
+                    
+                    if self.backend == 'json':
+                        urls_categoria = self.coletar_urls_categoria_json(categoria['url'], categoria['nome'])
+                    
+                    if urls_categoria is None:
+                        # Fallback: renderiza o grid no navegador
+                        if not self.driver:
+                            self.setup_driver()
+                        urls_categoria = self.coletar_urls_categoria_com_retentativas(categoria['url'],
+                                                                                      categoria['nome'])
+                    
+                    # Remove duplicatas globais e grava as URLs novas
+                    with medir('escrita_csv'):
+                        for url_info in urls_categoria:
+                            if url_info['url'] not in urls_vistas:
+                                urls_unicas.append(url_info)
+                                urls_vistas.add(url_info['url'])
+                                if escritores:
+                                    escritores[0].escrever(url_info)
+                                    escritores[1].escrever(url_info['url'])
+                                if ao_encontrar:
+                                    ao_encontrar(url_info)
+                
+                emitir('item', etapa='urls', ok=bool(urls_categoria), nome=categoria['nome'],
+                       encontrados=len(urls_categoria), acumulado=len(urls_unicas))
+                
+                print(f"    → Total acumulado: {len(urls_unicas)} URLs únicas")
+                print("=" * 80)
             
             self.urls_coletadas = urls_unicas
             
             print(f"\n=== COLETA FINALIZADA ===")
             print(f"Total de URLs únicas: {len(self.urls_coletadas)}")
             
+            # Só substitui os arquivos anteriores se algo foi coletado
+            for escritor in escritores:
+                if self.urls_coletadas:
+                    escritor.concluir()
+                    print(f"  • Salvo: {escritor.caminho}")
+                else:
+                    escritor.abortar()
+            escritores = ()
+            
             return self.urls_coletadas
             
         finally:
-            if self.driver:
-                self.driver.quit()
+            emitir('fim', etapa='urls')
+            for escritor in escritores:
+                escritor.abortar()
+
+            self.encerrar_driver()
+            if self.sessao and self._sessao_propria:
+                self.sessao.close()
+                self.sessao = None
     
     def salvar_arquivos(self, base_filename='urls_produtos_europa_estrutura_real'):
         """Salva as URLs coletadas em CSV e TXT"""
@@ -170,28 +462,16 @@ class ColetorURLsEuropaEstruturaReal:
             print("Nenhuma URL para salvar!")
             return
         
-        # Cria pasta dados se não existir
-        os.makedirs('dados', exist_ok=True)
-        
-        # Salva CSV
-        csv_path = os.path.join('dados', f'{base_filename}.csv')
-        with open(csv_path, 'w', newline='', encoding='utf-8') as csvfile:
-            fieldnames = ['nome_produto', 'url', 'slug', 'categoria', 'data_coleta']
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            
-            writer.writeheader()
-            for url_info in self.urls_coletadas:
-                writer.writerow(url_info)
-        
-        # Salva TXT (apenas URLs)
-        txt_path = os.path.join('dados', f'{base_filename}.txt')
-        with open(txt_path, 'w', encoding='utf-8') as txtfile:
+        # Salva CSV e TXT (apenas URLs)
+        escritor_csv, escritor_txt = self.abrir_arquivos(base_filename)
+        with escritor_csv, escritor_txt:
             for url_info in self.urls_coletadas:
-                txtfile.write(f"{url_info['url']}\n")
+                escritor_csv.escrever(url_info)
+                escritor_txt.escrever(url_info['url'])
         
         print(f"Arquivos salvos:")
-        print(f"  • CSV: {csv_path}")
-        print(f"  • TXT: {txt_path}")
+        print(f"  • CSV: {escritor_csv.caminho}")
+        print(f"  • TXT: {escritor_txt.caminho}")
     
     def exibir_resumo(self):
         """Exibe resumo detalhado das URLs coletadas"""
@@ -219,27 +499,56 @@ class ColetorURLsEuropaEstruturaReal:
                 print(f"       {produto['url']}")
             print()
 
-def main():
-    """Função principal"""
-    coletor = ColetorURLsEuropaEstruturaReal()
+def main(argv=None, pool=None):
+    """
+    Função principal.
+    
+    Quando chamada pelo menu, recebe o pool de navegadores da sessão.
+    Retorna True se as URLs foram coletadas e salvas.
+    """
+    parser = argparse.ArgumentParser(description="Coletor de URLs Max Titanium Europa")
+    parser.add_argument('--backend', choices=['json', 'dom'], default='json',
+                        help="'json' usa a listagem products.json da Shopify (com fallback para o grid); 'dom' usa apenas o navegador (padrão: json)")
+    parser.add_argument('--paginas-paralelas', type=int, default=PAGINAS_PARALELAS,
+                        help=f"Páginas do grid lidas em paralelo quando o total de páginas é conhecido (padrão: {PAGINAS_PARALELAS})")
+    parser.add_argument('--historico', action='store_true',
+                        help="Registra as alterações desta execução no histórico (dados/historico.sqlite)")
+    parser.add_argument('--metricas', action='store_true',
+                        help="Exibe p50/p95/p99 por etapa e grava dados/metricas.jsonl e dados/metricas.prom")
+    parser.add_argument('--eventos', metavar='CAMINHO',
+                        help="Grava os eventos de progresso em JSON lines (arquivo, FIFO, /dev/fd/N ou '-' para stdout)")
+    args = parser.parse_args(argv)
+    
+    METRICAS.reiniciar()
+    coletor = ColetorURLsEuropaEstruturaReal(backend=args.backend, pool=pool,
+                                             paginas_paralelas=args.paginas_paralelas)
+    recursos = ExitStack()
+    recursos.enter_context(emitir_para(args.eventos))
     
     try:
-        # Coleta todas as URLs
-        urls = coletor.coletar_todas_urls()
+        # Coleta todas as URLs, gravando CSV e TXT à medida que são encontradas
+        urls = coletor.coletar_todas_urls(base_filename='urls_produtos_europa_estrutura_real')
         
         if urls:
-            # Salva em CSV e TXT
-            coletor.salvar_arquivos()
-            
             # Exibe resumo detalhado
             coletor.exibir_resumo()
+            
+            if args.historico:
+                registrar_historico(urls, 'urls')
+            return True
         else:
-            print("❌ Nenhuma URL foi coletada!")
+            relatar_erro("Nenhuma URL foi coletada!", 'urls')
             
     except KeyboardInterrupt:
         print("\n⚠️  Coleta interrompida pelo usuário.")
     except Exception as e:
-        print(f"❌ Erro durante a coleta: {e}")
+        relatar_erro(f"Erro durante a coleta: {e}", 'urls')
+    finally:
+        if args.metricas:
+            METRICAS.exportar()
+        recursos.close()
+    
+    return False
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
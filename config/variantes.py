@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+🧬 Variantes de sabor com a mesma tabela nutricional
+Sabores como top-whey-3w-sabor-900g-brigadeiro e ...-baunilha costumam
+repetir a tabela. Dois níveis de reaproveitamento:
+• hash do HTML do acordeão: páginas cujo dropdown é idêntico reaproveitam as
+  células já extraídas (sem abrir o dropdown nem esperar a tabela)
+• handle: um representante por grupo (handle sem o sufixo do sabor) é
+  coletado e a tabela é replicada para as demais variantes, sem carregá-las
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from urllib.parse import urlparse
+
+from cache_paginas import hash_conteudo
+from eventos import emitir
+
+MODOS_VARIANTES = ('html', 'handle', 'nenhum')
+MODO_PADRAO = 'html'
+
+# Tamanho da embalagem no handle (900g, 1kg, 120caps...): o que vem depois é o sabor
+PADRAO_TAMANHO = re.compile(r'-\d+(?:[.,]\d+)?(?:g|kg|ml|l|caps|capsulas|tabs|comprimidos|doses)(?=-|$)')
+
+def handle_de(url):
+    """Handle do produto (/products/<handle>), sem parâmetros como ?variant="""
+    return urlparse(url).path.rstrip('/').split('/')[-1]
+
+def chave_variante(url):
+    """Handle sem o sufixo do sabor; sem tamanho reconhecível, o próprio handle"""
+    handle = handle_de(url)
+    tamanhos = list(PADRAO_TAMANHO.finditer(handle))
+    if not tamanhos:
+        return handle
+    return handle[:tamanhos[-1].end()]
+
+def agrupar_por_handle(produtos):
+    """Retorna {chave: [índices]} na ordem em que os grupos aparecem"""
+    grupos = OrderedDict()
+    for indice, produto in enumerate(produtos):
+        grupos.setdefault(chave_variante(produto['url']), []).append(indice)
+    return grupos
+
+def replicar_dados(dados, produto):
+    """Dados do representante aplicados a outra variante (URL, categoria e nome próprios)"""
+    nome = produto.get('nome_produto') or handle_de(produto['url']).replace('-', ' ').title()
+    return dict(dados, url=produto['url'], categoria=produto['categoria'], nome_produto=nome)
+
+class TabelasCompartilhadas:
+    """Células (campo, valor) já extraídas, indexadas pelo hash do HTML do acordeão"""
+
+    def __init__(self):
+        self._celulas = {}
+        self._lock = threading.Lock()
+        self.reaproveitadas = 0
+
+    def chave(self, html):
+        return hash_conteudo(html) if html else None
+
+    def obter(self, chave):
+        """Células de uma tabela idêntica já extraída, ou None"""
+        if chave is None:
+            return None
+        with self._lock:
+            celulas = self._celulas.get(chave)
+            if celulas is not None:
+                self.reaproveitadas += 1
+            return celulas
+
+    def guardar(self, chave, celulas):
+        if chave is not None and celulas:
+            with self._lock:
+                self._celulas[chave] = list(celulas)
+
+def coletar_por_variantes(produtos, coletar, ao_coletar=None):
+    """
+    Coleta só um representante de cada grupo de variantes e replica os dados.
+
+    `coletar(produtos, ao_coletar)` é a função de coleta usual (resultados na
+    ordem dos produtos). As variantes de um representante que falhou são
+    coletadas individualmente numa segunda rodada.
+    """
+    grupos = agrupar_por_handle(produtos)
+    resultados = [None] * len(produtos)
+    representantes = [indices[0] for indices in grupos.values()]
+    variantes_de = {produtos[indices[0]]['url']: indices[1:] for indices in grupos.values()}
+
+    print(f"🧬 {len(produtos)} produtos em {len(grupos)} grupos de variantes", flush=True)
+
+    def replicar(dados):
+        if ao_coletar:
+            ao_coletar(dados)
+        for indice in variantes_de.get(dados['url'], ()):
+            copia = replicar_dados(dados, produtos[indice])
+            resultados[indice] = copia
+            if ao_coletar:
+                ao_coletar(copia)
+            emitir('item', etapa='dados', ok=True, url=copia['url'], nome=copia['nome_produto'])
+
+    coletados = coletar([produtos[i] for i in representantes], replicar)
+    for indice, dados in zip(representantes, coletados):
+        resultados[indice] = dados
+
+    sobras = [i for indices in grupos.values() if resultados[indices[0]] is None for i in indices[1:]]
+    if sobras:
+        print(f"\n🧬 {len(sobras)} variantes de representantes que falharam, coletando individualmente...", flush=True)
+        for indice, dados in zip(sobras, coletar([produtos[i] for i in sobras], ao_coletar)):
+            resultados[indice] = dados
+
+    replicadas = len(produtos) - len(representantes) - len(sobras)
+    print(f"🧬 {replicadas} variantes preenchidas com a tabela do representante", flush=True)
+    return resultados
@@ -17,7 +17,9 @@ import os
 import sys
 import time
 import glob
+import threading
 import subprocess
+from contextlib import redirect_stdout
 from datetime import datetime
 from typing import List, Dict, Optional
 
@@ -25,6 +27,32 @@ from typing import List, Dict, Optional
 config_path = os.path.join(os.path.dirname(__file__), 'config')
 sys.path.append(config_path)
 
+import urls
+import coleta
+import pipeline
+import agendador
+import lojas
+import teste
+import browser
+import eventos
+
+# Pool de navegadores compartilhado por todas as etapas da sessão
+_pool_drivers = None
+
+def obter_pool():
+    """Retorna o pool de navegadores da sessão (criado sob demanda)"""
+    global _pool_drivers
+    if _pool_drivers is None:
+        _pool_drivers = browser.PoolDrivers(headless=True)
+    return _pool_drivers
+
+def encerrar_pool():
+    """Fecha os navegadores abertos durante a sessão"""
+    global _pool_drivers
+    if _pool_drivers is not None:
+        _pool_drivers.encerrar()
+        _pool_drivers = None
+
 # ============================================================================
 # 🎨 SISTEMA DE CORES ANSI PARA TERMINAL
 # ============================================================================
@@ -74,6 +102,71 @@ def mostrar_barra_progresso(texto: str, duracao: float = 2.0):
         time.sleep(duracao / barra_tamanho)
     print()
 
+class PainelProgresso:
+    """Desenha uma barra de progresso a partir dos eventos estruturados dos coletores"""
+    
+    def __init__(self, etapa, unidade="itens", saida=None):
+        self.progresso = eventos.Progresso(etapa)
+        self.unidade = unidade
+        self.saida = saida or sys.stdout
+        self._lock = threading.Lock()
+        self._ultimo_desenho = 0.0
+    
+    def __call__(self, evento):
+        with self._lock:
+            erros = len(self.progresso.erros)
+            self.progresso(evento)
+            # Erros da etapa aparecem acima da barra (o log dos coletores é descartado)
+            for mensagem in self.progresso.erros[erros:]:
+                self.saida.write(f"\r\033[K{Cores.VERMELHO}❌ {mensagem}{Cores.RESET}\n")
+            agora = time.monotonic()
+            # Limita o redesenho a ~10 vezes por segundo
+            if evento['tipo'] in ('inicio', 'item', 'erro', 'fim') or agora - self._ultimo_desenho >= 0.1:
+                self._ultimo_desenho = agora
+                self.desenhar()
+    
+    def desenhar(self):
+        progresso = self.progresso
+        barra_tamanho = 30
+        if progresso.total:
+            fracao = min(1.0, progresso.processados / progresso.total)
+            total = progresso.total
+        else:
+            fracao = 0.0
+            total = "?"
+        preenchido = int(fracao * barra_tamanho)
+        barra = "█" * preenchido + "░" * (barra_tamanho - preenchido)
+        
+        eta = progresso.eta()
+        eta_texto = f"ETA {int(eta // 60):02d}:{int(eta % 60):02d}" if eta is not None else "ETA --:--"
+        ultimo = (progresso.ultimo or "")[:35]
+        
+        self.saida.write(
+            f"\r{Cores.VERDE}[{barra}] {progresso.processados}/{total} {self.unidade}{Cores.RESET} | "
+            f"✅ {progresso.concluidos} ❌ {progresso.falhas} | {eta_texto} | {ultimo:<35}"
+        )
+        self.saida.flush()
+    
+    def finalizar(self):
+        self.desenhar()
+        self.saida.write("\n")
+        self.saida.flush()
+
+def executar_com_progresso(funcao, etapa, unidade):
+    """
+    Executa uma etapa no próprio processo mostrando apenas o painel de progresso:
+    as linhas de log dos coletores são descartadas e o painel é desenhado a
+    partir dos eventos emitidos por eles (inclusive os de erro, mostrados
+    acima da barra)
+    """
+    painel = PainelProgresso(etapa, unidade)
+    with open(os.devnull, 'w', encoding='utf-8') as nulo, eventos.ouvir(painel):
+        try:
+            with redirect_stdout(nulo):
+                return funcao()
+        finally:
+            painel.finalizar()
+
 def mostrar_menu():
     """Exibe o menu principal"""
     menu = f"""
@@ -120,9 +213,9 @@ def coletar_urls():
     print(f"{Cores.AZUL}━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━{Cores.RESET}")
     
     print(f"\n{Cores.VERDE}✅ Configurações:{Cores.RESET}")
-    print(f"   🌐 Site: {Cores.AMARELO}https://maxtitanium.eu{Cores.RESET}")
-    print(f"   📊 Categorias: {Cores.AMARELO}Pré-treinos, Proteínas, Creatinas{Cores.RESET}")
-    print(f"   🎯 Total esperado: {Cores.AMARELO}~20 produtos{Cores.RESET}")
+    print(f"   🌐 Site: {Cores.AMARELO}{urls.LOJA_PADRAO['base_url']}{Cores.RESET}")
+    print(f"   📊 Categorias: {Cores.AMARELO}{', '.join(c['nome'] for c in urls.CATEGORIAS)}{Cores.RESET}")
+    print(f"   ⚙️  Configuração: {Cores.AMARELO}config/lojas.json{Cores.RESET}")
     
     confirmar = input(f"\n{Cores.MAGENTA}🤔 Iniciar coleta de URLs? (s/N): {Cores.RESET}").lower()
     
@@ -130,39 +223,15 @@ def coletar_urls():
         try:
             mostrar_barra_progresso("Inicializando coleta de URLs", 1.5)
             
-            # Executar script de URLs com saída em tempo real
-            processo = subprocess.Popen(
-                [sys.executable, os.path.join(config_path, 'urls.py')],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                bufsize=1,
-                universal_newlines=True,
-                cwd=os.path.dirname(__file__)
-            )
-            
             print(f"\n{Cores.VERDE}🚀 Executando coleta...{Cores.RESET}")
             
-            # Ler saída em tempo real
-            while True:
-                output = processo.stdout.readline()
-                if output == '' and processo.poll() is not None:
-                    break
-                if output:
-                    print(output.strip())
-            
-            # Aguardar finalização
-            processo.wait()
-            
-            if processo.returncode == 0:
+            # Executar no próprio processo, reaproveitando o navegador da sessão
+            if executar_com_progresso(lambda: urls.main([], pool=obter_pool()), 'urls', "categorias"):
                 print(f"\n{Cores.VERDE}✅ Coleta de URLs concluída com sucesso!{Cores.RESET}")
                 print(f"{Cores.CIANO}📁 Arquivo salvo em: dados/urls.csv{Cores.RESET}")
                 return True
             else:
-                print(f"\n{Cores.VERMELHO}❌ Erro na coleta de URLs:{Cores.RESET}")
-                stderr = processo.stderr.read()
-                if stderr:
-                    print(stderr)
+                print(f"\n{Cores.VERMELHO}❌ Erro na coleta de URLs{Cores.RESET}")
                 return False
                 
         except Exception as e:
@@ -188,37 +257,13 @@ def teste_produto():
         try:
             mostrar_barra_progresso("Preparando teste", 1.0)
             
-            processo = subprocess.Popen(
-                [sys.executable, os.path.join(config_path, 'teste.py')],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                bufsize=1,
-                universal_newlines=True,
-                cwd=os.path.dirname(__file__)
-            )
-            
             print(f"\n{Cores.VERDE}🚀 Executando teste...{Cores.RESET}")
             
-            # Ler saída em tempo real
-            while True:
-                output = processo.stdout.readline()
-                if output == '' and processo.poll() is not None:
-                    break
-                if output:
-                    print(output.strip())
-            
-            # Aguardar finalização
-            processo.wait()
-            
-            if processo.returncode == 0:
+            if teste.testar_um_produto(pool=obter_pool()):
                 print(f"\n{Cores.VERDE}✅ Teste concluído com sucesso!{Cores.RESET}")
                 print(f"{Cores.CIANO}📁 Resultado salvo em: dados/teste_um_produto.csv{Cores.RESET}")
             else:
-                print(f"\n{Cores.VERMELHO}❌ Teste falhou:{Cores.RESET}")
-                stderr = processo.stderr.read()
-                if stderr:
-                    print(stderr)
+                print(f"\n{Cores.VERMELHO}❌ Teste falhou: nenhum dado nutricional foi extraído{Cores.RESET}")
                 
         except Exception as e:
             print(f"\n{Cores.VERMELHO}❌ Erro durante teste: {str(e)}{Cores.RESET}")
@@ -241,37 +286,13 @@ def coletar_dados_nutricionais():
         try:
             mostrar_barra_progresso("Preparando coleta de dados", 1.5)
             
-            processo = subprocess.Popen(
-                [sys.executable, os.path.join(config_path, 'coleta.py')],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                bufsize=1,
-                universal_newlines=True,
-                cwd=os.path.dirname(__file__)
-            )
-            
             print(f"\n{Cores.VERDE}🚀 Coletando dados nutricionais...{Cores.RESET}")
             
-            # Ler saída em tempo real
-            while True:
-                output = processo.stdout.readline()
-                if output == '' and processo.poll() is not None:
-                    break
-                if output:
-                    print(output.strip())
-            
-            # Aguardar finalização
-            processo.wait()
-            
-            if processo.returncode == 0:
+            if executar_com_progresso(lambda: coleta.main([], pool=obter_pool()), 'dados', "produtos"):
                 print(f"\n{Cores.VERDE}✅ Coleta de dados nutricionais concluída!{Cores.RESET}")
                 print(f"{Cores.CIANO}📁 Resultado salvo em: dados/dados_nutricionais.csv{Cores.RESET}")
             else:
-                print(f"\n{Cores.VERMELHO}❌ Falha na coleta de dados nutricionais:{Cores.RESET}")
-                stderr = processo.stderr.read()
-                if stderr:
-                    print(stderr)
+                print(f"\n{Cores.VERMELHO}❌ Falha na coleta de dados nutricionais{Cores.RESET}")
                 
         except Exception as e:
             print(f"\n{Cores.VERMELHO}❌ Erro durante coleta de dados: {str(e)}{Cores.RESET}")
@@ -283,33 +304,45 @@ def coleta_completa():
     print(f"\n{Cores.CIANO}{Cores.BOLD}🚀 COLETA COMPLETA - PROCESSO TOTAL{Cores.RESET}")
     print(f"{Cores.AZUL}━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━{Cores.RESET}")
     
-    print(f"\n{Cores.VERDE}📋 ETAPAS DO PROCESSO:{Cores.RESET}")
+    lojas_ativas = lojas.carregar_lojas()
+    
+    print(f"\n{Cores.VERDE}📋 ETAPAS DO PROCESSO (em paralelo):{Cores.RESET}")
     print(f"   {Cores.AMARELO}1.{Cores.RESET} Coleta de URLs dos produtos")
-    print(f"   {Cores.AMARELO}2.{Cores.RESET} Extração de dados nutricionais")
+    print(f"   {Cores.AMARELO}2.{Cores.RESET} Extração de dados nutricionais, assim que cada URL é encontrada")
+    
+    print(f"\n{Cores.VERDE}🏬 LOJAS (config/lojas.json):{Cores.RESET}")
+    for loja in lojas_ativas:
+        print(f"   • {loja['descricao']}: {Cores.AMARELO}{loja['base_url']}{Cores.RESET} "
+              f"({len(loja['colecoes'])} coleções)")
     
-    print(f"\n{Cores.AMARELO}⚠️  TEMPO ESTIMADO: {Cores.VERMELHO}10-15 minutos{Cores.RESET}")
+    print(f"\n{Cores.AMARELO}⚠️  TEMPO ESTIMADO: {Cores.VERMELHO}5-10 minutos{Cores.RESET}")
     
     confirmar = input(f"\n{Cores.MAGENTA}🤔 Iniciar processo completo? (s/N): {Cores.RESET}").lower()
     
     if confirmar in ['s', 'sim', 'y', 'yes']:
-        # Etapa 1: Coletar URLs
-        print(f"\n{Cores.CIANO}📍 ETAPA 1/2: Coletando URLs dos produtos...{Cores.RESET}")
-        urls_sucesso = coletar_urls()
-        
-        if not urls_sucesso:
-            print(f"{Cores.VERMELHO}❌ Coleta completa cancelada - falha na coleta de URLs{Cores.RESET}")
-            return
-        
-        # Pausa entre etapas
-        print(f"\n{Cores.AMARELO}⏱️  Aguardando 3 segundos antes da próxima etapa...{Cores.RESET}")
-        time.sleep(3)
-        
-        # Etapa 2: Coletar dados nutricionais
-        print(f"\n{Cores.CIANO}📍 ETAPA 2/2: Coletando dados nutricionais...{Cores.RESET}")
-        coletar_dados_nutricionais()
-        
-        print(f"\n{Cores.VERDE}🎉 COLETA COMPLETA FINALIZADA!{Cores.RESET}")
-        print(f"{Cores.VERDE}🏆 Todos os dados foram coletados e salvos com sucesso!{Cores.RESET}")
+        try:
+            mostrar_barra_progresso("Inicializando pipeline de coleta", 1.5)
+            
+            print(f"\n{Cores.CIANO}📍 Coletando URLs e dados nutricionais...{Cores.RESET}")
+            
+            # URLs e dados no mesmo processo: cada URL encontrada vai direto para os workers
+            if len(lojas_ativas) > 1:
+                # Várias lojas: todas em paralelo, cada uma com o seu orçamento
+                sucesso = executar_com_progresso(lambda: agendador.main([], pool=obter_pool()), 'completa', "produtos")
+                arquivos = [f"{lojas.pasta_da_loja(loja)}/" for loja in lojas_ativas]
+            else:
+                sucesso = executar_com_progresso(lambda: pipeline.main([], pool=obter_pool()), 'completa', "produtos")
+                arquivos = ["dados/urls_produtos_europa_estrutura_real.csv", "dados/dados_nutricionais.csv"]
+            
+            if sucesso:
+                print(f"\n{Cores.VERDE}🎉 COLETA COMPLETA FINALIZADA!{Cores.RESET}")
+                for arquivo in arquivos:
+                    print(f"{Cores.CIANO}📁 {arquivo}{Cores.RESET}")
+            else:
+                print(f"{Cores.VERMELHO}❌ Falha na coleta completa{Cores.RESET}")
+                
+        except Exception as e:
+            print(f"\n{Cores.VERMELHO}❌ Erro durante coleta completa: {str(e)}{Cores.RESET}")
     else:
         print(f"{Cores.AMARELO}⏭️  Operação cancelada{Cores.RESET}")
 
@@ -400,40 +433,29 @@ def teste_feedback():
     
     opcao = input(f"\n{Cores.MAGENTA}👉 Escolha uma opção (1-2): {Cores.RESET}").strip()
     
+    if opcao == "1":
+        etapa, unidade = 'urls', "categorias"
+        mostrar_barra_progresso("Preparando teste de URLs", 1.0)
+    elif opcao == "2":
+        etapa, unidade = 'dados', "produtos"
+        mostrar_barra_progresso("Preparando teste de dados", 1.0)
+    else:
+        print(f"{Cores.VERMELHO}❌ Opção inválida{Cores.RESET}")
+        return
+    
     try:
-        if opcao == "1":
-            mostrar_barra_progresso("Preparando teste de URLs", 1.0)
-            processo = subprocess.Popen(
-                [sys.executable, os.path.join(config_path, 'teste_feedback.py'), 'urls'],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                bufsize=1,
-                universal_newlines=True,
-                cwd=os.path.dirname(__file__)
-            )
-        elif opcao == "2":
-            mostrar_barra_progresso("Preparando teste de dados", 1.0)
-            processo = subprocess.Popen(
-                [sys.executable, os.path.join(config_path, 'teste_feedback.py'), 'dados'],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                bufsize=1,
-                universal_newlines=True,
-                cwd=os.path.dirname(__file__)
-            )
-        else:
-            print(f"{Cores.VERMELHO}❌ Opção inválida{Cores.RESET}")
-            return
+        processo = subprocess.Popen(
+            [sys.executable, os.path.join(config_path, 'teste_feedback.py'), etapa],
+            stdout=subprocess.PIPE,
+            text=True,
+            cwd=os.path.dirname(__file__)
+        )
         
-        # Ler saída em tempo real
-        while True:
-            output = processo.stdout.readline()
-            if output == '' and processo.poll() is not None:
-                break
-            if output:
-                print(output.strip())
+        # Eventos em JSON lines pelo pipe: o painel é desenhado a partir deles
+        painel = PainelProgresso(etapa, unidade)
+        for evento in eventos.ler_eventos(processo.stdout):
+            painel(evento)
+        painel.finalizar()
         
         processo.wait()
         print(f"\n{Cores.VERDE}✅ Teste de feedback concluído!{Cores.RESET}")
@@ -454,39 +476,21 @@ def testar_navegador():
     try:
         mostrar_barra_progresso("Executando testes", 1.5)
         
-        processo = subprocess.Popen(
-            [sys.executable, os.path.join(config_path, 'browser.py')],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            bufsize=1,
-            universal_newlines=True,
-            cwd=os.path.dirname(__file__)
-        )
-        
-        # Ler saída em tempo real
-        while True:
-            output = processo.stdout.readline()
-            if output == '' and processo.poll() is not None:
-                break
-            if output:
-                print(output.strip())
-        
-        processo.wait()
-        
-        if processo.returncode == 0:
+        if browser.testar_configuracao(pool=obter_pool()):
             print(f"\n{Cores.VERDE}✅ Configuração do navegador está funcionando!{Cores.RESET}")
         else:
-            print(f"\n{Cores.VERMELHO}❌ Problemas na configuração do navegador:{Cores.RESET}")
-            stderr = processo.stderr.read()
-            if stderr:
-                print(stderr)
+            print(f"\n{Cores.VERMELHO}❌ Problemas na configuração do navegador{Cores.RESET}")
         
     except Exception as e:
         print(f"\n{Cores.VERMELHO}❌ Erro no teste do navegador: {str(e)}{Cores.RESET}")
 
 def mostrar_sobre():
     """Exibe informações sobre o programa"""
+    lojas_ativas = lojas.carregar_lojas()
+    sites = "\n".join(f"   {loja['base_url']} ({loja['descricao']})" for loja in lojas_ativas)
+    categorias = "\n".join(f"   • {colecao['nome']} ({loja['nome']})"
+                           for loja in lojas_ativas for colecao in loja['colecoes'])
+    
     sobre = f"""
 {Cores.CIANO}{Cores.BOLD}📖 SOBRE O MAX TITANIUM EUROPA SCRAPER{Cores.RESET}
 {Cores.AZUL}━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━{Cores.RESET}
@@ -495,8 +499,8 @@ def mostrar_sobre():
    Coletar dados nutricionais completos dos produtos Max Titanium Europa
    para análise, comparação e pesquisa de suplementos
 
-{Cores.VERDE}🌐 SITE ALVO:{Cores.RESET}
-   https://maxtitanium.eu
+{Cores.VERDE}🌐 SITES ALVO (config/lojas.json):{Cores.RESET}
+{sites}
 
 {Cores.VERDE}📊 FUNCIONALIDADES:{Cores.RESET}
    • Coleta automática de URLs dos produtos
@@ -512,10 +516,7 @@ def mostrar_sobre():
    • Chrome (modo headless)
 
 {Cores.VERDE}📋 CATEGORIAS COLETADAS:{Cores.RESET}
-   • Pré-treinos (7 produtos)
-   • Proteínas (9 produtos) 
-   • Creatinas e Aminoácidos (4 produtos)
-   • Total: ~20 produtos únicos
+{categorias}
 
 {Cores.VERDE}📂 ARQUIVOS GERADOS:{Cores.RESET}
    • Formato: CSV (Excel compatível)
@@ -547,6 +548,9 @@ def pausar():
 # ============================================================================
 def main():
     """Função principal do programa"""
+    # As etapas rodam neste processo e usam caminhos relativos (dados/...)
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    
     try:
         while True:
             limpar_terminal()
@@ -604,6 +608,8 @@ def main():
         print(f"\n\n{Cores.AMARELO}👋 Programa encerrado pelo usuário. Até logo!{Cores.RESET}\n")
     except Exception as e:
         print(f"\n{Cores.VERMELHO}❌ Erro inesperado: {e}{Cores.RESET}")
+    finally:
+        encerrar_pool()
 
 if __name__ == "__main__":
     print(f"{Cores.CIANO}🏋️  MAX TITANIUM EUROPA SCRAPER{Cores.RESET}")